@@ -6,13 +6,20 @@ from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Request
 from fastapi import Query
 
+from app.collectors.cgroup_tree import get_cgroup_tree, get_top_cgroups
+from app.collectors.disks import get_disk_subsystem
 from app.collectors.processes import get_top_processes
-from app.collectors.network_quality import classify_network, ping_latency_ms
+from app.collectors.latency_prober import get_default_prober
 from app.collectors.ports import get_port_status
 from app.collectors.listening_ports import get_listening_ports
 from app.api.schemas import (
     AlertAckResponse,
     AlertsResponse,
+    CgroupHistoryResponse,
+    CgroupsResponse,
+    CollectorsResponse,
+    DiskIoHistoryResponse,
+    DisksResponse,
     DockerContainersResponse,
     DockerStatusResponse,
     HealthResponse,
@@ -23,11 +30,13 @@ from app.api.schemas import (
     PortsResponse,
     ProfileSelectResponse,
     ProfilesResponse,
+    SchedulerStatsResponse,
 )
 from app.api.schemas import ProcessesResponse
 from app.api.schemas import SnapshotResponse
 from app.api.schemas import TimelineResponse
 from app.core.config import (
+    COLLECTOR_INTERVAL_SECONDS,
     HISTORY_DEFAULT_HOURS,
     NETWORK_PING_HOST,
     NETWORK_PING_TIMEOUT_MS,
@@ -36,21 +45,44 @@ from app.core.profiles import (
     get_profile,
     list_profiles,
     resolve_profile,
-    set_active_profile_name,
 )
 from app.services.docker_monitor import (
     get_docker_status_cached,
     list_containers_with_stats,
 )
 from app.services.alert_state import AlertState
-from app.storage.alerts import acknowledge_alert, get_recent_alerts, set_alert_setting
-from app.storage.db import get_connection
-from app.storage.events import get_events, get_latest_events, insert_event
+from app.services.hot_tier import get_hot_tier
+from app.storage.alerts import get_recent_alerts
+from app.storage.db import read_connection
+from app.storage.disks import (
+    get_disk_io_devices,
+    get_disk_io_history,
+    get_disk_io_history_1m,
+    get_disk_io_history_15m,
+)
+from app.storage.events import get_events, get_latest_events
+from app.storage.facade import AsyncStorage
 from app.storage.snapshots import get_latest_snapshot, get_snapshot_history
 from app.storage.snapshots import get_snapshot_history_15m, get_snapshot_history_1m
 
 router = APIRouter(prefix="/api")
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _epoch_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _with_ts_utc(rows: list[dict]) -> list[dict]:
+    # Time-series rows are keyed by epoch milliseconds; ISO strings are only made here.
+    # ts_ms also serves as the row id.
+    for row in rows:
+        ts_ms = int(row["ts_ms"])
+        row["id"] = ts_ms
+        row["ts_utc"] = (_EPOCH + timedelta(milliseconds=ts_ms)).isoformat()
+    return rows
+
 
 @router.get("/health")
 def health() -> dict[str, bool]:
@@ -59,15 +91,17 @@ def health() -> dict[str, bool]:
 
 @router.get("/summary")
 def summary() -> SnapshotResponse:
-    with get_connection() as conn:
-        latest = get_latest_snapshot(conn)
+    latest = get_hot_tier().latest()
+    if latest is None:
+        with read_connection() as conn:
+            latest = get_latest_snapshot(conn)
 
     if latest is None:
         return SnapshotResponse(
             ok=False, data=None, meta={"message": "no snapshots yet"}
         )
 
-    return SnapshotResponse(ok=True, data=latest, meta={})
+    return SnapshotResponse(ok=True, data=_with_ts_utc([latest])[0], meta={})
 
 
 @router.get("/history")
@@ -76,26 +110,84 @@ def history(
 ) -> HistoryResponse:
     since = datetime.now(timezone.utc) - timedelta(hours=hours)
     since_ts_utc = since.isoformat()
+    since_ms = _epoch_ms(since)
+
+    memory_points = 0
+    if hours <= 24:
+        resolution = "raw"
+        rows, covered_since_ms = get_hot_tier().history(since_ms)
+        memory_points = len(rows)
+        # SQLite only fills the span older than the hot tier's oldest sample.
+        if covered_since_ms is None or since_ms < covered_since_ms:
+            with read_connection() as conn:
+                rows = get_snapshot_history(conn, since_ms, until_ms=covered_since_ms) + rows
+    else:
+        with read_connection() as conn:
+            if hours <= 168:
+                resolution = "1m"
+                rows = get_snapshot_history_1m(conn, since_ms=since_ms)
+            else:
+                resolution = "15m"
+                rows = get_snapshot_history_15m(conn, since_ms=since_ms)
+
+    return HistoryResponse(
+        ok=True,
+        data=_with_ts_utc(rows),
+        meta={
+            "hours": hours,
+            "since_ts_utc": since_ts_utc,
+            "count": len(rows),
+            "points": len(rows),
+            "memory_points": memory_points,
+            "resolution": resolution,
+        },
+    )
+
+
+@router.get("/disks")
+async def disks() -> DisksResponse:
+    sample = await asyncio.to_thread(get_disk_subsystem().latest)
+    return DisksResponse(
+        ok=True,
+        data={"mounts": sample.get("mounts") or [], "devices": sample.get("devices") or []},
+        meta={"ts_utc": datetime.now(timezone.utc).isoformat()},
+    )
+
+
+@router.get("/disks/history")
+def disks_history(
+    device: str | None = Query(default=None, min_length=1),
+    hours: int = Query(default=HISTORY_DEFAULT_HOURS, ge=1, le=720),
+) -> DiskIoHistoryResponse:
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    since_ts_utc = since.isoformat()
+    since_ms = _epoch_ms(since)
 
-    with get_connection() as conn:
+    with read_connection() as conn:
+        devices = get_disk_io_devices(conn, since_ms=since_ms)
+        if device is None:
+            return DiskIoHistoryResponse(
+                ok=True, data=[], meta={"hours": hours, "devices": devices, "count": 0}
+            )
         if hours <= 24:
             resolution = "raw"
-            rows = get_snapshot_history(conn, since_ts_utc=since_ts_utc)
+            rows = get_disk_io_history(conn, device, since_ms=since_ms)
         elif hours <= 168:
             resolution = "1m"
-            rows = get_snapshot_history_1m(conn, since_ts_utc=since_ts_utc)
+            rows = get_disk_io_history_1m(conn, device, since_ms=since_ms)
         else:
             resolution = "15m"
-            rows = get_snapshot_history_15m(conn, since_ts_utc=since_ts_utc)
+            rows = get_disk_io_history_15m(conn, device, since_ms=since_ms)
 
-    return HistoryResponse(
+    return DiskIoHistoryResponse(
         ok=True,
-        data=rows,
+        data=_with_ts_utc(rows),
         meta={
+            "device": device,
+            "devices": devices,
             "hours": hours,
             "since_ts_utc": since_ts_utc,
             "count": len(rows),
-            "points": len(rows),
             "resolution": resolution,
         },
     )
@@ -115,6 +207,59 @@ def history_meta() -> dict:
     }
 
 
+@router.get("/scheduler/stats")
+def scheduler_stats(request: Request) -> SchedulerStatsResponse:
+    now = datetime.now(timezone.utc)
+    scheduler = getattr(request.app.state, "scheduler", None)
+    if scheduler is None:
+        return SchedulerStatsResponse(
+            ok=False, data=None, meta={"message": "scheduler not running"}
+        )
+    return SchedulerStatsResponse(
+        ok=True, data=scheduler.stats(), meta={"ts_utc": now.isoformat()}
+    )
+
+
+@router.get("/scheduler/collectors")
+def scheduler_collectors(request: Request) -> CollectorsResponse:
+    now = datetime.now(timezone.utc)
+    scheduler = getattr(request.app.state, "scheduler", None)
+    if scheduler is None:
+        return CollectorsResponse(
+            ok=False, data=None, meta={"message": "scheduler not running"}
+        )
+    return CollectorsResponse(
+        ok=True,
+        data={"items": scheduler.describe_collectors()},
+        meta={"ts_utc": now.isoformat()},
+    )
+
+
+@router.post("/scheduler/collectors/{name}/interval")
+def set_collector_interval(
+    name: str,
+    request: Request,
+    seconds: float = Query(..., ge=1, le=3600),
+) -> CollectorsResponse:
+    now = datetime.now(timezone.utc)
+    scheduler = getattr(request.app.state, "scheduler", None)
+    if scheduler is None:
+        return CollectorsResponse(
+            ok=False, data=None, meta={"message": "scheduler not running"}
+        )
+    spec = scheduler.registry.set_interval(name, seconds)
+    if spec is None:
+        return CollectorsResponse(
+            ok=False,
+            data=None,
+            meta={"message": "unknown collector", "name": name, "ts_utc": now.isoformat()},
+        )
+    items = [item for item in scheduler.describe_collectors() if item["name"] == name]
+    return CollectorsResponse(
+        ok=True, data={"items": items}, meta={"ts_utc": now.isoformat()}
+    )
+
+
 @router.get("/timeline")
 def timeline(
     hours: int = Query(default=24, ge=1, le=168),
@@ -124,7 +269,7 @@ def timeline(
     since = now - timedelta(hours=hours)
     since_ts_utc = since.isoformat()
 
-    with get_connection() as conn:
+    with read_connection() as conn:
         items = get_events(conn, since_ts_utc=since_ts_utc, limit=limit)
 
     return TimelineResponse(
@@ -139,7 +284,7 @@ def timeline_latest(
     limit: int = Query(default=30, ge=1, le=500),
 ) -> TimelineResponse:
     now = datetime.now(timezone.utc)
-    with get_connection() as conn:
+    with read_connection() as conn:
         items = get_latest_events(conn, limit=limit)
 
     return TimelineResponse(
@@ -155,7 +300,7 @@ async def ports(request: Request) -> PortsResponse:
         getattr(request.app.state, "profile_state", None), "active_name", "default"
     )
     profile = resolve_profile(active_name)
-    statuses = get_port_status(list(profile.watch_ports))
+    statuses = await asyncio.to_thread(get_port_status, list(profile.watch_ports))
     return PortsResponse(
         ok=True,
         data=statuses,
@@ -252,8 +397,9 @@ async def select_profile(
         except Exception:
             pass
 
+    storage: AsyncStorage = request.app.state.storage
     try:
-        set_active_profile_name(profile.name)
+        await storage.set_active_profile_name(profile.name)
     except Exception:
         return ProfileSelectResponse(
             ok=False,
@@ -288,10 +434,12 @@ async def select_profile(
 
 @router.get("/network")
 async def network() -> NetworkResponse:
-    latency_ms = await asyncio.to_thread(
-        ping_latency_ms, NETWORK_PING_HOST, NETWORK_PING_TIMEOUT_MS
+    # Reuses the scheduler's last probe round when it is recent enough.
+    probe = await get_default_prober().latest_or_probe(
+        COLLECTOR_INTERVAL_SECONDS.get("ping", 10.0)
     )
-    status = classify_network(latency_ms)
+    latency_ms = probe.get("latency_ms")
+    status = str(probe.get("status") or "offline")
     return NetworkResponse(
         ok=True,
         data={
@@ -299,6 +447,12 @@ async def network() -> NetworkResponse:
             "timeout_ms": NETWORK_PING_TIMEOUT_MS,
             "latency_ms": latency_ms,
             "status": status,
+            "p50_ms": probe.get("p50_ms"),
+            "p95_ms": probe.get("p95_ms"),
+            "max_ms": probe.get("max_ms"),
+            "jitter_ms": probe.get("jitter_ms"),
+            "loss_percent": probe.get("loss_percent"),
+            "targets": probe.get("targets") or [],
         },
         meta={},
     )
@@ -310,7 +464,7 @@ def alerts(
     limit: int = Query(default=50, ge=1, le=200),
     include_ack: bool = Query(default=False),
 ) -> AlertsResponse:
-    with get_connection() as conn:
+    with read_connection() as conn:
         rows = get_recent_alerts(conn, limit=limit, include_ack=include_ack)
 
     mute_until: str | None = None
@@ -333,23 +487,8 @@ def alerts(
 @router.post("/alerts/{alert_id}/ack")
 async def ack_alert(alert_id: int, request: Request) -> AlertAckResponse:
     ts_utc = datetime.now(timezone.utc).isoformat()
-    with get_connection() as conn:
-        ok = acknowledge_alert(conn, alert_id=alert_id, ts_utc=ts_utc)
-        event_id: int | None = None
-        if ok:
-            try:
-                event_id = insert_event(
-                    conn,
-                    {
-                        "ts_utc": ts_utc,
-                        "kind": "alert_ack",
-                        "message": f"Alert {alert_id} acknowledged",
-                        "severity": "info",
-                        "meta": {"alert_id": alert_id},
-                    },
-                )
-            except Exception:
-                event_id = None
+    storage: AsyncStorage = request.app.state.storage
+    ok, event_id = await storage.ack_alert(alert_id, ts_utc)
 
     if not ok:
         return AlertAckResponse(
@@ -403,33 +542,22 @@ async def mute_alerts(
     async with state.lock:
         state.mute_until_utc = mute_until
 
-    with get_connection() as conn:
-        set_alert_setting(
-            conn, "mute_until_utc", mute_until.isoformat() if mute_until else None
-        )
-        kind = "mute_enabled" if mute_until else "mute_disabled"
-        message = (
-            f"Alerts muted for {minutes} minutes" if mute_until else "Alerts unmuted"
-        )
-        event_id: int | None = None
-        try:
-            event_id = insert_event(
-                conn,
-                {
-                    "ts_utc": now.isoformat(),
-                    "kind": kind,
-                    "message": message,
-                    "severity": "info",
-                    "meta": {
-                        "minutes": minutes,
-                        "mute_until_utc": (
-                            mute_until.isoformat() if mute_until else None
-                        ),
-                    },
-                },
-            )
-        except Exception:
-            event_id = None
+    kind = "mute_enabled" if mute_until else "mute_disabled"
+    message = f"Alerts muted for {minutes} minutes" if mute_until else "Alerts unmuted"
+    storage: AsyncStorage = request.app.state.storage
+    event_id = await storage.set_mute(
+        mute_until,
+        {
+            "ts_utc": now.isoformat(),
+            "kind": kind,
+            "message": message,
+            "severity": "info",
+            "meta": {
+                "minutes": minutes,
+                "mute_until_utc": mute_until.isoformat() if mute_until else None,
+            },
+        },
+    )
 
     ts_utc = now.isoformat()
     manager = getattr(request.app.state, "ws_manager", None)
@@ -480,3 +608,39 @@ async def processes(limit: int = Query(default=10, ge=1, le=50)) -> ProcessesRes
         data={"items": items},
         meta={"limit": limit, "ts_utc": datetime.now(timezone.utc).isoformat()},
     )
+
+
+@router.get("/cgroups")
+async def cgroups(
+    limit: int = Query(default=10, ge=1, le=100),
+    kind: str | None = Query(default=None, pattern="^(slice|service|scope|cgroup)$"),
+) -> CgroupsResponse:
+    payload = await asyncio.to_thread(get_top_cgroups, limit, kind)
+    return CgroupsResponse(
+        ok=True,
+        data={"items": payload["items"]},
+        meta={
+            "available": payload["available"],
+            "reason": payload["reason"],
+            "limit": limit,
+            "kind": kind,
+            "ts_utc": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+
+
+@router.get("/cgroups/history")
+async def cgroup_history(path: str = Query(..., min_length=1)) -> CgroupHistoryResponse:
+    tree = get_cgroup_tree()
+    if tree is None:
+        return CgroupHistoryResponse(
+            ok=False, data=None, meta={"message": "cgroup v2 hierarchy not mounted"}
+        )
+    points = await asyncio.to_thread(tree.history, path)
+    if points is None:
+        return CgroupHistoryResponse(ok=False, data=None, meta={"message": "cgroup not found"})
+    return CgroupHistoryResponse(
+        ok=True,
+        data={"path": path.strip("/"), "points": points},
+        meta={"count": len(points)},
+    )
@@ -12,6 +12,7 @@ class HealthData(BaseModel):
 class SnapshotData(BaseModel):
     id: int
     ts_utc: str
+    ts_ms: int
     cpu_percent: float | None = None
     mem_percent: float | None = None
     mem_used_bytes: int | None = None
@@ -23,6 +24,22 @@ class SnapshotData(BaseModel):
     disk_total_bytes: int | None = None
     net_sent_bps: float | None = None
     net_recv_bps: float | None = None
+    interval_s: float | None = None
+    psi_cpu_some_avg10: float | None = None
+    psi_mem_some_avg10: float | None = None
+    psi_mem_full_avg10: float | None = None
+    psi_io_some_avg10: float | None = None
+    psi_io_full_avg10: float | None = None
+    psi_cpu_some_pct: float | None = None
+    psi_mem_some_pct: float | None = None
+    psi_mem_full_pct: float | None = None
+    psi_io_some_pct: float | None = None
+    psi_io_full_pct: float | None = None
+    sock_used: int | None = None
+    tcp_inuse: float | None = None
+    tcp_orphan: int | None = None
+    tcp_tw: int | None = None
+    tcp_alloc: int | None = None
 
 
 class HealthResponse(BaseModel):
@@ -151,6 +168,12 @@ class NetworkData(BaseModel):
     timeout_ms: int
     latency_ms: float | None = None
     status: str
+    p50_ms: float | None = None
+    p95_ms: float | None = None
+    max_ms: float | None = None
+    jitter_ms: float | None = None
+    loss_percent: float | None = None
+    targets: list[dict[str, Any]] = Field(default_factory=list)
 
 
 class NetworkResponse(BaseModel):
@@ -217,6 +240,96 @@ class ProcessesResponse(BaseModel):
     meta: dict[str, Any] = Field(default_factory=dict)
 
 
+class CgroupItem(BaseModel):
+    path: str
+    name: str
+    kind: str
+    cpu_percent: float
+    memory_bytes: int
+    io_read_bps: float = 0.0
+    io_write_bps: float = 0.0
+    psi_cpu_some_avg10: float | None = None
+    psi_memory_some_avg10: float | None = None
+    psi_io_some_avg10: float | None = None
+
+
+class CgroupsData(BaseModel):
+    items: list[CgroupItem] = Field(default_factory=list)
+
+
+class CgroupsResponse(BaseModel):
+    ok: bool
+    data: CgroupsData | None = None
+    meta: dict[str, Any] = Field(default_factory=dict)
+
+
+class CgroupHistoryPoint(BaseModel):
+    ts: float
+    cpu_percent: float
+    memory_bytes: int
+
+
+class CgroupHistoryData(BaseModel):
+    path: str
+    points: list[CgroupHistoryPoint] = Field(default_factory=list)
+
+
+class CgroupHistoryResponse(BaseModel):
+    ok: bool
+    data: CgroupHistoryData | None = None
+    meta: dict[str, Any] = Field(default_factory=dict)
+
+
+class DiskMountItem(BaseModel):
+    mountpoint: str
+    device: str
+    block: str | None = None
+    fstype: str
+    percent: float
+    used_bytes: int
+    free_bytes: int
+    total_bytes: int
+
+
+class DiskDeviceItem(BaseModel):
+    device: str
+    read_bps: float
+    write_bps: float
+    read_iops: float
+    write_iops: float
+    await_ms: float
+    util_percent: float
+
+
+class DisksData(BaseModel):
+    mounts: list[DiskMountItem] = Field(default_factory=list)
+    devices: list[DiskDeviceItem] = Field(default_factory=list)
+
+
+class DisksResponse(BaseModel):
+    ok: bool
+    data: DisksData | None = None
+    meta: dict[str, Any] = Field(default_factory=dict)
+
+
+class DiskIoPoint(BaseModel):
+    ts_utc: str
+    ts_ms: int
+    read_bps: float | None = None
+    write_bps: float | None = None
+    read_iops: float | None = None
+    write_iops: float | None = None
+    await_ms: float | None = None
+    util_percent: float | None = None
+    interval_s: float | None = None
+
+
+class DiskIoHistoryResponse(BaseModel):
+    ok: bool
+    data: list[DiskIoPoint] = Field(default_factory=list)
+    meta: dict[str, Any] = Field(default_factory=dict)
+
+
 class TimelineEvent(BaseModel):
     id: int
     ts_utc: str
@@ -235,3 +348,60 @@ class TimelineResponse(BaseModel):
     ok: bool
     data: TimelineData | None = None
     meta: dict[str, Any] = Field(default_factory=dict)
+
+
+class TickTimingStats(BaseModel):
+    last: float = 0.0
+    avg: float = 0.0
+    max: float = 0.0
+    p50: float = 0.0
+    p99: float = 0.0
+
+
+class SchedulerStatsData(BaseModel):
+    mode: str
+    missed_policy: str
+    interval_seconds: float
+    uptime_seconds: float
+    ticks: int
+    effective_hz: float
+    overruns: int
+    missed_ticks: int
+    lag_ms: TickTimingStats
+    work_ms: TickTimingStats
+    sampling: dict[str, Any] = Field(default_factory=dict)
+    collectors: dict[str, Any] = Field(default_factory=dict)
+    docker_events: dict[str, Any] = Field(default_factory=dict)
+    db: dict[str, Any] = Field(default_factory=dict)
+    hot_tier: dict[str, Any] = Field(default_factory=dict)
+    rollups: dict[str, Any] = Field(default_factory=dict)
+
+
+class SchedulerStatsResponse(BaseModel):
+    ok: bool
+    data: SchedulerStatsData | None = None
+    meta: dict[str, Any] = Field(default_factory=dict)
+
+
+class CollectorItem(BaseModel):
+    name: str
+    interval_seconds: float
+    phase_seconds: float | None = None
+    effective_phase_seconds: float = 0.0
+    next_due_in_seconds: float | None = None
+    executor: str
+    budget_seconds: float
+    consumers: list[str] = Field(default_factory=list)
+    heavy: bool = False
+    requires_clients: bool = False
+    status: dict[str, Any] | None = None
+
+
+class CollectorsData(BaseModel):
+    items: list[CollectorItem] = Field(default_factory=list)
+
+
+class CollectorsResponse(BaseModel):
+    ok: bool
+    data: CollectorsData | None = None
+    meta: dict[str, Any] = Field(default_factory=dict)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from threading import Lock
+from typing import Any
+
+import psutil
+
+from app.core.config import DOCKER_STATS_BACKEND
+
+CGROUP_ROOT: str = "/sys/fs/cgroup"
+# systemd cgroup driver first (the default on current distros), then cgroupfs.
+_CANDIDATES: tuple[str, ...] = (
+    "system.slice/docker-{cid}.scope",
+    "docker/{cid}",
+    "docker.slice/docker-{cid}.scope",
+)
+# Containers without a cgroup here (other runtime, not started yet) are looked up again
+# after this long rather than on every read.
+_MISSING_RETRY_SECONDS: float = 30.0
+# Reads closer together than this reuse the last CPU% instead of diffing a tiny window.
+_MIN_CPU_WINDOW_SECONDS: float = 0.5
+
+
+def _read_int(path: str) -> int | None:
+    with open(path, "rb") as f:
+        raw = f.read().strip()
+    if raw == b"max":
+        return None
+    return int(raw)
+
+
+def _read_usage_usec(cgroup_dir: str) -> int:
+    with open(os.path.join(cgroup_dir, "cpu.stat"), "rb") as f:
+        for line in f:
+            if line.startswith(b"usage_usec "):
+                return int(line.split()[1])
+    raise OSError(f"no usage_usec in {cgroup_dir}/cpu.stat")
+
+
+def _same_netns_as_us(pid: int) -> bool:
+    try:
+        return os.stat(f"/proc/{pid}/ns/net").st_ino == os.stat("/proc/self/ns/net").st_ino
+    except OSError:
+        return False
+
+
+def _read_net_bytes(cgroup_dir: str) -> tuple[int, int]:
+    # Counters of the container's network namespace, read through any of its processes.
+    # Like the API, loopback is left out and host-network containers report nothing.
+    try:
+        with open(os.path.join(cgroup_dir, "cgroup.procs"), "rb") as f:
+            first = f.readline().strip()
+        if not first:
+            return 0, 0
+        pid = int(first)
+        if _same_netns_as_us(pid):
+            return 0, 0
+        with open(f"/proc/{pid}/net/dev", "rb") as f:
+            lines = f.read().splitlines()[2:]
+    except (OSError, ValueError):
+        return 0, 0
+
+    rx = tx = 0
+    for line in lines:
+        iface, _, data = line.partition(b":")
+        if iface.strip() == b"lo":
+            continue
+        fields = data.split()
+        if len(fields) >= 9:
+            rx += int(fields[0])
+            tx += int(fields[8])
+    return rx, tx
+
+
+class CgroupContainerStats:
+    # Per-container CPU/memory/network straight from cgroup v2 files when the backend
+    # runs on the Docker host. CPU% is the usage_usec delta over wall time between
+    # reads (100% = one core, as the API reports it); the first read of a container
+    # reports 0 like the API's first stats frame.
+    def __init__(self, root: str = CGROUP_ROOT) -> None:
+        self.root = root
+        self._paths: dict[str, str] = {}
+        self._missing: dict[str, float] = {}
+        self._prev: dict[str, tuple[int, float, float]] = {}
+        self._host_memory = int(psutil.virtual_memory().total)
+        self._lock = Lock()
+
+    def _path(self, cid: str) -> str | None:
+        path = self._paths.get(cid)
+        if path is not None:
+            return path
+        missing_since = self._missing.get(cid)
+        if missing_since is not None and (time.monotonic() - missing_since) < _MISSING_RETRY_SECONDS:
+            return None
+        for pattern in _CANDIDATES:
+            candidate = os.path.join(self.root, pattern.format(cid=cid))
+            if os.path.isfile(os.path.join(candidate, "cpu.stat")):
+                self._paths[cid] = candidate
+                self._missing.pop(cid, None)
+                return candidate
+        self._missing[cid] = time.monotonic()
+        return None
+
+    def read(self, cid: str) -> dict[str, Any] | None:
+        with self._lock:
+            path = self._path(cid)
+            if path is None:
+                return None
+            try:
+                usage = _read_usage_usec(path)
+                mem_usage = _read_int(os.path.join(path, "memory.current")) or 0
+                mem_limit = _read_int(os.path.join(path, "memory.max"))
+            except (OSError, ValueError):
+                # The scope went away (container stopped); look it up again next time.
+                self._paths.pop(cid, None)
+                self._prev.pop(cid, None)
+                return None
+
+            now = time.monotonic()
+            prev = self._prev.get(cid)
+            if prev is not None and (now - prev[1]) < _MIN_CPU_WINDOW_SECONDS:
+                cpu_percent = prev[2]
+            else:
+                cpu_percent = 0.0
+                if prev is not None and usage >= prev[0]:
+                    cpu_percent = (usage - prev[0]) / ((now - prev[1]) * 1_000_000.0) * 100.0
+                self._prev[cid] = (usage, now, cpu_percent)
+
+        if mem_limit is None or mem_limit > self._host_memory:
+            mem_limit = self._host_memory
+        rx, tx = _read_net_bytes(path)
+        return {
+            "cpu_percent": float(cpu_percent),
+            "mem_usage_bytes": int(mem_usage),
+            "mem_limit_bytes": int(mem_limit),
+            "mem_percent": (float(mem_usage) / float(mem_limit) * 100.0) if mem_limit > 0 else 0.0,
+            "net_rx_bytes": int(rx),
+            "net_tx_bytes": int(tx),
+        }
+
+    def prune(self, live_ids: set[str]) -> None:
+        with self._lock:
+            for table in (self._paths, self._missing, self._prev):
+                for cid in [c for c in table if c not in live_ids]:
+                    del table[cid]
+
+
+_READER: CgroupContainerStats | None = None
+_READER_CHECKED: bool = False
+_READER_LOCK = Lock()
+
+
+def cgroup_stats_available(root: str = CGROUP_ROOT) -> bool:
+    return (
+        DOCKER_STATS_BACKEND != "api"
+        and sys.platform.startswith("linux")
+        and os.path.isfile(os.path.join(root, "cgroup.controllers"))
+    )
+
+
+def get_cgroup_stats() -> CgroupContainerStats | None:
+    global _READER, _READER_CHECKED
+    if _READER_CHECKED:
+        return _READER
+    with _READER_LOCK:
+        if not _READER_CHECKED:
+            _READER = CgroupContainerStats() if cgroup_stats_available() else None
+            _READER_CHECKED = True
+    return _READER
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+
+from app.collectors.cgroup_containers import CGROUP_ROOT
+from app.core.config import (
+    CGROUP_HISTORY_POINTS,
+    CGROUP_TREE_FULL_RESCAN_SECONDS,
+    CGROUP_TREE_MAX_DEPTH,
+    CGROUP_TREE_MIN_REFRESH_SECONDS,
+)
+
+# A quiet cgroup (usage_usec and every PSI total unchanged) skips its memory/io reads,
+# but not for more than this many refreshes in a row.
+_IDLE_FULL_READ_EVERY: int = 10
+_PSI_FILES: tuple[tuple[str, str], ...] = (
+    ("cpu", "cpu.pressure"),
+    ("memory", "memory.pressure"),
+    ("io", "io.pressure"),
+)
+
+
+def cgroup_kind(name: str) -> str:
+    for suffix in ("slice", "service", "scope"):
+        if name.endswith("." + suffix):
+            return suffix
+    return "cgroup"
+
+
+def _read(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _stat_value(data: bytes | None, key: bytes) -> int | None:
+    if not data:
+        return None
+    for line in data.splitlines():
+        if line.startswith(key + b" "):
+            return int(line.split()[1])
+    return None
+
+
+def _int_value(data: bytes | None) -> int:
+    raw = (data or b"").strip()
+    return int(raw) if raw.isdigit() else 0
+
+
+def _io_bytes(data: bytes | None) -> tuple[int, int] | None:
+    if data is None:
+        return None
+    rbytes = wbytes = 0
+    for line in data.splitlines():
+        for field_ in line.split()[1:]:
+            if field_.startswith(b"rbytes="):
+                rbytes += int(field_[7:])
+            elif field_.startswith(b"wbytes="):
+                wbytes += int(field_[7:])
+    return rbytes, wbytes
+
+
+def _psi_some(data: bytes | None) -> tuple[float | None, int | None]:
+    # (avg10, total) from the "some" line; total is the cumulative stall time in us.
+    if not data:
+        return None, None
+    line = data.split(b"\n", 1)[0]
+    if not line.startswith(b"some "):
+        return None, None
+    avg10: float | None = None
+    total: int | None = None
+    for part in line.split()[1:]:
+        if part.startswith(b"avg10="):
+            avg10 = float(part[6:])
+        elif part.startswith(b"total="):
+            total = int(part[6:])
+    return avg10, total
+
+
+@dataclass
+class _Node:
+    path: str
+    depth: int
+    mtime_ns: int = 0
+    children: set[str] = field(default_factory=set)
+    usage_usec: int | None = None
+    sample_mono: float | None = None
+    idle_refreshes: int = 0
+    cpu_percent: float = 0.0
+    memory_bytes: int = 0
+    io: tuple[int, int] | None = None
+    io_mono: float | None = None
+    io_read_bps: float = 0.0
+    io_write_bps: float = 0.0
+    psi: dict[str, float | None] = field(default_factory=dict)
+    psi_totals: dict[str, int | None] = field(default_factory=dict)
+    history: deque[tuple[float, float, int]] = field(
+        default_factory=lambda: deque(maxlen=CGROUP_HISTORY_POINTS)
+    )
+
+    def to_dict(self) -> dict[str, Any]:
+        name = self.path.rsplit("/", 1)[-1]
+        return {
+            "path": self.path,
+            "name": name,
+            "kind": cgroup_kind(name),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "memory_bytes": self.memory_bytes,
+            "io_read_bps": self.io_read_bps,
+            "io_write_bps": self.io_write_bps,
+            "psi_cpu_some_avg10": self.psi.get("cpu"),
+            "psi_memory_some_avg10": self.psi.get("memory"),
+            "psi_io_some_avg10": self.psi.get("io"),
+        }
+
+
+class CgroupTree:
+    # Incremental view of the cgroup v2 hierarchy. A directory is re-listed only when
+    # its mtime moves; kernfs does not always bump a parent's mtime on mkdir/rmdir,
+    # so a change of the root's nr_descendants (and a periodic full pass) re-lists
+    # everything. Per node, cpu.stat and the pressure files are read every refresh,
+    # and memory.current and io.stat only when CPU time or a PSI stall total moved,
+    # or the node has been quiet too long. A task blocked on I/O or reclaim can burn
+    # almost no CPU, so PSI is what keeps such a stall from being skipped.
+    def __init__(
+        self,
+        root: str = CGROUP_ROOT,
+        *,
+        max_depth: int = CGROUP_TREE_MAX_DEPTH,
+        min_refresh_seconds: float = CGROUP_TREE_MIN_REFRESH_SECONDS,
+    ) -> None:
+        self.root = root
+        self.max_depth = int(max_depth)
+        self.min_refresh_seconds = float(min_refresh_seconds)
+        self._nodes: dict[str, _Node] = {}
+        self._root_descendants: int | None = None
+        self._last_full_mono: float | None = None
+        self._last_refresh_mono: float | None = None
+        self._lock = Lock()
+        self.files_read = 0
+        self.dirs_listed = 0
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _list_children(self, node: _Node) -> None:
+        self.dirs_listed += 1
+        children: set[str] = set()
+        try:
+            with os.scandir(self._abs(node.path)) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        children.add(f"{node.path}/{entry.name}" if node.path else entry.name)
+        except OSError:
+            pass
+        for gone in node.children - children:
+            self._drop(gone)
+        node.children = children
+
+    def _drop(self, rel: str) -> None:
+        node = self._nodes.pop(rel, None)
+        if node is not None:
+            for child in node.children:
+                self._drop(child)
+
+    def _walk(self, full: bool) -> None:
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            node = self._nodes.get(rel)
+            try:
+                mtime_ns = os.stat(self._abs(rel)).st_mtime_ns
+            except OSError:
+                self._drop(rel)
+                continue
+            if node is None:
+                node = _Node(path=rel, depth=rel.count("/") + 1 if rel else 0)
+                self._nodes[rel] = node
+                full_node = True
+            else:
+                full_node = full or node.mtime_ns != mtime_ns
+            node.mtime_ns = mtime_ns
+            if node.depth < self.max_depth and full_node:
+                self._list_children(node)
+            stack.extend(node.children)
+
+    def _read_file(self, node: _Node, name: str) -> bytes | None:
+        self.files_read += 1
+        return _read(os.path.join(self._abs(node.path), name))
+
+    def _sample(self, node: _Node, now: float, now_wall: float) -> None:
+        usage = _stat_value(self._read_file(node, "cpu.stat"), b"usage_usec")
+        dt = (now - node.sample_mono) if node.sample_mono is not None else 0.0
+        moved = usage is not None and usage != node.usage_usec
+        if node.usage_usec is not None and usage is not None and dt > 0:
+            node.cpu_percent = max(0.0, (usage - node.usage_usec) / (dt * 1_000_000.0) * 100.0)
+        else:
+            node.cpu_percent = 0.0
+
+        stalled = False
+        for key, filename in _PSI_FILES:
+            avg10, total = _psi_some(self._read_file(node, filename))
+            node.psi[key] = avg10
+            stalled = stalled or total != node.psi_totals.get(key)
+            node.psi_totals[key] = total
+
+        if moved or stalled or node.sample_mono is None or node.idle_refreshes >= _IDLE_FULL_READ_EVERY:
+            node.idle_refreshes = 0
+            node.memory_bytes = _int_value(self._read_file(node, "memory.current"))
+            io = _io_bytes(self._read_file(node, "io.stat"))
+            io_dt = (now - node.io_mono) if node.io_mono is not None else 0.0
+            if io is not None and node.io is not None and io_dt > 0:
+                node.io_read_bps = max(0.0, (io[0] - node.io[0]) / io_dt)
+                node.io_write_bps = max(0.0, (io[1] - node.io[1]) / io_dt)
+            else:
+                node.io_read_bps = node.io_write_bps = 0.0
+            node.io = io
+            node.io_mono = now
+        else:
+            # The rates stand until the next io.stat read, which averages over the
+            # whole gap since io_mono.
+            node.idle_refreshes += 1
+
+        node.usage_usec = usage
+        node.sample_mono = now
+        node.history.append((now_wall, round(node.cpu_percent, 1), node.memory_bytes))
+
+    def refresh(self) -> None:
+        now = time.monotonic()
+        descendants = _stat_value(_read(os.path.join(self.root, "cgroup.stat")), b"nr_descendants")
+        full = (
+            self._last_full_mono is None
+            or descendants != self._root_descendants
+            or (now - self._last_full_mono) >= CGROUP_TREE_FULL_RESCAN_SECONDS
+        )
+        self._walk(full)
+        if full:
+            self._last_full_mono = now
+        self._root_descendants = descendants
+
+        now_wall = time.time()
+        for rel, node in self._nodes.items():
+            if rel:
+                self._sample(node, now, now_wall)
+        self._last_refresh_mono = now
+
+    def _ensure_fresh(self) -> None:
+        if (
+            self._last_refresh_mono is None
+            or (time.monotonic() - self._last_refresh_mono) >= self.min_refresh_seconds
+        ):
+            self.refresh()
+
+    def top(self, limit: int, *, kind: str | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            self._ensure_fresh()
+            nodes = [
+                n
+                for rel, n in self._nodes.items()
+                if rel and (kind is None or cgroup_kind(rel.rsplit("/", 1)[-1]) == kind)
+            ]
+            nodes.sort(key=lambda n: (n.cpu_percent, n.memory_bytes), reverse=True)
+            return [n.to_dict() for n in nodes[: max(1, int(limit))]]
+
+    def history(self, path: str) -> list[dict[str, Any]] | None:
+        with self._lock:
+            node = self._nodes.get(path.strip("/"))
+            if node is None or not node.path:
+                return None
+            return [
+                {"ts": ts, "cpu_percent": cpu, "memory_bytes": mem} for ts, cpu, mem in node.history
+            ]
+
+    def stats(self) -> dict[str, Any]:
+        return {"nodes": len(self._nodes), "files_read": self.files_read, "dirs_listed": self.dirs_listed}
+
+
+_TREE: CgroupTree | None = None
+_TREE_CHECKED: bool = False
+_TREE_LOCK = Lock()
+
+
+def cgroup_tree_available(root: str = CGROUP_ROOT) -> bool:
+    return sys.platform.startswith("linux") and os.path.isfile(os.path.join(root, "cgroup.controllers"))
+
+
+def get_cgroup_tree() -> CgroupTree | None:
+    global _TREE, _TREE_CHECKED
+    if _TREE_CHECKED:
+        return _TREE
+    with _TREE_LOCK:
+        if not _TREE_CHECKED:
+            _TREE = CgroupTree() if cgroup_tree_available() else None
+            _TREE_CHECKED = True
+    return _TREE
+
+
+def get_top_cgroups(limit: int, kind: str | None = None) -> dict[str, Any]:
+    tree = get_cgroup_tree()
+    if tree is None:
+        return {"available": False, "reason": "cgroup v2 hierarchy not mounted", "items": []}
+    return {"available": True, "reason": "ok", "items": tree.top(limit, kind=kind)}
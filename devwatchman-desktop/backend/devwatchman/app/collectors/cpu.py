@@ -2,7 +2,12 @@ from __future__ import annotations
 
 import psutil
 
+from app.collectors.procfs import get_sampler
+
 
 def collect_cpu() -> dict[str, float]:
+    sampler = get_sampler()
+    if sampler is not None:
+        return sampler.cpu()
     return {"percent": float(psutil.cpu_percent(interval=None))}
 
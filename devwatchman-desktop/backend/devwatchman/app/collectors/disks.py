@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import os
+import select
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import psutil
+
+from app.core.config import DISK_IGNORE_FSTYPES, DISK_IO_IGNORE_PREFIXES, DISK_MOUNTS_REFRESH_SECONDS
+
+_MOUNTINFO = "/proc/self/mountinfo"
+
+
+@dataclass(frozen=True, slots=True)
+class Mount:
+    device: str
+    mountpoint: str
+    fstype: str
+    # Kernel block device name backing the mount (e.g. "nvme0n1p2", "dm-0"), when known,
+    # so usage rows can be matched to the per-device I/O rows.
+    block: str | None
+
+
+def _block_name(path: str) -> str | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        st_dev = os.stat(path).st_dev
+        return os.path.basename(os.path.realpath(f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}"))
+    except OSError:
+        return None
+
+
+def _primary_paths() -> list[str]:
+    # Same preference as the single-disk collector always had: the home drive, then
+    # the working directory's, then the system drive, then "/".
+    candidates: list[str] = []
+    for anchor in (Path.home().anchor, Path.cwd().anchor):
+        if anchor and anchor not in candidates:
+            candidates.append(anchor)
+    system_drive = os.environ.get("SystemDrive")
+    if system_drive:
+        candidates.append(f"{system_drive}\\")
+    if "/" not in candidates:
+        candidates.append("/")
+    return candidates
+
+
+def _usage_totals(usage: Any) -> dict[str, Any]:
+    return {
+        "percent": float(usage.percent),
+        "used_bytes": int(usage.used),
+        "free_bytes": int(usage.free),
+        "total_bytes": int(usage.total),
+    }
+
+
+class MountTable:
+    # Real (device-backed) mounts, one per device. On Linux the list is rebuilt only when
+    # /proc/self/mountinfo polls with POLLPRI, which the kernel raises on any mount or
+    # unmount in this namespace; elsewhere it is rebuilt every DISK_MOUNTS_REFRESH_SECONDS.
+    def __init__(self, refresh_seconds: float = DISK_MOUNTS_REFRESH_SECONDS) -> None:
+        self.refresh_seconds = float(refresh_seconds)
+        self._mounts: list[Mount] | None = None
+        self._loaded_mono: float | None = None
+        self._fd: int | None = None
+        self._poll: Any = None
+        self.reloads = 0
+        if sys.platform.startswith("linux") and hasattr(select, "poll"):
+            try:
+                self._fd = os.open(_MOUNTINFO, os.O_RDONLY)
+                self._poll = select.poll()
+                self._poll.register(self._fd, select.POLLPRI | select.POLLERR)
+            except OSError:
+                self._fd = None
+                self._poll = None
+
+    def _changed(self) -> bool:
+        if self._mounts is None:
+            return True
+        if self._poll is not None:
+            # The kernel reports each mount-namespace change once per open file.
+            return bool(self._poll.poll(0))
+        return (time.monotonic() - (self._loaded_mono or 0.0)) >= self.refresh_seconds
+
+    def _load(self) -> list[Mount]:
+        ignored = set(DISK_IGNORE_FSTYPES)
+        by_device: dict[str, Mount] = {}
+        for part in psutil.disk_partitions(all=False):
+            if part.fstype in ignored or not part.mountpoint:
+                continue
+            mount = Mount(
+                device=part.device,
+                mountpoint=part.mountpoint,
+                fstype=part.fstype,
+                block=_block_name(part.mountpoint),
+            )
+            # Bind mounts repeat a device; keep its shortest mountpoint.
+            key = mount.block or part.device
+            current = by_device.get(key)
+            if current is None or len(mount.mountpoint) < len(current.mountpoint):
+                by_device[key] = mount
+        self.reloads += 1
+        return sorted(by_device.values(), key=lambda m: m.mountpoint)
+
+    def mounts(self) -> list[Mount]:
+        if self._changed():
+            self._mounts = self._load()
+            self._loaded_mono = time.monotonic()
+        return self._mounts or []
+
+
+@dataclass
+class _IoSample:
+    ts_monotonic: float
+    counters: dict[str, Any]
+
+
+def _io_rates(prev: Any, cur: Any, dt: float) -> dict[str, float]:
+    reads = max(0, cur.read_count - prev.read_count)
+    writes = max(0, cur.write_count - prev.write_count)
+    ops = reads + writes
+    wait_ms = max(0, cur.read_time - prev.read_time) + max(0, cur.write_time - prev.write_time)
+    busy_ms = max(0, getattr(cur, "busy_time", 0) - getattr(prev, "busy_time", 0))
+    return {
+        "read_bps": max(0, cur.read_bytes - prev.read_bytes) / dt,
+        "write_bps": max(0, cur.write_bytes - prev.write_bytes) / dt,
+        "read_iops": reads / dt,
+        "write_iops": writes / dt,
+        # Mean time a completed request spent queued plus in service (iostat's await).
+        "await_ms": (wait_ms / ops) if ops else 0.0,
+        "util_percent": min(100.0, busy_ms / (dt * 1000.0) * 100.0),
+    }
+
+
+class DiskSubsystem:
+    # Usage of every real mount plus per-device throughput, IOPS, await and utilisation
+    # from disk_io_counters(perdisk=True) deltas. The first sample of a device reports
+    # zero rates.
+    def __init__(self) -> None:
+        self._mounts = MountTable()
+        self._primary = _primary_paths()
+        self._last_io: _IoSample | None = None
+        self._latest: dict[str, Any] | None = None
+        self._lock = Lock()
+
+    def _usage(self, mounts: list[Mount]) -> list[dict[str, Any]]:
+        items: list[dict[str, Any]] = []
+        for m in mounts:
+            try:
+                usage = psutil.disk_usage(m.mountpoint)
+            except OSError:
+                continue
+            items.append(
+                {
+                    "mountpoint": m.mountpoint,
+                    "device": m.device,
+                    "block": m.block,
+                    "fstype": m.fstype,
+                    **_usage_totals(usage),
+                }
+            )
+        return items
+
+    def _primary_usage(self, mounts: list[dict[str, Any]]) -> dict[str, Any]:
+        # The first candidate that is a listed mount or can be stat'ed on its own wins;
+        # failing all of them, the first listed mount stands in.
+        by_mountpoint = {m["mountpoint"]: m for m in mounts}
+        last_exc: Exception | None = None
+        for path in self._primary:
+            if path in by_mountpoint:
+                return by_mountpoint[path]
+            try:
+                return _usage_totals(psutil.disk_usage(path))
+            except Exception as exc:
+                last_exc = exc
+        if mounts:
+            return mounts[0]
+        raise RuntimeError("Unable to determine disk usage") from last_exc
+
+    def _devices(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        try:
+            counters = psutil.disk_io_counters(perdisk=True) or {}
+        except Exception:
+            counters = {}
+        prefixes = tuple(DISK_IO_IGNORE_PREFIXES)
+        counters = {name: c for name, c in counters.items() if not name.startswith(prefixes)}
+        last = self._last_io
+        self._last_io = _IoSample(ts_monotonic=now, counters=counters)
+        dt = (now - last.ts_monotonic) if last is not None else 0.0
+
+        items: list[dict[str, Any]] = []
+        for name in sorted(counters):
+            prev = last.counters.get(name) if last is not None else None
+            if prev is not None and dt > 0:
+                rates = _io_rates(prev, counters[name], dt)
+            else:
+                rates = dict.fromkeys(
+                    ("read_bps", "write_bps", "read_iops", "write_iops", "await_ms", "util_percent"), 0.0
+                )
+            items.append({"device": name, **rates})
+        return items
+
+    def sample(self) -> dict[str, Any]:
+        with self._lock:
+            mounts = self._usage(self._mounts.mounts())
+            primary = self._primary_usage(mounts)
+            result = {
+                "percent": primary["percent"],
+                "used_bytes": primary["used_bytes"],
+                "free_bytes": primary["free_bytes"],
+                "total_bytes": primary["total_bytes"],
+                "mounts": mounts,
+                "devices": self._devices(),
+            }
+            self._latest = result
+            return result
+
+    def latest(self) -> dict[str, Any]:
+        # Readers outside the scheduler reuse the last tick's sample so their calls do
+        # not shorten the I/O delta window.
+        with self._lock:
+            latest = self._latest
+        return latest if latest is not None else self.sample()
+
+    def stats(self) -> dict[str, Any]:
+        return {"mount_reloads": self._mounts.reloads}
+
+
+_SUBSYSTEM: DiskSubsystem | None = None
+_SUBSYSTEM_LOCK = Lock()
+
+
+def get_disk_subsystem() -> DiskSubsystem:
+    global _SUBSYSTEM
+    if _SUBSYSTEM is None:
+        with _SUBSYSTEM_LOCK:
+            if _SUBSYSTEM is None:
+                _SUBSYSTEM = DiskSubsystem()
+    return _SUBSYSTEM
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import logging
+import time
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from app.core.config import (
+    DOCKER_API_TIMEOUT_SECONDS,
+    DOCKER_NUM_POOLS,
+    DOCKER_POOL_SIZE,
+    DOCKER_RECONNECT_BACKOFF_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _get_docker():
+    try:
+        import docker  # type: ignore
+
+        return docker
+    except Exception:
+        return None
+
+
+def _is_connection_error(err: Exception) -> bool:
+    try:
+        import requests  # type: ignore
+    except Exception:
+        return False
+    return isinstance(err, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _resize_adapter_pools(client: Any, num_pools: int) -> None:
+    try:
+        from urllib3._collections import RecentlyUsedContainer  # type: ignore
+    except Exception:
+        return
+    for adapter in client.adapters.values():
+        pools = getattr(adapter, "pools", None)
+        if not isinstance(pools, RecentlyUsedContainer):
+            continue
+        resized = RecentlyUsedContainer(num_pools, dispose_func=lambda p: p.close())
+        # Keep the pool the constructor's /version call already opened.
+        for key in pools.keys():
+            resized[key] = pools[key]
+        adapter.pools = resized
+
+
+class DockerClientHandle:
+    # One low-level APIClient (a requests session with a pooled adapter) shared by every
+    # Docker reader. A connection-level failure drops it; the next call reconnects, but
+    # not before the backoff so a stopped engine is not hammered every tick.
+    # `generation` bumps on each successful (re)connect so callers can tell a fresh
+    # connection from the one they last used.
+    def __init__(self) -> None:
+        self._client: Any = None
+        self._lock = Lock()
+        self._retry_after_mono = 0.0
+        self._last_error: Exception | None = None
+        self.generation = 0
+
+    def _connect(self) -> Any:
+        docker = _get_docker()
+        if docker is None:
+            raise RuntimeError("python package 'docker' not installed")
+        client = docker.APIClient(
+            timeout=DOCKER_API_TIMEOUT_SECONDS,
+            max_pool_size=DOCKER_POOL_SIZE,
+            **docker.utils.kwargs_from_env(),
+        )
+        # APIClient drops num_pools for non-ssh hosts, and the unix/npipe adapters
+        # key pools by request URL, so resize the adapter's pool map directly.
+        _resize_adapter_pools(client, DOCKER_NUM_POOLS)
+        return client
+
+    def get(self) -> Any:
+        with self._lock:
+            if self._client is not None:
+                return self._client
+            if self._last_error is not None and time.monotonic() < self._retry_after_mono:
+                raise self._last_error
+            try:
+                self._client = self._connect()
+            except Exception as e:
+                self._last_error = e
+                self._retry_after_mono = time.monotonic() + DOCKER_RECONNECT_BACKOFF_SECONDS
+                raise
+            self._last_error = None
+            self.generation += 1
+            return self._client
+
+    def reset(self, err: Exception | None = None, *, client: Any = None) -> None:
+        # With `client` given, only that client is dropped; another thread may already
+        # have replaced it with a working one.
+        with self._lock:
+            if client is not None and client is not self._client:
+                return
+            dropped, self._client = self._client, None
+            if err is not None:
+                self._last_error = err
+                self._retry_after_mono = time.monotonic() + DOCKER_RECONNECT_BACKOFF_SECONDS
+        if dropped is not None:
+            logger.info("Dropping Docker client: %s", err)
+            try:
+                dropped.close()
+            except Exception:
+                pass
+
+    def call(self, fn: Callable[[Any], T]) -> T:
+        client = self.get()
+        try:
+            return fn(client)
+        except Exception as e:
+            if _is_connection_error(e):
+                self.reset(e, client=client)
+            raise
+
+
+_HANDLE = DockerClientHandle()
+
+
+def get_docker_handle() -> DockerClientHandle:
+    return _HANDLE
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from threading import Lock
 from typing import Any
 
+from app.collectors.docker_client import _get_docker, get_docker_handle
+
 
 def _humanize_docker_error(err: Exception) -> str:
     msg = (str(err) or "").strip()
@@ -33,23 +37,12 @@ def _humanize_docker_error(err: Exception) -> str:
     return first_line
 
 
-def _get_docker():
-    try:
-        import docker  # type: ignore
-
-        return docker
-    except Exception:
-        return None
-
-
 def docker_available() -> tuple[bool, str]:
-    docker = _get_docker()
-    if docker is None:
+    if _get_docker() is None:
         return False, "python package 'docker' not installed"
 
     try:
-        client = docker.from_env()
-        client.ping()
+        get_docker_handle().call(lambda api: api.ping())
         return True, "ok"
     except Exception as e:
         return False, _humanize_docker_error(e)
@@ -64,70 +57,98 @@ def _safe_iso(value: Any) -> str | None:
         return None
 
 
-def _format_ports(attrs: dict[str, Any] | None) -> list[str]:
-    if not attrs:
-        return []
-    try:
-        ports = attrs.get("NetworkSettings", {}).get("Ports", {}) or {}
-    except Exception:
-        ports = {}
-
+def _format_ports(ports: Any) -> list[str]:
     results: list[str] = []
-    if not isinstance(ports, dict):
+    if not isinstance(ports, list):
         return results
-
-    for container_port, bindings in ports.items():
-        if not bindings:
+    for p in ports:
+        if not isinstance(p, dict) or not p.get("PublicPort"):
             continue
-        if isinstance(bindings, list):
-            for b in bindings:
-                if not isinstance(b, dict):
-                    continue
-                host_ip = b.get("HostIp") or "0.0.0.0"
-                host_port = b.get("HostPort")
-                if host_port:
-                    results.append(f"{host_ip}:{host_port}->{container_port}")
-        elif isinstance(bindings, dict):
-            host_ip = bindings.get("HostIp") or "0.0.0.0"
-            host_port = bindings.get("HostPort")
-            if host_port:
-                results.append(f"{host_ip}:{host_port}->{container_port}")
+        host_ip = p.get("IP") or "0.0.0.0"
+        results.append(f"{host_ip}:{p['PublicPort']}->{p.get('PrivatePort')}/{p.get('Type') or 'tcp'}")
     return results
 
 
+def _epoch_iso(value: Any) -> str | None:
+    try:
+        return datetime.fromtimestamp(int(value), tz=timezone.utc).isoformat()
+    except Exception:
+        return None
+
+
+# id -> (State, details from inspect). /containers/json has no StartedAt or RestartCount,
+# so a container is inspected only when its state changed or it (re)started within the
+# last minute ("Up N seconds"); a steady set of containers costs one request per listing.
+_DETAILS: dict[str, tuple[str, dict[str, Any]]] = {}
+_DETAILS_LOCK = Lock()
+
+
+def _needs_inspect(cid: str, state: str, status: str) -> bool:
+    cached = _DETAILS.get(cid)
+    if cached is None or cached[0] != state:
+        return True
+    lower = status.lower()
+    return state == "restarting" or ("up " in lower and "second" in lower)
+
+
+def _inspect_details(api: Any, cid: str) -> dict[str, Any]:
+    attrs = api.inspect_container(cid) or {}
+    state = attrs.get("State") or {}
+    return {
+        "created": _safe_iso(attrs.get("Created")),
+        "started_at": _safe_iso(state.get("StartedAt") if isinstance(state, dict) else None),
+        "restart_count": int(attrs.get("RestartCount") or 0),
+    }
+
+
 def list_containers(*, include_stopped: bool = True) -> list[dict[str, Any]]:
-    docker = _get_docker()
-    if docker is None:
+    if _get_docker() is None:
         return []
 
+    handle = get_docker_handle()
     try:
-        client = docker.from_env()
-        containers = client.containers.list(all=bool(include_stopped))
+        summaries = handle.call(lambda api: api.containers(all=bool(include_stopped)))
     except Exception:
         return []
 
     items: list[dict[str, Any]] = []
-    for c in containers:
-        try:
-            attrs = getattr(c, "attrs", None) or {}
-            state = (attrs.get("State") or {}) if isinstance(attrs, dict) else {}
-            name = getattr(c, "name", None) or attrs.get("Name") or ""
-            if isinstance(name, str) and name.startswith("/"):
-                name = name[1:]
-            item = {
-                "id": getattr(c, "id", "") or "",
-                "name": str(name or ""),
-                "image": str(getattr(getattr(c, "image", None), "tags", None) or (attrs.get("Config", {}).get("Image") if isinstance(attrs, dict) else "") or ""),
-                "status": str(getattr(c, "status", "") or ""),
-                "state": str(state.get("Status") or getattr(c, "status", "") or ""),
-                "created": _safe_iso(attrs.get("Created") if isinstance(attrs, dict) else None),
-                "started_at": _safe_iso(state.get("StartedAt") if isinstance(state, dict) else None),
-                "restart_count": int(attrs.get("RestartCount") or state.get("RestartCount") or 0),
-                "ports": _format_ports(attrs if isinstance(attrs, dict) else None),
-            }
-            items.append(item)
-        except Exception:
-            continue
+    live: set[str] = set()
+    with _DETAILS_LOCK:
+        for c in summaries or []:
+            try:
+                cid = str(c.get("Id") or "")
+                names = c.get("Names") or []
+                name = str(names[0] if names else "")
+                if name.startswith("/"):
+                    name = name[1:]
+                state = str(c.get("State") or "")
+                live.add(cid)
+
+                if _needs_inspect(cid, state, str(c.get("Status") or "")):
+                    try:
+                        details = handle.call(lambda api: _inspect_details(api, cid))
+                    except Exception:
+                        details = (_DETAILS.get(cid) or ("", {}))[1]
+                    _DETAILS[cid] = (state, details)
+                details = _DETAILS[cid][1]
+
+                items.append(
+                    {
+                        "id": cid,
+                        "name": name,
+                        "image": str(c.get("Image") or ""),
+                        "status": state,
+                        "state": state,
+                        "created": details.get("created") or _epoch_iso(c.get("Created")),
+                        "started_at": details.get("started_at"),
+                        "restart_count": int(details.get("restart_count") or 0),
+                        "ports": _format_ports(c.get("Ports")),
+                    }
+                )
+            except Exception:
+                continue
+        for cid in [k for k in _DETAILS if k not in live]:
+            del _DETAILS[cid]
 
     items.sort(key=lambda x: (str(x.get("name") or ""), str(x.get("id") or "")))
     return items
@@ -176,31 +197,18 @@ def _extract_network_bytes(stats: dict[str, Any]) -> tuple[int, int]:
     return rx, tx
 
 
-def get_container_stats(container_id: str) -> dict[str, Any]:
-    docker = _get_docker()
-    if docker is None:
-        return {
-            "cpu_percent": 0.0,
-            "mem_usage_bytes": 0,
-            "mem_limit_bytes": 0,
-            "mem_percent": 0.0,
-            "net_rx_bytes": 0,
-            "net_tx_bytes": 0,
-        }
+def empty_container_stats() -> dict[str, Any]:
+    return {
+        "cpu_percent": 0.0,
+        "mem_usage_bytes": 0,
+        "mem_limit_bytes": 0,
+        "mem_percent": 0.0,
+        "net_rx_bytes": 0,
+        "net_tx_bytes": 0,
+    }
 
-    try:
-        client = docker.from_env()
-        stats = client.api.stats(container_id, stream=False)
-    except Exception:
-        return {
-            "cpu_percent": 0.0,
-            "mem_usage_bytes": 0,
-            "mem_limit_bytes": 0,
-            "mem_percent": 0.0,
-            "net_rx_bytes": 0,
-            "net_tx_bytes": 0,
-        }
 
+def parse_container_stats(stats: dict[str, Any]) -> dict[str, Any]:
     try:
         mem_stats = stats.get("memory_stats") or {}
         mem_usage = int(mem_stats.get("usage") or 0)
@@ -216,12 +224,15 @@ def get_container_stats(container_id: str) -> dict[str, Any]:
             "net_tx_bytes": int(tx),
         }
     except Exception:
-        return {
-            "cpu_percent": 0.0,
-            "mem_usage_bytes": 0,
-            "mem_limit_bytes": 0,
-            "mem_percent": 0.0,
-            "net_rx_bytes": 0,
-            "net_tx_bytes": 0,
-        }
+        return empty_container_stats()
+
 
+def get_container_stats(container_id: str) -> dict[str, Any]:
+    if _get_docker() is None:
+        return empty_container_stats()
+
+    try:
+        stats = get_docker_handle().call(lambda api: api.stats(container_id, stream=False))
+    except Exception:
+        return empty_container_stats()
+    return parse_container_stats(stats)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.collectors.network_quality import LatencyWindow, NetworkClassifier
+from app.core.config import (
+    NETWORK_PING_TIMEOUT_MS,
+    NETWORK_PROBE_TARGETS,
+    NETWORK_PROBE_TCP_PORT,
+    NETWORK_PROBE_WINDOW,
+)
+
+logger = logging.getLogger(__name__)
+
+METHOD_ICMP: str = "icmp"
+METHOD_TCP: str = "tcp"
+
+_ICMP_ECHO_REQUEST = 8
+_ICMP_ECHO_REPLY = 0
+_ICMP_AVAILABLE: bool | None = None
+_SEQ = itertools.count(1)
+
+
+def icmp_available() -> bool:
+    # Unprivileged ICMP ("ping") sockets: Linux with net.ipv4.ping_group_range
+    # covering our gid, and macOS. Anything else gets TCP-connect timing.
+    global _ICMP_AVAILABLE
+    if _ICMP_AVAILABLE is None:
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except (OSError, AttributeError):
+            _ICMP_AVAILABLE = False
+        else:
+            sock.close()
+            _ICMP_AVAILABLE = True
+    return _ICMP_AVAILABLE
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _echo_request(seq: int) -> bytes:
+    payload = os.urandom(8)
+    header = struct.pack("!BBHHH", _ICMP_ECHO_REQUEST, 0, 0, 0, seq)
+    return struct.pack("!BBHHH", _ICMP_ECHO_REQUEST, 0, _checksum(header + payload), 0, seq) + payload
+
+
+def _parse_target(target: str) -> tuple[str, int | None]:
+    host, sep, port = target.rpartition(":")
+    if sep and port.isdigit() and ":" not in host:
+        return host, int(port)
+    return target, None
+
+
+@dataclass
+class _TargetWindow:
+    host: str
+    port: int | None
+    samples: LatencyWindow
+    last_method: str | None = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "method": self.last_method,
+            "latency_ms": self.samples.last,
+            **self.samples.stats(),
+        }
+
+
+@dataclass
+class LatencyProber:
+    targets: list[str] = field(default_factory=lambda: list(NETWORK_PROBE_TARGETS))
+    timeout_ms: int = NETWORK_PING_TIMEOUT_MS
+    tcp_port: int = NETWORK_PROBE_TCP_PORT
+    window: int = NETWORK_PROBE_WINDOW
+    use_icmp: bool | None = None
+    _windows: dict[str, _TargetWindow] = field(default_factory=dict)
+    _rounds: LatencyWindow = field(init=False)
+    _classifier: NetworkClassifier = field(default_factory=NetworkClassifier)
+    _last: dict[str, Any] | None = None
+    _last_mono: float | None = None
+
+    def __post_init__(self) -> None:
+        self._rounds = LatencyWindow(self.window)
+        for target in self.targets:
+            host, port = _parse_target(target)
+            self._windows[target] = _TargetWindow(
+                host=host, port=port, samples=LatencyWindow(self.window)
+            )
+
+    async def _probe_icmp(self, host: str) -> float | None:
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+        addr = infos[0][4][0]
+        seq = next(_SEQ) & 0xFFFF
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        sock.setblocking(False)
+        try:
+            # connect() + sock_sendall rather than sock_sendto, which needs Python 3.11.
+            sock.connect((addr, 0))
+            started = time.perf_counter()
+            await loop.sock_sendall(sock, _echo_request(seq))
+            while True:
+                data = await loop.sock_recv(sock, 1024)
+                # macOS hands back the IP header too; Linux starts at the ICMP header.
+                if data and data[0] >> 4 == 4 and len(data) >= 20:
+                    data = data[(data[0] & 0x0F) * 4 :]
+                if len(data) >= 8:
+                    icmp_type, _, _, _, reply_seq = struct.unpack("!BBHHH", data[:8])
+                    if icmp_type == _ICMP_ECHO_REPLY and reply_seq == seq:
+                        return (time.perf_counter() - started) * 1000.0
+        finally:
+            sock.close()
+
+    async def _probe_tcp(self, host: str, port: int) -> float | None:
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except ConnectionRefusedError:
+            # A RST is still a round trip to the host.
+            return (time.perf_counter() - started) * 1000.0
+        elapsed = (time.perf_counter() - started) * 1000.0
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        return elapsed
+
+    async def _probe_target(self, win: _TargetWindow) -> float | None:
+        timeout = max(0.05, self.timeout_ms / 1000.0)
+        use_icmp = icmp_available() if self.use_icmp is None else self.use_icmp
+        method = METHOD_ICMP if (use_icmp and win.port is None) else METHOD_TCP
+        try:
+            if method == METHOD_ICMP:
+                latency = await asyncio.wait_for(self._probe_icmp(win.host), timeout)
+            else:
+                latency = await asyncio.wait_for(
+                    self._probe_tcp(win.host, win.port or self.tcp_port), timeout
+                )
+        except (asyncio.TimeoutError, OSError):
+            latency = None
+        except Exception:
+            # Anything else is still just a lost sample; it must not fail the round.
+            logger.debug("Probe of %s failed", win.host, exc_info=True)
+            latency = None
+        win.last_method = method
+        win.samples.push(latency)
+        return latency
+
+    async def probe_once(self) -> dict[str, Any]:
+        windows = list(self._windows.values())
+        latencies = await asyncio.gather(*(self._probe_target(w) for w in windows))
+        ok = [lat for lat in latencies if lat is not None]
+        # The fastest reachable target stands for the link; one blocked target
+        # should not make the machine look offline.
+        best = min(ok) if ok else None
+        self._rounds.push(best)
+        result = {
+            "latency_ms": best,
+            "status": self._classifier.update(self._rounds),
+            **self._rounds.stats(),
+            "targets": [w.stats() for w in windows],
+        }
+        self._last = result
+        self._last_mono = time.monotonic()
+        return result
+
+    async def latest_or_probe(self, max_age_seconds: float) -> dict[str, Any]:
+        if self._last is not None and self._last_mono is not None:
+            if (time.monotonic() - self._last_mono) <= max_age_seconds:
+                return self._last
+        return await self.probe_once()
+
+
+_DEFAULT_PROBER: LatencyProber | None = None
+
+
+def get_default_prober() -> LatencyProber:
+    global _DEFAULT_PROBER
+    if _DEFAULT_PROBER is None:
+        _DEFAULT_PROBER = LatencyProber()
+    return _DEFAULT_PROBER
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import psutil
 
+from app.collectors.procfs import get_sampler
+
 
 def collect_memory() -> dict[str, float | int]:
+    sampler = get_sampler()
+    if sampler is not None:
+        return sampler.memory()
     mem = psutil.virtual_memory()
     return {
         "percent": float(mem.percent),
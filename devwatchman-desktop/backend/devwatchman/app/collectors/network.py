@@ -5,6 +5,8 @@ from dataclasses import dataclass
 
 import psutil
 
+from app.collectors.procfs import get_sampler
+
 
 @dataclass
 class _NetSample:
@@ -19,6 +21,10 @@ _last_sample: _NetSample | None = None
 def collect_network() -> dict[str, float]:
     global _last_sample
 
+    sampler = get_sampler()
+    if sampler is not None:
+        return sampler.network()
+
     now = time.monotonic()
     counters = psutil.net_io_counters()
     current = _NetSample(
@@ -1,38 +1,159 @@
 from __future__ import annotations
 
-import re
-import subprocess
-
-_TIME_RE = re.compile(r"time[=<]\s*(\d+)ms", re.IGNORECASE)
-
-
-def ping_latency_ms(host: str, timeout_ms: int) -> float | None:
-    try:
-        proc = subprocess.run(
-            ["ping", "-n", "1", "-w", str(timeout_ms), host],
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=max(1.0, (timeout_ms / 1000.0) + 1.0),
-        )
-    except Exception:
-        return None
-
-    output = f"{proc.stdout}\n{proc.stderr}"
-    match = _TIME_RE.search(output)
-    if not match:
-        return None
-    try:
-        return float(match.group(1))
-    except ValueError:
-        return None
-
-
-def classify_network(latency_ms: float | None) -> str:
-    if latency_ms is None:
-        return "offline"
-    if latency_ms <= 50:
+import math
+from array import array
+from bisect import bisect_left, insort
+from typing import Any
+
+from app.core.config import (
+    NETWORK_GOOD_LOSS_PERCENT,
+    NETWORK_GOOD_P95_MS,
+    NETWORK_HYSTERESIS_MARGIN_PERCENT,
+    NETWORK_OFFLINE_ROUNDS,
+    NETWORK_OK_LOSS_PERCENT,
+    NETWORK_OK_P95_MS,
+    NETWORK_STATUS_CONFIRM_ROUNDS,
+)
+
+_LEVELS: tuple[str, ...] = ("good", "ok", "poor")
+_LOST = math.nan
+
+
+class LatencyWindow:
+    # Fixed-size ring of probe results (NaN = lost). Loss, jitter and the sorted view used
+    # for percentiles are updated on push/evict, so stats() never rescans the window.
+    # Jitter is the mean |delta| between adjacent rounds that both got an answer.
+    def __init__(self, size: int) -> None:
+        self.size = max(1, int(size))
+        self._values = array("d", [_LOST] * self.size)
+        self._pos = 0
+        self._count = 0
+        self._lost = 0
+        self._lost_streak = 0
+        self._sorted: list[float] = []
+        self._diff_sum = 0.0
+        self._diff_count = 0
+        self.last: float | None = None
+
+    def _slot(self, age: int) -> float:
+        # age 0 = newest sample.
+        return self._values[(self._pos - 1 - age) % self.size]
+
+    def push(self, latency_ms: float | None) -> None:
+        value = _LOST if latency_ms is None else float(latency_ms)
+
+        if self._count == self.size:
+            oldest = self._values[self._pos]
+            if math.isnan(oldest):
+                self._lost -= 1
+            else:
+                del self._sorted[bisect_left(self._sorted, oldest)]
+                after = self._values[(self._pos + 1) % self.size]
+                if self.size > 1 and not math.isnan(after):
+                    self._diff_sum -= abs(after - oldest)
+                    self._diff_count -= 1
+        else:
+            self._count += 1
+
+        if self._count > 1 and not math.isnan(value):
+            prev = self._slot(0)
+            if not math.isnan(prev):
+                self._diff_sum += abs(value - prev)
+                self._diff_count += 1
+
+        self._values[self._pos] = value
+        self._pos = (self._pos + 1) % self.size
+        if math.isnan(value):
+            self._lost += 1
+            self._lost_streak += 1
+            self.last = None
+        else:
+            insort(self._sorted, value)
+            self._lost_streak = 0
+            self.last = value
+
+    @property
+    def lost_streak(self) -> int:
+        return self._lost_streak
+
+    @property
+    def answered(self) -> int:
+        return len(self._sorted)
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._sorted:
+            return None
+        # Nearest-rank, so p95 is always a latency that was actually observed.
+        rank = max(1, math.ceil(pct / 100.0 * len(self._sorted)))
+        return self._sorted[rank - 1]
+
+    def stats(self) -> dict[str, Any]:
+        ok = len(self._sorted)
+        return {
+            "samples": self._count,
+            "loss_percent": (100.0 * self._lost / self._count) if self._count else None,
+            "avg_ms": (math.fsum(self._sorted) / ok) if ok else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self._sorted[-1] if ok else None,
+            "jitter_ms": (max(0.0, self._diff_sum) / self._diff_count) if self._diff_count else None,
+        }
+
+
+def _level(latency_ms: float, loss_percent: float, margin: float) -> str:
+    # margin < 1 tightens the thresholds, used when checking for an improvement.
+    if latency_ms <= NETWORK_GOOD_P95_MS * margin and loss_percent <= NETWORK_GOOD_LOSS_PERCENT * margin:
         return "good"
-    if latency_ms <= 150:
+    if latency_ms <= NETWORK_OK_P95_MS * margin and loss_percent <= NETWORK_OK_LOSS_PERCENT * margin:
         return "ok"
     return "poor"
+
+
+class NetworkClassifier:
+    # Status from window stats rather than the last sample. Going offline needs
+    # NETWORK_OFFLINE_ROUNDS lost rounds in a row; moving between good/ok/poor needs the
+    # new level on NETWORK_STATUS_CONFIRM_ROUNDS consecutive rounds, and an improvement
+    # must also clear the threshold by NETWORK_HYSTERESIS_MARGIN_PERCENT.
+    def __init__(self) -> None:
+        self.status: str | None = None
+        self._candidate: str | None = None
+        self._candidate_rounds = 0
+
+    def update(self, window: LatencyWindow) -> str:
+        stats = window.stats()
+        # Nearest-rank p95 only stops being the maximum at 20 answered rounds; before
+        # that the median stands in so one slow probe cannot mark the link poor.
+        latency = stats["p95_ms"] if window.answered >= 20 else stats["p50_ms"]
+        if window.lost_streak >= NETWORK_OFFLINE_ROUNDS or latency is None:
+            self.status = "offline"
+            self._candidate = None
+            return self.status
+        if window.lost_streak:
+            # A single lost round holds the current status until it is confirmed either way.
+            return self.status or "offline"
+
+        loss = float(stats["loss_percent"] or 0.0)
+        current = self.status
+        if current is None or current == "offline":
+            self.status = _level(latency, loss, 1.0)
+            self._candidate = None
+            return self.status
+
+        raw = _level(latency, loss, 1.0)
+        if _LEVELS.index(raw) < _LEVELS.index(current):
+            raw = _level(latency, loss, 1.0 - NETWORK_HYSTERESIS_MARGIN_PERCENT / 100.0)
+            if _LEVELS.index(raw) > _LEVELS.index(current):
+                raw = current
+        if raw == current:
+            self._candidate = None
+            return current
+
+        if raw == self._candidate:
+            self._candidate_rounds += 1
+        else:
+            self._candidate = raw
+            self._candidate_rounds = 1
+        if self._candidate_rounds >= NETWORK_STATUS_CONFIRM_ROUNDS:
+            self.status = raw
+            self._candidate = None
+        return self.status
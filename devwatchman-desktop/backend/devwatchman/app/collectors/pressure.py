@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from threading import Lock
+
+from app.collectors.procfs import ProcFile
+
+logger = logging.getLogger(__name__)
+
+# (snapshot prefix, /proc/pressure file). System-wide "full" CPU pressure is not
+# defined (newer kernels print zeros), so only memory and io keep their full line.
+_RESOURCES: tuple[tuple[str, str, tuple[bytes, ...]], ...] = (
+    ("psi_cpu", "/proc/pressure/cpu", (b"some",)),
+    ("psi_mem", "/proc/pressure/memory", (b"some", b"full")),
+    ("psi_io", "/proc/pressure/io", (b"some", b"full")),
+)
+
+
+def _parse_pressure(data: bytes) -> dict[bytes, tuple[float, int]]:
+    # "some avg10=0.96 avg60=1.19 avg300=2.53 total=74047563" -> {b"some": (0.96, 74047563)}
+    lines: dict[bytes, tuple[float, int]] = {}
+    for line in data.splitlines():
+        kind, _, rest = line.partition(b" ")
+        avg10 = 0.0
+        total = 0
+        for part in rest.split():
+            if part.startswith(b"avg10="):
+                avg10 = float(part[6:])
+            elif part.startswith(b"total="):
+                total = int(part[6:])
+        lines[kind] = (avg10, total)
+    return lines
+
+
+class PressureSampler:
+    # Pressure stall information from /proc/pressure. Each line gives the kernel's
+    # 10s average plus a cumulative stall time in microseconds; the total's delta
+    # over the tick is the share of wall time some (or all) tasks were stalled in
+    # exactly the interval the snapshot stands for.
+    def __init__(self) -> None:
+        self._files = [(prefix, ProcFile(path, size=512), kinds) for prefix, path, kinds in _RESOURCES]
+        self._last_totals: dict[str, int] = {}
+        self._last_mono: float | None = None
+
+    def close(self) -> None:
+        for _, f, _ in self._files:
+            f.close()
+
+    def sample(self) -> dict[str, float]:
+        now = time.monotonic()
+        dt = (now - self._last_mono) if self._last_mono is not None else 0.0
+        result: dict[str, float] = {}
+        totals: dict[str, int] = {}
+        for prefix, f, kinds in self._files:
+            lines = _parse_pressure(f.read())
+            for kind in kinds:
+                entry = lines.get(kind)
+                if entry is None:
+                    continue
+                key = f"{prefix}_{kind.decode()}"
+                avg10, total = entry
+                result[f"{key}_avg10"] = avg10
+                totals[key] = total
+                prev = self._last_totals.get(key)
+                if prev is not None and dt > 0 and total >= prev:
+                    result[f"{key}_pct"] = round(min(100.0, (total - prev) / (dt * 1_000_000.0) * 100.0), 2)
+                else:
+                    result[f"{key}_pct"] = 0.0
+        self._last_totals = totals
+        self._last_mono = now
+        return result
+
+
+_SAMPLER: PressureSampler | None = None
+_SAMPLER_FAILED: bool = False
+_SAMPLER_LOCK = Lock()
+
+
+def get_pressure_sampler() -> PressureSampler | None:
+    global _SAMPLER, _SAMPLER_FAILED
+    if _SAMPLER is not None or _SAMPLER_FAILED:
+        return _SAMPLER
+    with _SAMPLER_LOCK:
+        if _SAMPLER is not None or _SAMPLER_FAILED:
+            return _SAMPLER
+        if not sys.platform.startswith("linux"):
+            _SAMPLER_FAILED = True
+            return None
+        try:
+            _SAMPLER = PressureSampler()
+        except OSError as e:
+            # Kernels built without CONFIG_PSI, or booted with psi=0.
+            logger.info("Pressure stall information unavailable: %s", e)
+            _SAMPLER_FAILED = True
+        return _SAMPLER
+
+
+def collect_pressure() -> dict[str, float]:
+    sampler = get_pressure_sampler()
+    if sampler is None:
+        return {}
+    return sampler.sample()
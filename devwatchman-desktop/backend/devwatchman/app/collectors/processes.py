@@ -1,85 +1,152 @@
 from __future__ import annotations
 
+import heapq
 import time
+from dataclasses import dataclass
+from threading import Lock
 from typing import Any
 
 import psutil
 
+from app.collectors.procfs_processes import get_process_scanner
+from app.core.config import PROCESS_TABLE_MIN_REFRESH_SECONDS
+
+
+@dataclass
+class _ProcEntry:
+    proc: psutil.Process
+    create_time: float
+    name: str
+    username: str
+    status: str = "unknown"
+    cpu_percent: float = 0.0
+    memory_bytes: int = 0
+    last_cpu_seconds: float | None = None
+    last_sample_mono: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "pid": int(self.proc.pid),
+            "name": self.name,
+            "cpu_percent": self.cpu_percent,
+            "memory_bytes": self.memory_bytes,
+            "status": self.status,
+            "username": self.username,
+        }
+
+
+def _new_entry(pid: int) -> _ProcEntry | None:
+    try:
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            create_time = float(proc.create_time())
+            try:
+                name = str(proc.name() or "unknown")
+            except psutil.AccessDenied:
+                name = "unknown"
+            try:
+                username = str(proc.username() or "ACCESS_DENIED")
+            except (psutil.AccessDenied, KeyError):
+                username = "ACCESS_DENIED"
+    except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+        return None
+    except Exception:
+        return None
+    return _ProcEntry(proc=proc, create_time=create_time, name=name, username=username)
 
-def get_top_processes(limit: int) -> list[dict[str, Any]]:
-    safe_limit = max(1, min(int(limit), 50))
 
-    processes: list[psutil.Process] = []
-    base_info: dict[int, dict[str, Any]] = {}
+class ProcessTable:
+    # Process objects live across calls, keyed by (pid, create_time) so a reused pid
+    # starts a fresh entry. CPU% is the delta of user+system time between refreshes,
+    # which is what psutil's cpu_percent(interval=None) computes per process.
+    def __init__(self, *, min_refresh_seconds: float = PROCESS_TABLE_MIN_REFRESH_SECONDS) -> None:
+        self.min_refresh_seconds = float(min_refresh_seconds)
+        self._entries: dict[tuple[int, float], _ProcEntry] = {}
+        self._key_by_pid: dict[int, tuple[int, float]] = {}
+        self._last_refresh_mono: float | None = None
+        self._lock = Lock()
 
-    for proc in psutil.process_iter(attrs=["pid", "name", "status", "username"]):
+    def _sample(self, entry: _ProcEntry, now: float) -> bool:
+        proc = entry.proc
         try:
-            pid = int(proc.info.get("pid") or proc.pid)
-            base_info[pid] = {
-                "pid": pid,
-                "name": str(proc.info.get("name") or "unknown"),
-                "status": str(proc.info.get("status") or "unknown"),
-                "username": str(proc.info.get("username") or "ACCESS_DENIED"),
-            }
-            processes.append(proc)
-            proc.cpu_percent(interval=None)
+            with proc.oneshot():
+                if float(proc.create_time()) != entry.create_time:
+                    return False
+                try:
+                    times = proc.cpu_times()
+                    cpu_seconds = float(times.user + times.system)
+                except psutil.AccessDenied:
+                    cpu_seconds = None
+                try:
+                    entry.memory_bytes = int(proc.memory_info().rss)
+                except psutil.AccessDenied:
+                    entry.memory_bytes = 0
+                try:
+                    entry.status = str(proc.status() or "unknown")
+                except psutil.AccessDenied:
+                    entry.status = "unknown"
         except (psutil.NoSuchProcess, psutil.ZombieProcess):
-            continue
+            return False
         except psutil.AccessDenied:
-            pid = int(getattr(proc, "pid", 0) or 0)
-            if pid:
-                base_info[pid] = {
-                    "pid": pid,
-                    "name": "unknown",
-                    "status": "unknown",
-                    "username": "ACCESS_DENIED",
-                }
-            continue
-        except Exception:
-            continue
-
-    time.sleep(0.15)
-
-    results: list[dict[str, Any]] = []
-    for proc in processes:
-        try:
-            pid = int(proc.pid)
-            info = base_info.get(pid)
-            if not info:
-                continue
+            return True
 
-            try:
-                cpu_percent = float(proc.cpu_percent(interval=None))
-            except psutil.AccessDenied:
-                cpu_percent = 0.0
+        if cpu_seconds is None:
+            entry.cpu_percent = 0.0
+        elif entry.last_cpu_seconds is not None and entry.last_sample_mono is not None:
+            dt = now - entry.last_sample_mono
+            entry.cpu_percent = (
+                round(max(0.0, (cpu_seconds - entry.last_cpu_seconds) / dt * 100.0), 1) if dt > 0 else 0.0
+            )
+        entry.last_cpu_seconds = cpu_seconds
+        entry.last_sample_mono = now
+        return True
 
-            try:
-                mem_bytes = int(proc.memory_info().rss)
-            except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
-                mem_bytes = 0
+    def refresh(self) -> None:
+        now = time.monotonic()
+        live_pids = set(psutil.pids())
 
-            username = info.get("username") or "ACCESS_DENIED"
-            if username is None or username == "":
-                username = "ACCESS_DENIED"
+        for pid in [p for p in self._key_by_pid if p not in live_pids]:
+            self._entries.pop(self._key_by_pid.pop(pid), None)
+
+        for pid in live_pids:
+            key = self._key_by_pid.get(pid)
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None and self._sample(entry, now):
+                continue
+            if key is not None:
+                self._entries.pop(key, None)
+                self._key_by_pid.pop(pid, None)
+            entry = _new_entry(pid)
+            if entry is None:
+                continue
+            key = (pid, entry.create_time)
+            self._entries[key] = entry
+            self._key_by_pid[pid] = key
+            self._sample(entry, now)
 
-            results.append(
-                {
-                    "pid": pid,
-                    "name": info.get("name") or "unknown",
-                    "cpu_percent": cpu_percent,
-                    "memory_bytes": mem_bytes,
-                    "status": info.get("status") or "unknown",
-                    "username": username,
-                }
+        self._last_refresh_mono = now
+
+    def top(self, limit: int) -> list[dict[str, Any]]:
+        with self._lock:
+            # The first refresh only takes the CPU baseline and reports 0% for every
+            # process; rates appear from the next refresh on.
+            if (
+                self._last_refresh_mono is None
+                or (time.monotonic() - self._last_refresh_mono) >= self.min_refresh_seconds
+            ):
+                self.refresh()
+            entries = heapq.nlargest(
+                limit, self._entries.values(), key=lambda e: (e.cpu_percent, e.memory_bytes)
             )
-        except (psutil.NoSuchProcess, psutil.ZombieProcess):
-            continue
-        except Exception:
-            continue
+            return [e.to_dict() for e in entries]
+
 
-    results.sort(
-        key=lambda x: (float(x.get("cpu_percent") or 0.0), int(x.get("memory_bytes") or 0)),
-        reverse=True,
-    )
-    return results[:safe_limit]
+_TABLE = ProcessTable()
 
+
+def get_top_processes(limit: int) -> list[dict[str, Any]]:
+    safe_limit = max(1, min(int(limit), 50))
+    scanner = get_process_scanner()
+    if scanner is not None:
+        return scanner.top(safe_limit)
+    return _TABLE.top(safe_limit)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from threading import Lock
+
+from app.core.config import COLLECTOR_BACKEND
+
+logger = logging.getLogger(__name__)
+
+_PROC_STAT = "/proc/stat"
+_PROC_MEMINFO = "/proc/meminfo"
+_PROC_NET_DEV = "/proc/net/dev"
+_PROC_LOADAVG = "/proc/loadavg"
+
+
+class ProcFile:
+    # Kept open for the life of the process and re-read from offset 0 with pread,
+    # so a sample costs one syscall instead of open/read/close.
+    def __init__(self, path: str, size: int = 4096) -> None:
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        self._size = size
+
+    def read(self) -> bytes:
+        while True:
+            data = os.pread(self._fd, self._size, 0)
+            if len(data) < self._size:
+                return data
+            self._size *= 2
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+@dataclass
+class _CpuSample:
+    ts_monotonic: float
+    busy: int
+    total: int
+    ctxt: int
+    intr: int
+
+
+@dataclass
+class _NetSample:
+    ts_monotonic: float
+    bytes_sent: int
+    bytes_recv: int
+
+
+class ProcfsSampler:
+    def __init__(self) -> None:
+        self._stat = ProcFile(_PROC_STAT)
+        self._meminfo = ProcFile(_PROC_MEMINFO)
+        self._net_dev = ProcFile(_PROC_NET_DEV, size=8192)
+        self._loadavg = ProcFile(_PROC_LOADAVG, size=256)
+        self._last_cpu: _CpuSample | None = None
+        self._last_net: _NetSample | None = None
+
+    def close(self) -> None:
+        for f in (self._stat, self._meminfo, self._net_dev, self._loadavg):
+            f.close()
+
+    def cpu(self) -> dict[str, float]:
+        now = time.monotonic()
+        busy = total = ctxt = intr = 0
+        for line in self._stat.read().splitlines():
+            if line.startswith(b"cpu "):
+                # user nice system idle iowait irq softirq steal [guest guest_nice];
+                # guest time is already counted in user/nice.
+                fields = [int(v) for v in line.split()[1:9]]
+                total = sum(fields)
+                idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+                busy = total - idle
+            elif line.startswith(b"ctxt "):
+                ctxt = int(line[5:])
+            elif line.startswith(b"intr "):
+                intr = int(line[5:].split(None, 1)[0])
+
+        load = self._loadavg.read().split()
+        current = _CpuSample(ts_monotonic=now, busy=busy, total=total, ctxt=ctxt, intr=intr)
+        last = self._last_cpu
+        self._last_cpu = current
+
+        result = {
+            "percent": 0.0,
+            "ctx_switches_per_sec": 0.0,
+            "interrupts_per_sec": 0.0,
+            "load_1m": float(load[0]),
+            "load_5m": float(load[1]),
+            "load_15m": float(load[2]),
+        }
+        if last is None:
+            return result
+        d_total = current.total - last.total
+        if d_total > 0:
+            result["percent"] = round(max(0.0, min(100.0, 100.0 * (current.busy - last.busy) / d_total)), 1)
+        dt = now - last.ts_monotonic
+        if dt > 0:
+            result["ctx_switches_per_sec"] = max(0.0, (current.ctxt - last.ctxt) / dt)
+            result["interrupts_per_sec"] = max(0.0, (current.intr - last.intr) / dt)
+        return result
+
+    def memory(self) -> dict[str, float | int]:
+        values: dict[bytes, int] = {}
+        for line in self._meminfo.read().splitlines():
+            key, _, rest = line.partition(b":")
+            parts = rest.split()
+            if parts:
+                values[key] = int(parts[0]) * 1024
+
+        # Same arithmetic as psutil.virtual_memory() on Linux.
+        total = values.get(b"MemTotal", 0)
+        free = values.get(b"MemFree", 0)
+        available = values.get(b"MemAvailable")
+        if available is None:
+            available = free + values.get(b"Buffers", 0) + values.get(b"Cached", 0) + values.get(b"SReclaimable", 0)
+        available = max(0, available)
+        if available > total:
+            available = free
+        used = total - available
+        percent = round(100.0 * (total - available) / total, 1) if total > 0 else 0.0
+        return {
+            "percent": float(percent),
+            "used_bytes": int(used),
+            "available_bytes": int(available),
+            "total_bytes": int(total),
+        }
+
+    def network(self) -> dict[str, float]:
+        now = time.monotonic()
+        sent = recv = 0
+        for line in self._net_dev.read().splitlines()[2:]:
+            _, _, rest = line.partition(b":")
+            fields = rest.split()
+            if len(fields) >= 9:
+                recv += int(fields[0])
+                sent += int(fields[8])
+
+        current = _NetSample(ts_monotonic=now, bytes_sent=sent, bytes_recv=recv)
+        last = self._last_net
+        self._last_net = current
+        if last is None:
+            return {"bytes_sent_per_sec": 0.0, "bytes_recv_per_sec": 0.0}
+        dt = now - last.ts_monotonic
+        if dt <= 0:
+            return {"bytes_sent_per_sec": 0.0, "bytes_recv_per_sec": 0.0}
+        return {
+            "bytes_sent_per_sec": float(max((current.bytes_sent - last.bytes_sent) / dt, 0.0)),
+            "bytes_recv_per_sec": float(max((current.bytes_recv - last.bytes_recv) / dt, 0.0)),
+        }
+
+
+_SAMPLER: ProcfsSampler | None = None
+_SAMPLER_FAILED: bool = False
+_SAMPLER_LOCK = Lock()
+
+
+def get_sampler() -> ProcfsSampler | None:
+    global _SAMPLER, _SAMPLER_FAILED
+    if _SAMPLER is not None or _SAMPLER_FAILED:
+        return _SAMPLER
+    with _SAMPLER_LOCK:
+        if _SAMPLER is not None or _SAMPLER_FAILED:
+            return _SAMPLER
+        if COLLECTOR_BACKEND == "psutil" or not sys.platform.startswith("linux"):
+            _SAMPLER_FAILED = True
+            return None
+        try:
+            _SAMPLER = ProcfsSampler()
+        except Exception:
+            logger.exception("procfs collector backend unavailable; using psutil")
+            _SAMPLER_FAILED = True
+        return _SAMPLER
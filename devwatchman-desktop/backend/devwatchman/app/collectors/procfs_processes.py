@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import heapq
+import os
+import sys
+import time
+from array import array
+from threading import Lock
+from typing import Any
+
+import psutil
+
+try:
+    import pwd
+except ImportError:  # not on Windows; the scanner is Linux-only anyway
+    pwd = None  # type: ignore[assignment]
+
+from app.core.config import PROCESS_BACKEND, PROCESS_TABLE_MIN_REFRESH_SECONDS
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Same strings psutil uses for Process.status().
+_STATUS = {
+    ord("R"): "running",
+    ord("S"): "sleeping",
+    ord("D"): "disk-sleep",
+    ord("T"): "stopped",
+    ord("t"): "tracing-stop",
+    ord("X"): "dead",
+    ord("x"): "dead",
+    ord("K"): "wake-kill",
+    ord("W"): "waking",
+    ord("I"): "idle",
+    ord("P"): "parked",
+}
+_ZOMBIE = ord("Z")
+
+
+def _read_stat(proc_fd: int | None, pid: str) -> bytes | None:
+    path = f"{pid}/stat" if proc_fd is not None else f"/proc/{pid}/stat"
+    try:
+        fd = os.open(path, os.O_RDONLY, dir_fd=proc_fd)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 1024)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _stat_fields(data: bytes) -> list[bytes]:
+    # comm may contain spaces or parens; the fields start after the last ')', so
+    # index 0 is field 3 (state) of proc(5).
+    return data[data.rfind(b")") + 2 :].split()
+
+
+def read_start_ticks(pid: int, proc_fd: int | None = None) -> int | None:
+    # Field 22 (starttime) of /proc/[pid]/stat: fixed for the life of a process, so
+    # (pid, start ticks) tells a reused pid apart. The /proc/[pid] inode's ctime is not
+    # a substitute; it changes whenever procfs evicts and re-creates the inode.
+    data = _read_stat(proc_fd, str(pid))
+    if not data:
+        return None
+    fields = _stat_fields(data)
+    return int(fields[19]) if len(fields) >= 20 else None
+
+
+class ProcfsProcessScanner:
+    # One pass over /proc/[pid]/stat per refresh into parallel array columns; the rss
+    # field there is the same counter statm reports, so one read per pid is enough.
+    # Names and usernames are only looked up for the rows that make the top-N.
+    def __init__(self, *, min_refresh_seconds: float = PROCESS_TABLE_MIN_REFRESH_SECONDS) -> None:
+        self.min_refresh_seconds = float(min_refresh_seconds)
+        self.pids = array("i")
+        self.start_ticks = array("q")
+        self.cpu_ticks = array("q")
+        self.rss_pages = array("q")
+        self.state = array("B")
+        self.cpu_percent = array("d")
+        self._index: dict[int, int] = {}
+        self._last_refresh_mono: float | None = None
+        self._names: dict[tuple[int, int], str] = {}
+        self._users: dict[int, str] = {}
+        self._lock = Lock()
+
+    def refresh(self) -> None:
+        now = time.monotonic()
+        prev_index = self._index
+        prev_start = self.start_ticks
+        prev_cpu = self.cpu_ticks
+        dt = (now - self._last_refresh_mono) if self._last_refresh_mono is not None else 0.0
+
+        pids = array("i")
+        start_ticks = array("q")
+        cpu_ticks = array("q")
+        rss_pages = array("q")
+        state = array("B")
+        cpu_percent = array("d")
+        index: dict[int, int] = {}
+
+        # Stat files are opened relative to a /proc dir fd to skip the path walk.
+        proc_fd = os.open("/proc", os.O_RDONLY)
+        try:
+            for name in os.listdir(proc_fd):
+                if not name.isdigit():
+                    continue
+                data = _read_stat(proc_fd, name)
+                if not data:
+                    continue
+                fields = _stat_fields(data)
+                if len(fields) < 22 or fields[0][0] == _ZOMBIE:
+                    continue
+                pid = int(name)
+                ticks = int(fields[11]) + int(fields[12])
+                started = int(fields[19])
+
+                pct = 0.0
+                j = prev_index.get(pid)
+                if j is not None and prev_start[j] == started and dt > 0:
+                    pct = max(0.0, (ticks - prev_cpu[j]) / _CLK_TCK / dt * 100.0)
+
+                index[pid] = len(pids)
+                pids.append(pid)
+                start_ticks.append(started)
+                cpu_ticks.append(ticks)
+                rss_pages.append(int(fields[21]))
+                state.append(fields[0][0])
+                cpu_percent.append(pct)
+        finally:
+            os.close(proc_fd)
+
+        self.pids, self.start_ticks, self.cpu_ticks = pids, start_ticks, cpu_ticks
+        self.rss_pages, self.state, self.cpu_percent = rss_pages, state, cpu_percent
+        self._index = index
+        self._last_refresh_mono = now
+
+        live = {(pids[i], start_ticks[i]) for i in range(len(pids))}
+        for key in [k for k in self._names if k not in live]:
+            del self._names[key]
+
+    def _name(self, pid: int, started: int) -> str:
+        key = (pid, started)
+        name = self._names.get(key)
+        if name is None:
+            try:
+                name = str(psutil.Process(pid).name() or "unknown")
+            except Exception:
+                name = "unknown"
+            self._names[key] = name
+        return name
+
+    def _username(self, pid: int) -> str:
+        try:
+            uid = os.stat(f"/proc/{pid}").st_uid
+        except OSError:
+            return "ACCESS_DENIED"
+        user = self._users.get(uid)
+        if user is None:
+            try:
+                user = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                user = str(uid)
+            self._users[uid] = user
+        return user
+
+    def top(self, limit: int) -> list[dict[str, Any]]:
+        with self._lock:
+            # The first refresh has no previous CPU times and reports 0% for every
+            # process; rates appear from the next refresh on.
+            if (
+                self._last_refresh_mono is None
+                or (time.monotonic() - self._last_refresh_mono) >= self.min_refresh_seconds
+            ):
+                self.refresh()
+
+            cpu, rss = self.cpu_percent, self.rss_pages
+            rows = heapq.nlargest(limit, range(len(self.pids)), key=lambda i: (cpu[i], rss[i]))
+            return [
+                {
+                    "pid": int(self.pids[i]),
+                    "name": self._name(self.pids[i], self.start_ticks[i]),
+                    "cpu_percent": round(float(cpu[i]), 1),
+                    "memory_bytes": int(rss[i]) * _PAGE_SIZE,
+                    "status": _STATUS.get(self.state[i], "unknown"),
+                    "username": self._username(self.pids[i]),
+                }
+                for i in rows
+            ]
+
+
+_SCANNER: ProcfsProcessScanner | None = None
+_SCANNER_FAILED: bool = False
+_SCANNER_LOCK = Lock()
+
+
+def get_process_scanner() -> ProcfsProcessScanner | None:
+    global _SCANNER, _SCANNER_FAILED
+    if _SCANNER is not None or _SCANNER_FAILED:
+        return _SCANNER
+    with _SCANNER_LOCK:
+        if _SCANNER is not None or _SCANNER_FAILED:
+            return _SCANNER
+        if (
+            PROCESS_BACKEND == "psutil"
+            or pwd is None
+            or not sys.platform.startswith("linux")
+            or not os.path.isdir("/proc/self")
+        ):
+            _SCANNER_FAILED = True
+            return None
+        _SCANNER = ProcfsProcessScanner()
+        return _SCANNER
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import socket
+import sys
+from functools import lru_cache
+from threading import Lock
+
+from app.collectors.procfs_processes import read_start_ticks
+from app.core.config import LISTENER_BACKEND
+
+_TCP_TABLES: tuple[tuple[str, int], ...] = (
+    ("/proc/net/tcp", socket.AF_INET),
+    ("/proc/net/tcp6", socket.AF_INET6),
+)
+_TCP_LISTEN = b"0A"
+
+
+@lru_cache(maxsize=16384)
+def _decode_address(hex_addr: bytes, family: int) -> tuple[str, int]:
+    ip_hex, _, port_hex = hex_addr.partition(b":")
+    raw = bytes.fromhex(ip_hex.decode("ascii"))
+    # The kernel prints each 32-bit word in host (little-endian) order.
+    packed = b"".join(raw[i : i + 4][::-1] for i in range(0, len(raw), 4))
+    return socket.inet_ntop(family, packed), int(port_hex, 16)
+
+
+def read_listen_rows() -> list[tuple[str, int, int]]:
+    # (local_ip, port, inode) for every TCP socket in LISTEN state.
+    rows: list[tuple[str, int, int]] = []
+    for path, family in _TCP_TABLES:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        for line in data.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) < 10 or fields[3] != _TCP_LISTEN:
+                continue
+            try:
+                ip, port = _decode_address(fields[1], family)
+                rows.append((ip, port, int(fields[9])))
+            except Exception:
+                continue
+    return rows
+
+
+class InodePidIndex:
+    # socket inode -> pid, built from /proc/[pid]/fd. Only pids that are new (or were
+    # replaced by a reused pid, told apart by their start ticks) are walked on refresh;
+    # known pids are revisited only when a listener turns up whose inode is not
+    # indexed yet.
+    def __init__(self) -> None:
+        self._pid_key: dict[int, int] = {}
+        self._pid_inodes: dict[int, set[int]] = {}
+        self._inode_pid: dict[int, int] = {}
+        self._unresolvable: set[int] = set()
+        self.fd_scans: int = 0
+
+    def _scan_pid(self, pid: int) -> None:
+        for inode in self._pid_inodes.pop(pid, ()):
+            if self._inode_pid.get(inode) == pid:
+                del self._inode_pid[inode]
+        inodes: set[int] = set()
+        self.fd_scans += 1
+        try:
+            with os.scandir(f"/proc/{pid}/fd") as it:
+                for entry in it:
+                    try:
+                        target = os.readlink(entry.path)
+                    except OSError:
+                        continue
+                    if target.startswith("socket:["):
+                        inodes.add(int(target[8:-1]))
+        except OSError:
+            pass
+        self._pid_inodes[pid] = inodes
+        for inode in inodes:
+            self._inode_pid[inode] = pid
+
+    def _drop_pid(self, pid: int) -> None:
+        self._pid_key.pop(pid, None)
+        for inode in self._pid_inodes.pop(pid, ()):
+            if self._inode_pid.get(inode) == pid:
+                del self._inode_pid[inode]
+
+    def resolve(self, inodes: set[int]) -> dict[int, int]:
+        live: dict[int, int] = {}
+        proc_fd = os.open("/proc", os.O_RDONLY)
+        try:
+            for name in os.listdir(proc_fd):
+                if not name.isdigit():
+                    continue
+                started = read_start_ticks(int(name), proc_fd)
+                if started is not None:
+                    live[int(name)] = started
+        finally:
+            os.close(proc_fd)
+
+        for pid in [p for p in self._pid_key if p not in live]:
+            self._drop_pid(pid)
+        for pid, key in live.items():
+            if self._pid_key.get(pid) != key:
+                self._pid_key[pid] = key
+                self._scan_pid(pid)
+
+        self._unresolvable &= inodes
+        missing = {i for i in inodes if i not in self._inode_pid and i not in self._unresolvable}
+        if missing:
+            for pid in live:
+                self._scan_pid(pid)
+                missing = {i for i in missing if i not in self._inode_pid}
+                if not missing:
+                    break
+            # Sockets owned by processes we cannot inspect; don't rescan for them again.
+            self._unresolvable |= missing
+
+        return {i: self._inode_pid[i] for i in inodes if i in self._inode_pid}
+
+
+_INDEX = InodePidIndex()
+_INDEX_LOCK = Lock()
+
+
+def procfs_listeners_available() -> bool:
+    return (
+        LISTENER_BACKEND != "psutil"
+        and sys.platform.startswith("linux")
+        and os.path.exists("/proc/net/tcp")
+    )
+
+
+def scan_listeners_procfs() -> list[tuple[str, int, int]]:
+    rows = read_listen_rows()
+    with _INDEX_LOCK:
+        pids = _INDEX.resolve({inode for _, _, inode in rows})
+    return [(ip, port, pids.get(inode, 0)) for ip, port, inode in rows]
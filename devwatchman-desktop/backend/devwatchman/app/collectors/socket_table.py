@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+
+import psutil
+
+from app.collectors.procfs_processes import read_start_ticks
+from app.collectors.procfs_sockets import procfs_listeners_available, scan_listeners_procfs
+from app.core.config import SOCKET_TABLE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ListeningSocket:
+    local_ip: str
+    port: int
+    pid: int
+    process_name: str | None
+    access_denied: bool = False
+
+    def to_dict(self) -> dict:
+        if self.process_name is not None:
+            name = self.process_name
+        else:
+            name = "ACCESS_DENIED" if self.access_denied else "UNKNOWN"
+        return {
+            "local_ip": self.local_ip,
+            "port": self.port,
+            "pid": self.pid,
+            "process_name": name,
+        }
+
+
+@dataclass
+class SocketTable:
+    ts_monotonic: float
+    listeners: list[ListeningSocket] = field(default_factory=list)
+    by_port: dict[int, list[ListeningSocket]] = field(default_factory=dict)
+    by_pid: dict[int, list[ListeningSocket]] = field(default_factory=dict)
+
+    def port_status(self, watch_ports: list[int]) -> list[dict[str, int | bool | str | None]]:
+        results: list[dict[str, int | bool | str | None]] = []
+        for port in watch_ports:
+            entries = self.by_port.get(port) or []
+            owner = next((s for s in entries if s.pid > 0), entries[0] if entries else None)
+            pid = owner.pid if owner is not None and owner.pid > 0 else None
+            results.append(
+                {
+                    "port": port,
+                    "listening": owner is not None,
+                    "pid": pid,
+                    "process_name": owner.process_name if pid is not None else None,
+                }
+            )
+        return results
+
+    def listening(self, limit: int) -> list[dict]:
+        return [s.to_dict() for s in self.listeners[: max(0, int(limit))]]
+
+
+_TABLE: SocketTable | None = None
+_TABLE_LOCK = Lock()
+# (pid, start key) -> (name, access_denied); shared by every reader and pruned to live
+# listeners. The start key tells a reused pid from the process that had it before.
+_NAME_CACHE: dict[tuple[int, float], tuple[str | None, bool]] = {}
+
+
+def _start_key(pid: int) -> float | None:
+    # Start ticks from /proc/[pid]/stat, as InodePidIndex uses; elsewhere psutil's
+    # create_time().
+    try:
+        if sys.platform.startswith("linux"):
+            return read_start_ticks(pid)
+        return psutil.Process(pid).create_time()
+    except Exception:
+        return None
+
+
+def _resolve_name(pid: int) -> tuple[str | None, bool]:
+    key = _start_key(pid)
+    cached = _NAME_CACHE.get((pid, key)) if key is not None else None
+    if cached is not None:
+        return cached
+    try:
+        result: tuple[str | None, bool] = (psutil.Process(pid).name(), False)
+    except psutil.AccessDenied:
+        result = (None, True)
+    except Exception:
+        result = (None, False)
+    if key is not None:
+        _NAME_CACHE[(pid, key)] = result
+    return result
+
+
+def _scan_listeners() -> list[tuple[str, int, int]]:
+    if procfs_listeners_available():
+        try:
+            return scan_listeners_procfs()
+        except Exception:
+            logger.exception("procfs listener scan failed; falling back to psutil")
+    return _scan_listeners_psutil()
+
+
+def _scan_listeners_psutil() -> list[tuple[str, int, int]]:
+    try:
+        conns = psutil.net_connections(kind="inet")
+    except Exception:
+        return []
+
+    rows: list[tuple[str, int, int]] = []
+    for c in conns:
+        try:
+            if c.status != psutil.CONN_LISTEN or not c.laddr:
+                continue
+            rows.append((str(c.laddr.ip), int(c.laddr.port), int(c.pid) if c.pid else 0))
+        except Exception:
+            continue
+    return rows
+
+
+def _build_table(rows: list[tuple[str, int, int]]) -> SocketTable:
+    table = SocketTable(ts_monotonic=time.monotonic())
+    seen: set[tuple[str, int, int]] = set()
+    for row in sorted(rows, key=lambda r: (r[1], r[0], r[2])):
+        if row in seen:
+            continue
+        seen.add(row)
+        local_ip, port, pid = row
+        name, denied = _resolve_name(pid) if pid > 0 else (None, False)
+        sock = ListeningSocket(
+            local_ip=local_ip, port=port, pid=pid, process_name=name, access_denied=denied
+        )
+        table.listeners.append(sock)
+        table.by_port.setdefault(port, []).append(sock)
+        table.by_pid.setdefault(pid, []).append(sock)
+
+    for cache_key in list(_NAME_CACHE):
+        if cache_key[0] not in table.by_pid:
+            del _NAME_CACHE[cache_key]
+    return table
+
+
+def get_socket_table(max_age_seconds: float = SOCKET_TABLE_TTL_SECONDS) -> SocketTable:
+    global _TABLE
+    # Concurrent callers wait on the lock and then reuse the scan that just finished.
+    with _TABLE_LOCK:
+        table = _TABLE
+        if table is None or (time.monotonic() - table.ts_monotonic) >= max_age_seconds:
+            table = _build_table(_scan_listeners())
+            _TABLE = table
+        return table
@@ -4,9 +4,39 @@ from pathlib import Path
 
 APP_NAME: str = "DevWatchMan"
 DB_PATH: Path = Path(__file__).resolve().parents[2] / "devwatchman.db"
+# SQLite runs in WAL mode with one shared writer connection and a pool of read-only
+# connections; a background thread checkpoints the WAL every DB_CHECKPOINT_INTERVAL_SECONDS
+# and truncates it once it is larger than DB_WAL_TRUNCATE_BYTES.
+DB_BUSY_TIMEOUT_SECONDS: float = 10.0
+DB_READ_POOL_SIZE: int = 4
+DB_CACHE_SIZE_KIB: int = 16 * 1024
+DB_MMAP_SIZE_BYTES: int = 64 * 1024 * 1024
+DB_STATEMENT_CACHE_SIZE: int = 256
+DB_CHECKPOINT_INTERVAL_SECONDS: float = 30.0
+DB_WAL_TRUNCATE_BYTES: int = 16 * 1024 * 1024
+# Raw snapshot storage: "rows" keeps one snapshots row per sample; "blocks" packs each
+# closed, rolled-up minute into one compressed snapshot_blocks row (storage/blocks.py).
+SNAPSHOT_STORAGE_ENGINE: str = "rows"
 
 SNAPSHOT_INTERVAL_SECONDS: int = 1
+# "fixed_rate" ticks on monotonic deadlines; "fixed_delay" sleeps the interval after each tick.
+SNAPSHOT_TICK_MODE: str = "fixed_rate"
+# "skip" drops ticks that are a full interval late; "merge" runs one late tick for all of them.
+SNAPSHOT_MISSED_TICK_POLICY: str = "skip"
+# Adaptive sampling stretches the tick when nobody is watching or the host is idle,
+# and drops back to SNAPSHOT_INTERVAL_SECONDS near a profile alert threshold.
+ADAPTIVE_SAMPLING_ENABLED: bool = True
+ADAPTIVE_NO_CLIENT_INTERVAL_SECONDS: float = 10.0
+ADAPTIVE_HIDDEN_INTERVAL_SECONDS: float = 5.0
+ADAPTIVE_IDLE_INTERVAL_SECONDS: float = 3.0
+ADAPTIVE_IDLE_CPU_PERCENT: float = 10.0
+ADAPTIVE_IDLE_AFTER_SECONDS: float = 30.0
+ADAPTIVE_NEAR_THRESHOLD_MARGIN_PERCENT: float = 15.0
 HISTORY_DEFAULT_HOURS: int = 24
+# The in-memory hot tier (services/hot_tier.py) holds the last HOT_TIER_HOURS of raw
+# snapshots at SNAPSHOT_INTERVAL_SECONDS (slower adaptive ticks stretch it further).
+# Its arrays are preallocated at ~224 bytes per sample: ~4.8 MB for 6 hours at 1 Hz.
+HOT_TIER_HOURS: float = 6.0
 
 WATCH_PORTS: list[int] = [3000, 5173, 8000, 1433, 5672, 15672]
 
@@ -18,9 +48,110 @@ ALERT_COOLDOWN_SECONDS: int = 60
 ALERT_CPU_DURATION_SECONDS: int = 30
 ALERT_RAM_DURATION_SECONDS: int = 30
 ALERT_NET_OFFLINE_SECONDS: int = 10
+# Pressure stall limits are the kernel's 10s average (% of time some/all tasks were
+# stalled on the resource) and must hold for ALERT_PRESSURE_DURATION_SECONDS.
+ALERT_PSI_CPU_SOME_PERCENT: float = 40.0
+ALERT_PSI_MEM_SOME_PERCENT: float = 10.0
+ALERT_PSI_MEM_FULL_PERCENT: float = 5.0
+ALERT_PSI_IO_SOME_PERCENT: float = 30.0
+ALERT_PRESSURE_DURATION_SECONDS: int = 30
+# TCP socket counts from /proc/net/sockstat, held for ALERT_SOCKETS_DURATION_SECONDS.
+ALERT_TCP_TIME_WAIT: int = 20000
+ALERT_TCP_ORPHANS: int = 1000
+ALERT_SOCKETS_DURATION_SECONDS: int = 60
 
 FLAP_THRESHOLD: int = 6
 FLAP_WINDOW_SECONDS: int = 120
 
 NETWORK_PING_HOST: str = "1.1.1.1"
 NETWORK_PING_TIMEOUT_MS: int = 800
+# Probed concurrently each round; "host:port" forces TCP-connect timing for that target,
+# a bare host uses unprivileged ICMP when the OS allows it and NETWORK_PROBE_TCP_PORT otherwise.
+NETWORK_PROBE_TARGETS: list[str] = [NETWORK_PING_HOST, "8.8.8.8"]
+NETWORK_PROBE_TCP_PORT: int = 443
+# Probe rounds kept for loss/jitter/latency statistics.
+NETWORK_PROBE_WINDOW: int = 30
+# Network status comes from the window's p95 latency and loss: good needs both under the
+# GOOD limits, ok under the OK limits, anything else is poor.
+NETWORK_GOOD_P95_MS: float = 50.0
+NETWORK_OK_P95_MS: float = 150.0
+NETWORK_GOOD_LOSS_PERCENT: float = 5.0
+NETWORK_OK_LOSS_PERCENT: float = 15.0
+# Consecutive lost rounds before the network is reported offline.
+NETWORK_OFFLINE_ROUNDS: int = 2
+# A new good/ok/poor level must hold this many rounds; improvements must also beat the
+# limit by this margin so a window hovering at a threshold does not flap.
+NETWORK_STATUS_CONFIRM_ROUNDS: int = 2
+NETWORK_HYSTERESIS_MARGIN_PERCENT: float = 20.0
+
+# "auto" reads /proc directly on Linux for cpu/memory/network; "psutil" always uses psutil.
+COLLECTOR_BACKEND: str = "auto"
+COLLECTOR_WORKERS: int = 4
+# Listening sockets are scanned at most once per this many seconds and shared by the
+# watched-port check, the listening-ports feed and /api/ports*.
+SOCKET_TABLE_TTL_SECONDS: float = 0.9
+# Top-process reads within this window reuse the last process-table refresh.
+PROCESS_TABLE_MIN_REFRESH_SECONDS: float = 1.0
+# "auto" scans /proc/[pid]/stat directly on Linux; "psutil" keeps the ProcessTable path.
+PROCESS_BACKEND: str = "auto"
+# "auto" reads LISTEN rows from /proc/net/tcp{,6} on Linux; "psutil" uses net_connections().
+LISTENER_BACKEND: str = "auto"
+COLLECTION_DEADLINE_SECONDS: float = 0.6
+# Mounts are re-listed when /proc/self/mountinfo signals a change on Linux and every
+# DISK_MOUNTS_REFRESH_SECONDS elsewhere; these filesystems and block devices are skipped.
+DISK_MOUNTS_REFRESH_SECONDS: float = 30.0
+DISK_IGNORE_FSTYPES: list[str] = ["squashfs", "iso9660", "udf"]
+DISK_IO_IGNORE_PREFIXES: list[str] = ["loop", "ram", "zram", "sr", "fd"]
+# Storage writer thread: pending tick batches, and how many share one commit.
+WRITER_QUEUE_SIZE: int = 256
+WRITER_MAX_GROUP: int = 32
+# Worker threads for blocking SQLite calls made from async code (routes, retention).
+STORAGE_WORKERS: int = 2
+# One pooled Docker API client is shared by all Docker readers; after a connection
+# failure it is rebuilt no sooner than the backoff.
+DOCKER_API_TIMEOUT_SECONDS: float = 5.0
+DOCKER_POOL_SIZE: int = 4
+# docker-py keys its unix-socket/npipe pools by request URL, so per-container endpoints
+# each take a pool; keep room for every container the dashboard lists (limit 50).
+DOCKER_NUM_POOLS: int = 64
+# Container stats come from one streaming subscription per running container; a value
+# older than DOCKER_STATS_STALE_SECONDS is reported as no data.
+DOCKER_STATS_MAX_STREAMS: int = 50
+DOCKER_STATS_STALE_SECONDS: float = 10.0
+# "auto" reads CPU/memory/network of containers from cgroup v2 files when the Docker
+# host's cgroups are reachable and streams from the API otherwise; "api" always streams.
+DOCKER_STATS_BACKEND: str = "auto"
+# Container events waiting for the next scheduler tick; the oldest are dropped beyond this.
+DOCKER_EVENTS_MAX_PENDING: int = 1000
+DOCKER_RECONNECT_BACKOFF_SECONDS: float = 5.0
+# cgroup v2 tree (systemd slices/services/scopes): how deep to follow it, how often it may
+# be re-read, how often every directory is re-listed regardless of mtimes, and how many
+# samples each cgroup keeps for /api/cgroups/history.
+CGROUP_TREE_MAX_DEPTH: int = 6
+CGROUP_TREE_MIN_REFRESH_SECONDS: float = 1.0
+CGROUP_TREE_FULL_RESCAN_SECONDS: float = 60.0
+CGROUP_HISTORY_POINTS: int = 120
+
+# Default cadence per collector; anything not listed runs every snapshot tick.
+# Intervals can be changed at runtime through /api/scheduler/collectors.
+COLLECTOR_INTERVAL_SECONDS: dict[str, float] = {
+    "ping": 10.0,
+    "processes": 5.0,
+    "listening_ports": 5.0,
+    "docker": 5.0,
+    "cgroups": 5.0,
+}
+COLLECTOR_BUDGET_SECONDS: dict[str, float] = {
+    "cpu": 0.25,
+    "memory": 0.25,
+    "pressure": 0.25,
+    "sockstat": 0.25,
+    "disk": 0.5,
+    "network": 0.25,
+    "ports_watch": 0.5,
+    "ping": (NETWORK_PING_TIMEOUT_MS / 1000.0) + 1.0,
+    "processes": 3.0,
+    "listening_ports": 3.0,
+    "docker": 10.0,
+    "cgroups": 3.0,
+}
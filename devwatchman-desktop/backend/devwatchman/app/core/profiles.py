@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from app.core.config import ALERT_CPU_PERCENT, ALERT_PORTS_REQUIRED, ALERT_RAM_PERCENT, WATCH_PORTS
-from app.storage.db import get_connection
+from app.storage.db import read_connection, write_connection
 
 APP_STATE_KEY_ACTIVE_PROFILE: str = "active_profile_name"
 
@@ -60,16 +60,9 @@ def get_profile(name: str) -> Profile | None:
 
 
 def get_active_profile_name() -> str:
+    # app_state is created by init_db; before that there is no stored profile.
     try:
-        with get_connection() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS app_state (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL
-                )
-                """
-            )
+        with read_connection() as conn:
             row = conn.execute(
                 "SELECT value FROM app_state WHERE key = ?",
                 (APP_STATE_KEY_ACTIVE_PROFILE,),
@@ -83,7 +76,7 @@ def get_active_profile_name() -> str:
 
 
 def set_active_profile_name(name: str) -> None:
-    with get_connection() as conn:
+    with write_connection() as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS app_state (
@@ -96,7 +89,6 @@ def set_active_profile_name(name: str) -> None:
             "INSERT OR REPLACE INTO app_state(key, value) VALUES(?, ?)",
             (APP_STATE_KEY_ACTIVE_PROFILE, name),
         )
-        conn.commit()
 
 
 def resolve_profile(name: str | None) -> Profile:
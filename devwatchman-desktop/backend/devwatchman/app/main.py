@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 from pathlib import Path
 
@@ -11,18 +13,19 @@ from fastapi.templating import Jinja2Templates
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
 from app.api.routes import router as api_router
-from app.core.config import APP_NAME
+from app.core.config import APP_NAME, HOT_TIER_HOURS
 from app.core.logging import setup_logging
-from app.core.profiles import get_active_profile_name, resolve_profile, set_active_profile_name
+from app.core.profiles import resolve_profile
 from app.services.alert_state import AlertState
+from app.services.docker_stats import get_docker_stats_service
+from app.services.hot_tier import get_hot_tier
 from app.services.profile_state import ProfileState
 from app.services.scheduler import SnapshotScheduler
 from app.services.retention import RetentionService
 from app.services.ws_manager import WebSocketManager
-from app.storage.db import init_db
-from app.storage.db import get_connection
-from app.storage.alerts import get_alert_setting
-from app.storage.events import insert_event
+from app.storage.db import get_db
+from app.storage.facade import AsyncStorage
+from app.storage.writer import StorageWriter
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -43,6 +46,7 @@ app.include_router(api_router)
 app.state.ws_manager = WebSocketManager()
 app.state.alert_state = AlertState()
 app.state.profile_state = ProfileState()
+app.state.storage = AsyncStorage()
 
 BASE_DIR = Path(__file__).resolve().parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "web" / "templates"))
@@ -58,6 +62,9 @@ def dashboard(request: Request) -> HTMLResponse:
 async def ws_live(ws: WebSocket) -> None:
     manager: WebSocketManager = app.state.ws_manager
     await manager.connect(ws)
+    scheduler: SnapshotScheduler | None = getattr(app.state, "scheduler", None)
+    if scheduler is not None:
+        scheduler.wake()
     try:
         from datetime import datetime, timezone
 
@@ -70,7 +77,16 @@ async def ws_live(ws: WebSocket) -> None:
             }
         )
         while True:
-            await ws.receive_text()
+            text = await ws.receive_text()
+            try:
+                message = json.loads(text)
+            except Exception:
+                continue
+            if isinstance(message, dict) and message.get("type") == "visibility":
+                hidden = bool(message.get("hidden"))
+                await manager.set_hidden(ws, hidden)
+                if not hidden and scheduler is not None:
+                    scheduler.wake()
     except WebSocketDisconnect:
         pass
     finally:
@@ -79,41 +95,41 @@ async def ws_live(ws: WebSocket) -> None:
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    init_db()
-    from datetime import datetime, timezone
+    storage: AsyncStorage = app.state.storage
+    await storage.init_db()
+    get_db().start_checkpointer()
+    from datetime import datetime, timedelta, timezone
 
     ts_utc = datetime.now(timezone.utc).isoformat()
-    with get_connection() as conn:
+    try:
+        event_id = await storage.insert_event(
+            {
+                "ts_utc": ts_utc,
+                "kind": "app_started",
+                "message": f"{APP_NAME} started",
+                "severity": "info",
+            },
+        )
         try:
-            event_id = insert_event(
-                conn,
+            await app.state.ws_manager.broadcast_json(
                 {
+                    "type": "timeline_event",
+                    "v": 1,
                     "ts_utc": ts_utc,
-                    "kind": "app_started",
-                    "message": f"{APP_NAME} started",
-                    "severity": "info",
-                },
+                    "data": {
+                        "id": event_id,
+                        "kind": "app_started",
+                        "severity": "info",
+                        "message": f"{APP_NAME} started",
+                    },
+                }
             )
-            try:
-                await app.state.ws_manager.broadcast_json(
-                    {
-                        "type": "timeline_event",
-                        "v": 1,
-                        "ts_utc": ts_utc,
-                        "data": {
-                            "id": event_id,
-                            "kind": "app_started",
-                            "severity": "info",
-                            "message": f"{APP_NAME} started",
-                        },
-                    }
-                )
-            except Exception:
-                pass
         except Exception:
-            logger.exception("Failed to insert app_started event")
+            pass
+    except Exception:
+        logger.exception("Failed to insert app_started event")
 
-        mute_until = get_alert_setting(conn, "mute_until_utc")
+    mute_until = await storage.get_alert_setting("mute_until_utc")
     if mute_until:
         try:
             dt = datetime.fromisoformat(mute_until)
@@ -123,24 +139,40 @@ async def on_startup() -> None:
         except Exception:
             app.state.alert_state.mute_until_utc = None
 
-    stored_profile = get_active_profile_name()
+    stored_profile = await storage.get_active_profile_name()
     profile = resolve_profile(stored_profile)
     app.state.profile_state.active_name = profile.name
     if stored_profile != profile.name:
         try:
-            set_active_profile_name(profile.name)
+            await storage.set_active_profile_name(profile.name)
         except Exception:
             pass
 
+    # Refill the hot tier from the last run so short-range history is served from
+    # memory straight away.
+    hot_tier = get_hot_tier()
+    since = datetime.now(timezone.utc) - timedelta(hours=HOT_TIER_HOURS)
+    try:
+        recent = await storage.get_snapshot_history(int(since.timestamp() * 1000))
+        for row in recent[-hot_tier.capacity :]:
+            hot_tier.append(row)
+    except Exception:
+        logger.exception("Failed to load recent snapshots into the hot tier")
+
+    writer = StorageWriter()
+    writer.start()
+    app.state.writer = writer
+
     scheduler = SnapshotScheduler(
         ws_manager=app.state.ws_manager,
         alert_state=app.state.alert_state,
         profile_state=app.state.profile_state,
+        writer=writer,
     )
     scheduler.start()
     app.state.scheduler = scheduler
 
-    retention = RetentionService(interval_seconds=60)
+    retention = RetentionService(interval_seconds=60, storage=storage)
     retention.start()
     app.state.retention = retention
     logger.info("%s started", APP_NAME)
@@ -151,10 +183,18 @@ async def on_shutdown() -> None:
     scheduler: SnapshotScheduler | None = getattr(app.state, "scheduler", None)
     if scheduler is not None:
         await scheduler.stop()
+    get_docker_stats_service().stop()
+    writer: StorageWriter | None = getattr(app.state, "writer", None)
+    if writer is not None:
+        await asyncio.to_thread(writer.stop)
     retention: RetentionService | None = getattr(app.state, "retention", None)
     if retention is not None:
         await retention.stop()
     manager: WebSocketManager | None = getattr(app.state, "ws_manager", None)
     if manager is not None:
         await manager.close_all()
+    storage: AsyncStorage | None = getattr(app.state, "storage", None)
+    if storage is not None:
+        await asyncio.to_thread(storage.shutdown)
+    await asyncio.to_thread(get_db().close)
     logger.info("%s stopped", APP_NAME)
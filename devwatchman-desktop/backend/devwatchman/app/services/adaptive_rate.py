@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import (
+    ADAPTIVE_HIDDEN_INTERVAL_SECONDS,
+    ADAPTIVE_IDLE_AFTER_SECONDS,
+    ADAPTIVE_IDLE_CPU_PERCENT,
+    ADAPTIVE_IDLE_INTERVAL_SECONDS,
+    ADAPTIVE_NEAR_THRESHOLD_MARGIN_PERCENT,
+    ADAPTIVE_NO_CLIENT_INTERVAL_SECONDS,
+    ADAPTIVE_SAMPLING_ENABLED,
+    SNAPSHOT_INTERVAL_SECONDS,
+)
+
+RATE_REASON_FIXED: str = "fixed"
+RATE_REASON_ACTIVE: str = "active"
+RATE_REASON_NEAR_THRESHOLD: str = "near_threshold"
+RATE_REASON_NO_CLIENTS: str = "no_clients"
+RATE_REASON_HIDDEN: str = "hidden"
+RATE_REASON_IDLE: str = "idle"
+
+
+@dataclass
+class AdaptiveRate:
+    base_seconds: float = float(SNAPSHOT_INTERVAL_SECONDS)
+    enabled: bool = ADAPTIVE_SAMPLING_ENABLED
+    no_client_seconds: float = ADAPTIVE_NO_CLIENT_INTERVAL_SECONDS
+    hidden_seconds: float = ADAPTIVE_HIDDEN_INTERVAL_SECONDS
+    idle_seconds: float = ADAPTIVE_IDLE_INTERVAL_SECONDS
+    idle_cpu_percent: float = ADAPTIVE_IDLE_CPU_PERCENT
+    idle_after_seconds: float = ADAPTIVE_IDLE_AFTER_SECONDS
+    near_margin_percent: float = ADAPTIVE_NEAR_THRESHOLD_MARGIN_PERCENT
+    interval_seconds: float = float(SNAPSHOT_INTERVAL_SECONDS)
+    reason: str = RATE_REASON_FIXED
+    changes: int = 0
+    _idle_since_mono: float | None = None
+
+    def decide(
+        self,
+        now_mono: float,
+        *,
+        has_clients: bool,
+        all_hidden: bool,
+        cpu_percent: float | None,
+        mem_percent: float | None,
+        alert_cpu_percent: float,
+        alert_ram_percent: float,
+        alert_pending: bool = False,
+    ) -> tuple[float, str]:
+        base = float(self.base_seconds)
+        if not self.enabled:
+            return self._set(base, RATE_REASON_FIXED)
+
+        if cpu_percent is not None and cpu_percent < self.idle_cpu_percent:
+            if self._idle_since_mono is None:
+                self._idle_since_mono = now_mono
+        else:
+            self._idle_since_mono = None
+
+        # Anything close to an alert threshold (or already counting towards an alert)
+        # gets full resolution, whatever else is going on.
+        margin = float(self.near_margin_percent)
+        near = alert_pending
+        if cpu_percent is not None and cpu_percent >= alert_cpu_percent - margin:
+            near = True
+        if mem_percent is not None and mem_percent >= alert_ram_percent - margin:
+            near = True
+        if near:
+            return self._set(base, RATE_REASON_NEAR_THRESHOLD)
+
+        candidates: list[tuple[float, str]] = []
+        if not has_clients:
+            candidates.append((self.no_client_seconds, RATE_REASON_NO_CLIENTS))
+        elif all_hidden:
+            candidates.append((self.hidden_seconds, RATE_REASON_HIDDEN))
+        if self._idle_since_mono is not None and (now_mono - self._idle_since_mono) >= self.idle_after_seconds:
+            candidates.append((self.idle_seconds, RATE_REASON_IDLE))
+        if not candidates:
+            return self._set(base, RATE_REASON_ACTIVE)
+        interval, reason = max(candidates, key=lambda c: c[0])
+        return self._set(max(base, float(interval)), reason)
+
+    def _set(self, interval: float, reason: str) -> tuple[float, str]:
+        if interval != self.interval_seconds:
+            self.changes += 1
+        self.interval_seconds = interval
+        self.reason = reason
+        return interval, reason
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": bool(self.enabled),
+            "interval_seconds": float(self.interval_seconds),
+            "reason": self.reason,
+            "changes": self.changes,
+        }
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Union
+
+from app.core.config import COLLECTION_DEADLINE_SECONDS, COLLECTOR_WORKERS
+from app.services.collector_registry import EXECUTOR_DEDICATED, EXECUTOR_LOOP, CollectorSpec
+
+logger = logging.getLogger(__name__)
+
+_Pending = Union["Future[Any]", "asyncio.Task[Any]"]
+
+
+@dataclass
+class CollectorResult:
+    name: str
+    value: Any
+    # fresh: a run finished since the last tick that consumed this collector.
+    # stale: the run failed, or was still going when this tick stopped waiting for it
+    # (its budget or the tick deadline, whichever came first).
+    fresh: bool
+    stale: bool
+    elapsed_ms: float | None = None
+
+
+@dataclass
+class _CollectorState:
+    last_value: Any = None
+    last_ok_mono: float | None = None
+    inflight: _Pending | None = None
+    submitted_mono: float = 0.0
+    budget_seconds: float = 0.5
+    stale: bool = False
+    # The in-flight run has already been counted as a timeout.
+    overran: bool = False
+    timeouts: int = 0
+    errors: int = 0
+
+
+@dataclass
+class CollectionStage:
+    max_workers: int = COLLECTOR_WORKERS
+    deadline_seconds: float = COLLECTION_DEADLINE_SECONDS
+    _executor: ThreadPoolExecutor | None = None
+    _dedicated: dict[str, ThreadPoolExecutor] = field(default_factory=dict)
+    _states: dict[str, _CollectorState] = field(default_factory=dict)
+    _lock: Lock = field(default_factory=Lock)
+
+    def _get_executor(self, spec: CollectorSpec) -> ThreadPoolExecutor:
+        if spec.executor == EXECUTOR_DEDICATED:
+            executor = self._dedicated.get(spec.name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"collector-{spec.name}"
+                )
+                self._dedicated[spec.name] = executor
+            return executor
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, int(self.max_workers)),
+                thread_name_prefix="collector",
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for state in self._states.values():
+                if isinstance(state.inflight, asyncio.Task):
+                    state.inflight.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for executor in self._dedicated.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._dedicated.clear()
+
+    def has_pending(self, name: str) -> bool:
+        with self._lock:
+            state = self._states.get(name)
+            return bool(state and state.inflight is not None)
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "stale": state.stale,
+                    "inflight": state.inflight is not None and not state.inflight.done(),
+                    "age_seconds": (now - state.last_ok_mono) if state.last_ok_mono is not None else None,
+                    "timeouts": state.timeouts,
+                    "errors": state.errors,
+                }
+                for name, state in self._states.items()
+            }
+
+    def _submit(self, spec: CollectorSpec, state: _CollectorState, now_mono: float) -> _Pending:
+        fut: _Pending
+        if spec.executor == EXECUTOR_LOOP:
+            fut = asyncio.ensure_future(spec.func())
+        else:
+            fut = self._get_executor(spec).submit(spec.func)
+        state.inflight = fut
+        state.submitted_mono = now_mono
+        state.budget_seconds = float(spec.budget_seconds)
+        state.overran = False
+        return fut
+
+    def _consume(self, name: str, state: _CollectorState, fut: _Pending) -> CollectorResult:
+        elapsed_ms = (time.monotonic() - state.submitted_mono) * 1000.0
+        state.inflight = None
+        exc = None if fut.cancelled() else fut.exception()
+        if not fut.cancelled() and exc is None:
+            state.last_value = fut.result()
+            state.last_ok_mono = time.monotonic()
+            if state.overran:
+                logger.info("Collector recovered: %s (%.0fms)", name, elapsed_ms)
+            state.stale = False
+            return CollectorResult(name, state.last_value, fresh=True, stale=False, elapsed_ms=elapsed_ms)
+
+        state.errors += 1
+        state.stale = True
+        logger.error("Collector failed: %s", name, exc_info=exc)
+        return CollectorResult(name, state.last_value, fresh=False, stale=True, elapsed_ms=elapsed_ms)
+
+    async def collect(
+        self, specs: list[CollectorSpec], *, follow: list[str] | None = None
+    ) -> dict[str, CollectorResult]:
+        # ``specs`` are started unless a previous run is still going; ``follow`` names
+        # runs from earlier ticks that are only waited on, never started.
+        started = time.monotonic()
+        futures: dict[str, _Pending] = {}
+        early: dict[str, CollectorResult] = {}
+        with self._lock:
+            for spec in specs:
+                state = self._states.setdefault(spec.name, _CollectorState())
+                fut = state.inflight
+                if fut is None or fut.done():
+                    if fut is not None:
+                        # Finished after an earlier tick stopped waiting for it. Hand the
+                        # result on now; the fresh run below replaces it if it is quick.
+                        early[spec.name] = self._consume(spec.name, state, fut)
+                    fut = self._submit(spec, state, started)
+                futures[spec.name] = fut
+            for name in follow or ():
+                state = self._states.get(name)
+                if name not in futures and state is not None and state.inflight is not None:
+                    futures[name] = state.inflight
+
+        # Each run is waited on until its own budget runs out or the tick deadline
+        # passes, whichever is first; a run done by then is used, anything else is stale.
+        deadline = started + max(0.0, float(self.deadline_seconds))
+        finished = {name for name, fut in futures.items() if fut.done()}
+
+        async def wait_for_run(name: str, fut: _Pending, until: float) -> None:
+            waiter = fut if isinstance(fut, asyncio.Future) else asyncio.wrap_future(fut)
+            timeout = until - time.monotonic()
+            if timeout > 0:
+                await asyncio.wait((waiter,), timeout=timeout)
+            if waiter.done():
+                finished.add(name)
+            # Errors are read from the original future in _consume().
+            waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        waits = []
+        for name, fut in futures.items():
+            if name not in finished:
+                state = self._states[name]
+                until = min(state.submitted_mono + state.budget_seconds, deadline)
+                waits.append(wait_for_run(name, fut, until))
+        if waits:
+            await asyncio.gather(*waits)
+
+        now = time.monotonic()
+        results: dict[str, CollectorResult] = {}
+        with self._lock:
+            for name, fut in futures.items():
+                state = self._states[name]
+                if name in finished:
+                    results[name] = self._consume(name, state, fut)
+                    continue
+                if name in early:
+                    results[name] = early[name]
+                    continue
+                # A run that lands after its wait is handed on by a later tick.
+                state.stale = True
+                if not state.overran and (now - state.submitted_mono) >= state.budget_seconds:
+                    state.overran = True
+                    state.timeouts += 1
+                    logger.warning(
+                        "Collector %s missed its %.2fs budget; using last good value",
+                        name,
+                        state.budget_seconds,
+                    )
+                results[name] = CollectorResult(name, state.last_value, fresh=False, stale=True)
+        return results
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, replace
+from threading import Lock
+from typing import Any, Callable
+
+from app.core.config import SNAPSHOT_INTERVAL_SECONDS
+
+# pool: shared bounded worker pool, for cheap collectors that run every tick.
+# dedicated: a single worker owned by the collector, for heavy or slow scans that
+#            must not hold up the shared pool.
+# loop: the collector is a coroutine function and runs as a task on the event loop.
+EXECUTOR_POOL: str = "pool"
+EXECUTOR_DEDICATED: str = "dedicated"
+EXECUTOR_LOOP: str = "loop"
+EXECUTORS: tuple[str, ...] = (EXECUTOR_POOL, EXECUTOR_DEDICATED, EXECUTOR_LOOP)
+
+MIN_INTERVAL_SECONDS: float = float(SNAPSHOT_INTERVAL_SECONDS)
+MAX_INTERVAL_SECONDS: float = 3600.0
+
+
+@dataclass(frozen=True, slots=True)
+class CollectorSpec:
+    name: str
+    func: Callable[[], Any]
+    interval_seconds: float = float(SNAPSHOT_INTERVAL_SECONDS)
+    # None lets the registry pick a slot; heavy collectors are spread across ticks.
+    phase_seconds: float | None = None
+    executor: str = EXECUTOR_POOL
+    budget_seconds: float = 0.5
+    consumers: tuple[str, ...] = ()
+    heavy: bool = False
+    requires_clients: bool = False
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "name": self.name,
+            "interval_seconds": float(self.interval_seconds),
+            "phase_seconds": self.phase_seconds,
+            "executor": self.executor,
+            "budget_seconds": float(self.budget_seconds),
+            "consumers": list(self.consumers),
+            "heavy": bool(self.heavy),
+            "requires_clients": bool(self.requires_clients),
+        }
+
+
+class CollectorRegistry:
+    def __init__(self, *, tick_seconds: float = float(SNAPSHOT_INTERVAL_SECONDS)) -> None:
+        self._tick_seconds = max(0.001, float(tick_seconds))
+        self._specs: dict[str, CollectorSpec] = {}
+        self._phase: dict[str, float] = {}
+        self._next_due: dict[str, float] = {}
+        self._anchor_mono: float | None = None
+        self._lock = Lock()
+
+    def register(self, spec: CollectorSpec) -> None:
+        if spec.executor not in EXECUTORS:
+            raise ValueError(f"unknown executor {spec.executor!r} for collector {spec.name!r}")
+        with self._lock:
+            self._specs[spec.name] = replace(
+                spec, interval_seconds=self._clamp_interval(spec.interval_seconds)
+            )
+            self._assign_phases()
+
+    def get(self, name: str) -> CollectorSpec | None:
+        with self._lock:
+            return self._specs.get(name)
+
+    def specs(self) -> list[CollectorSpec]:
+        with self._lock:
+            return list(self._specs.values())
+
+    def set_interval(self, name: str, interval_seconds: float) -> CollectorSpec | None:
+        with self._lock:
+            spec = self._specs.get(name)
+            if spec is None:
+                return None
+            spec = replace(spec, interval_seconds=self._clamp_interval(interval_seconds))
+            self._specs[name] = spec
+            self._assign_phases()
+            self._next_due.pop(name, None)
+            return spec
+
+    def describe(self, now_mono: float | None = None) -> list[dict[str, object]]:
+        now = time.monotonic() if now_mono is None else now_mono
+        with self._lock:
+            items: list[dict[str, object]] = []
+            for name in sorted(self._specs):
+                item = self._specs[name].to_dict()
+                item["effective_phase_seconds"] = self._phase.get(name, 0.0)
+                next_due = self._next_due.get(name)
+                item["next_due_in_seconds"] = None if next_due is None else max(0.0, next_due - now)
+                items.append(item)
+            return items
+
+    def due(self, now_mono: float, *, has_clients: bool) -> list[CollectorSpec]:
+        with self._lock:
+            if self._anchor_mono is None:
+                self._anchor_mono = now_mono
+            # Half a tick of slack so a deadline that lands a hair after the tick
+            # boundary still runs on that tick rather than the next one.
+            horizon = now_mono + (self._tick_seconds / 2.0)
+            due: list[CollectorSpec] = []
+            for name, spec in self._specs.items():
+                next_due = self._next_due.get(name)
+                if next_due is None:
+                    next_due = self._first_due(name, spec, now_mono)
+                if next_due > horizon:
+                    self._next_due[name] = next_due
+                    continue
+                interval = float(spec.interval_seconds)
+                skipped = math.floor((horizon - next_due) / interval)
+                self._next_due[name] = next_due + (skipped + 1) * interval
+                if spec.requires_clients and not has_clients:
+                    continue
+                due.append(spec)
+            return due
+
+    def _first_due(self, name: str, spec: CollectorSpec, now_mono: float) -> float:
+        anchor = self._anchor_mono if self._anchor_mono is not None else now_mono
+        interval = float(spec.interval_seconds)
+        phase = self._phase.get(name, 0.0)
+        elapsed = max(0.0, now_mono - anchor - phase)
+        return anchor + phase + math.ceil(elapsed / interval) * interval
+
+    def _clamp_interval(self, interval_seconds: float) -> float:
+        try:
+            value = float(interval_seconds)
+        except Exception:
+            value = MIN_INTERVAL_SECONDS
+        if not math.isfinite(value):
+            value = MIN_INTERVAL_SECONDS
+        return max(MIN_INTERVAL_SECONDS, min(MAX_INTERVAL_SECONDS, value))
+
+    def _assign_phases(self) -> None:
+        slot = 0
+        for name, spec in self._specs.items():
+            interval = float(spec.interval_seconds)
+            if spec.phase_seconds is not None:
+                phase = float(spec.phase_seconds) % interval
+            elif spec.heavy:
+                ticks_per_interval = max(1, int(round(interval / self._tick_seconds)))
+                phase = (slot % ticks_per_interval) * self._tick_seconds
+                slot += 1
+            else:
+                phase = 0.0
+            if self._phase.get(name) != phase:
+                self._phase[name] = phase
+                self._next_due.pop(name, None)
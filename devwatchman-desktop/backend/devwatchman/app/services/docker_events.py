@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from typing import Any
+
+from app.collectors.docker_client import _get_docker, get_docker_handle
+from app.collectors.docker_containers import list_containers
+from app.core.config import DOCKER_EVENTS_MAX_PENDING, DOCKER_RECONNECT_BACKOFF_SECONDS
+
+logger = logging.getLogger(__name__)
+
+KIND_RESYNC: str = "resync"
+KIND_START: str = "start"
+KIND_DIE: str = "die"
+KIND_RESTART: str = "restart"
+KIND_HEALTH: str = "health"
+
+
+@dataclass(frozen=True, slots=True)
+class ContainerEvent:
+    kind: str
+    container_id: str
+    name: str
+    ts_epoch: float
+    running: bool | None = None
+    restart_count: int | None = None
+    exit_code: int | None = None
+    health: str | None = None
+
+
+def parse_event(raw: Any) -> ContainerEvent | None:
+    if not isinstance(raw, dict) or raw.get("Type", "container") != "container":
+        return None
+    action = str(raw.get("Action") or raw.get("status") or "")
+    actor = raw.get("Actor") or {}
+    attrs = actor.get("Attributes") or {}
+    cid = str(actor.get("ID") or raw.get("id") or "")
+    if not cid:
+        return None
+    name = str(attrs.get("name") or cid[:12])
+    if raw.get("timeNano"):
+        ts = int(raw["timeNano"]) / 1e9
+    else:
+        ts = float(raw.get("time") or time.time())
+
+    if action == "start":
+        return ContainerEvent(KIND_START, cid, name, ts, running=True)
+    if action == "die":
+        try:
+            exit_code: int | None = int(attrs.get("exitCode"))
+        except (TypeError, ValueError):
+            exit_code = None
+        return ContainerEvent(KIND_DIE, cid, name, ts, running=False, exit_code=exit_code)
+    if action == "restart":
+        return ContainerEvent(KIND_RESTART, cid, name, ts)
+    if action.startswith("health_status"):
+        return ContainerEvent(KIND_HEALTH, cid, name, ts, health=action.partition(":")[2].strip() or None)
+    return None
+
+
+class DockerEventsSubscriber:
+    # Follows the daemon's /events stream on a background thread and queues container
+    # start/die/restart/health events with the daemon's own timestamps. Every (re)connect
+    # first queues a KIND_RESYNC entry per container from one full listing, so anything
+    # that changed while the stream was down still reaches the state tracker; after
+    # that only events are needed. The subscription is opened before the listing, so
+    # nothing that happens in between is lost.
+    def __init__(
+        self,
+        *,
+        max_pending: int = DOCKER_EVENTS_MAX_PENDING,
+        reconnect_seconds: float = DOCKER_RECONNECT_BACKOFF_SECONDS,
+    ) -> None:
+        self.reconnect_seconds = float(reconnect_seconds)
+        self._pending: deque[ContainerEvent] = deque(maxlen=max(1, int(max_pending)))
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self._stream: Any = None
+        self.connected = False
+        self.resyncs = 0
+        self.events_seen = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="docker-events", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                # Closes the response socket, which unblocks the reader thread.
+                stream.close()
+            except Exception:
+                pass
+
+    def _push(self, event: ContainerEvent) -> None:
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(event)
+
+    def drain(self) -> list[ContainerEvent]:
+        with self._lock:
+            events = list(self._pending)
+            self._pending.clear()
+        return events
+
+    def _resync(self) -> None:
+        now = time.time()
+        for c in list_containers(include_stopped=True):
+            cid = str(c.get("id") or "")
+            if not cid:
+                continue
+            state = str(c.get("state") or c.get("status") or "").lower()
+            self._push(
+                ContainerEvent(
+                    KIND_RESYNC,
+                    cid,
+                    str(c.get("name") or cid),
+                    now,
+                    running=state == "running",
+                    restart_count=int(c.get("restart_count") or 0),
+                )
+            )
+        self.resyncs += 1
+
+    def _stream_once(self) -> None:
+        stream = get_docker_handle().call(lambda api: api.events(decode=True, filters={"type": "container"}))
+        self._stream = stream
+        try:
+            self.connected = True
+            self._resync()
+            for raw in stream:
+                if self._stop.is_set():
+                    break
+                event = parse_event(raw)
+                if event is not None:
+                    self.events_seen += 1
+                    self._push(event)
+        finally:
+            self.connected = False
+            self._stream = None
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        if _get_docker() is None:
+            return
+        while not self._stop.is_set():
+            try:
+                self._stream_once()
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.debug("Docker events stream ended: %s", e)
+            self._stop.wait(self.reconnect_seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "resyncs": self.resyncs,
+            "events_seen": self.events_seen,
+            "dropped": self.dropped,
+        }
@@ -5,7 +5,9 @@ from dataclasses import dataclass, field
 from threading import Lock
 from typing import Any
 
-from app.collectors.docker_containers import docker_available, get_container_stats, list_containers
+from app.collectors.cgroup_containers import get_cgroup_stats
+from app.collectors.docker_containers import docker_available, empty_container_stats, list_containers
+from app.services.docker_stats import get_docker_stats_service
 
 
 @dataclass
@@ -15,8 +17,6 @@ class _Cache:
     status_value: tuple[bool, str] = (False, "unknown")
     list_ts: float = 0.0
     list_value: list[dict[str, Any]] = field(default_factory=list)
-    stats_ts: dict[str, float] = field(default_factory=dict)
-    stats_value: dict[str, dict[str, Any]] = field(default_factory=dict)
 
 
 _CACHE = _Cache()
@@ -48,28 +48,31 @@ def list_containers_cached(*, include_stopped: bool, ttl_seconds: float = 2.0) -
     return items
 
 
-def get_container_stats_cached(container_id: str, *, ttl_seconds: float = 2.0) -> dict[str, Any]:
-    now = time.monotonic()
-    with _CACHE.lock:
-        ts = _CACHE.stats_ts.get(container_id, 0.0)
-        if (now - ts) <= ttl_seconds and container_id in _CACHE.stats_value:
-            return _CACHE.stats_value[container_id]
-
-    value = get_container_stats(container_id)
-    with _CACHE.lock:
-        _CACHE.stats_ts[container_id] = now
-        _CACHE.stats_value[container_id] = value
-    return value
-
-
 def list_containers_with_stats(
     *, include_stopped: bool = True, limit: int = 50
 ) -> dict[str, Any]:
+    stats_service = get_docker_stats_service()
     ok, reason = get_docker_status_cached()
     if not ok:
+        stats_service.sync(())
         return {"available": False, "reason": reason, "items": []}
 
     items = list_containers_cached(include_stopped=include_stopped)
+    running = [
+        str(c.get("id") or "") for c in items if str(c.get("state") or "").lower() == "running"
+    ]
+    # Containers with a reachable cgroup are read from it directly; only the rest need
+    # an API stream. Both cover every running container, not just this page, so
+    # callers with different limits do not churn streams.
+    fast: dict[str, dict[str, Any]] = {}
+    cgroups = get_cgroup_stats()
+    if cgroups is not None:
+        for cid in running:
+            value = cgroups.read(cid)
+            if value is not None:
+                fast[cid] = value
+        cgroups.prune(set(running))
+    stats_service.sync(cid for cid in running if cid not in fast)
     if limit < 1:
         limit = 1
     if limit > 200:
@@ -78,7 +81,7 @@ def list_containers_with_stats(
     merged: list[dict[str, Any]] = []
     for c in items[:limit]:
         cid = str(c.get("id") or "")
-        stats = get_container_stats_cached(cid) if cid else {}
+        stats = fast.get(cid) or (stats_service.latest(cid) if cid else None) or empty_container_stats()
         merged.append({**c, "stats": stats})
 
     return {"available": True, "reason": "ok", "items": merged}
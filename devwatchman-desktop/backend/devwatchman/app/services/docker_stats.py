@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from typing import Any, Iterable
+
+from app.collectors.docker_client import get_docker_handle
+from app.collectors.docker_containers import parse_container_stats
+from app.core.config import DOCKER_STATS_MAX_STREAMS, DOCKER_STATS_STALE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# The daemon reports a zero "read" time once the container is gone or stopped.
+_ZERO_READ_PREFIX = "0001-01-01"
+
+
+@dataclass
+class _Subscription:
+    container_id: str
+    stop: Event = field(default_factory=Event)
+    thread: Thread | None = None
+
+
+class DockerStatsService:
+    # One streaming /stats subscription per running container, each on its own daemon
+    # thread, feeding a latest-stats table. The daemon pushes a frame about once a
+    # second with precpu already filled in, so readers never wait on a sample.
+    # Streams are cancelled when their container drops out of sync() or stops; a
+    # cancelled stream exits at its next frame.
+    def __init__(
+        self,
+        *,
+        max_streams: int = DOCKER_STATS_MAX_STREAMS,
+        stale_after_seconds: float = DOCKER_STATS_STALE_SECONDS,
+    ) -> None:
+        self.max_streams = int(max_streams)
+        self.stale_after_seconds = float(stale_after_seconds)
+        self._subs: dict[str, _Subscription] = {}
+        self._latest: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._lock = Lock()
+        self._stopped = False
+
+    def _run(self, sub: _Subscription) -> None:
+        cid = sub.container_id
+        stream = None
+        container_stopped = False
+        try:
+            stream = get_docker_handle().call(lambda api: api.stats(cid, stream=True, decode=True))
+            for raw in stream:
+                if sub.stop.is_set():
+                    break
+                if not isinstance(raw, dict):
+                    continue
+                if str(raw.get("read") or "").startswith(_ZERO_READ_PREFIX):
+                    container_stopped = True
+                    break
+                parsed = parse_container_stats(raw)
+                with self._lock:
+                    if self._subs.get(cid) is sub:
+                        self._latest[cid] = (time.monotonic(), parsed)
+        except Exception as e:
+            if not sub.stop.is_set():
+                logger.debug("Stats stream for %s ended: %s", cid[:12], e)
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+            with self._lock:
+                # Let the next sync() resubscribe if the container is still running.
+                if self._subs.get(cid) is sub:
+                    del self._subs[cid]
+                    if container_stopped:
+                        self._latest.pop(cid, None)
+
+    def _start(self, cid: str) -> None:
+        sub = _Subscription(container_id=cid)
+        sub.thread = Thread(target=self._run, args=(sub,), name=f"docker-stats-{cid[:12]}", daemon=True)
+        self._subs[cid] = sub
+        sub.thread.start()
+
+    def sync(self, running_ids: Iterable[str]) -> None:
+        wanted: list[str] = []
+        for cid in running_ids:
+            if cid and cid not in wanted:
+                wanted.append(cid)
+        wanted = wanted[: self.max_streams]
+        wanted_set = set(wanted)
+
+        with self._lock:
+            if self._stopped:
+                return
+            for cid in [c for c in self._subs if c not in wanted_set]:
+                self._subs.pop(cid).stop.set()
+            for cid in [c for c in self._latest if c not in wanted_set]:
+                del self._latest[cid]
+            for cid in wanted:
+                if cid not in self._subs:
+                    self._start(cid)
+
+    def cancel(self, container_id: str) -> None:
+        with self._lock:
+            sub = self._subs.pop(container_id, None)
+            self._latest.pop(container_id, None)
+        if sub is not None:
+            sub.stop.set()
+
+    def latest(self, container_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._latest.get(container_id)
+        if entry is None or (time.monotonic() - entry[0]) > self.stale_after_seconds:
+            return None
+        return entry[1]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"streams": len(self._subs), "containers_with_stats": len(self._latest)}
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            subs = list(self._subs.values())
+            self._subs.clear()
+            self._latest.clear()
+        for sub in subs:
+            sub.stop.set()
+
+
+_SERVICE = DockerStatsService()
+
+
+def get_docker_stats_service() -> DockerStatsService:
+    return _SERVICE
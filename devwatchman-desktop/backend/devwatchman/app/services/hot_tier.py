@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from threading import Lock
+from typing import Any
+
+from app.core.config import HOT_TIER_HOURS, SNAPSHOT_INTERVAL_SECONDS
+from app.storage.snapshots import SNAPSHOT_COLUMN_TYPES
+
+# NULL in an integer column; float columns use NaN.
+_INT_NULL: int = -(2**63)
+
+
+def hot_tier_capacity(hours: float = HOT_TIER_HOURS) -> int:
+    return max(1, math.ceil(float(hours) * 3600.0 / float(SNAPSHOT_INTERVAL_SECONDS)))
+
+
+class HotTier:
+    # Ring buffer of the newest snapshots, one preallocated array per column, so its
+    # memory is fixed at capacity * 8 bytes * (columns + 1) whatever the rate. The
+    # scheduler appends each snapshot once the writer has committed it; /api/summary
+    # and raw history read from here and only go to SQLite for the part older than
+    # the ring's oldest sample.
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self._names = tuple(SNAPSHOT_COLUMN_TYPES)
+        self._ints = tuple(SNAPSHOT_COLUMN_TYPES[n] == "INTEGER" for n in self._names)
+        self._ts = array("q", bytes(8 * self.capacity))
+        self._columns = [
+            array("q" if is_int else "d", bytes(8 * self.capacity)) for is_int in self._ints
+        ]
+        self._head = 0
+        self._size = 0
+        self._lock = Lock()
+
+    def append(self, snapshot: dict[str, Any]) -> None:
+        ts_ms = int(snapshot["ts_ms"])
+        with self._lock:
+            i = self._head
+            grow = True
+            if self._size:
+                newest = (self._head - 1) % self.capacity
+                last = self._ts[newest]
+                if ts_ms == last:
+                    # insert_snapshot replaces the row with the same ts_ms, so the
+                    # newest slot is overwritten the same way.
+                    i = newest
+                    grow = False
+                elif ts_ms < last:
+                    # The wall clock stepped back. history() bisects on sorted
+                    # timestamps, so start over; SQLite serves the older span.
+                    i = self._head = 0
+                    self._size = 0
+            self._ts[i] = ts_ms
+            for name, is_int, column in zip(self._names, self._ints, self._columns):
+                value = snapshot.get(name)
+                if value is None:
+                    column[i] = _INT_NULL if is_int else math.nan
+                else:
+                    column[i] = int(value) if is_int else float(value)
+            if grow:
+                self._head = (i + 1) % self.capacity
+                self._size = min(self._size + 1, self.capacity)
+
+    def _row(self, values: tuple[Any, ...], ts_ms: int) -> dict[str, Any]:
+        row: dict[str, Any] = {"ts_ms": ts_ms}
+        for name, is_int, value in zip(self._names, self._ints, values):
+            if is_int:
+                row[name] = None if value == _INT_NULL else value
+            else:
+                row[name] = None if value != value else value
+        return row
+
+    def _segments(self) -> list[tuple[int, int]]:
+        # Physical [start, end) slices in time order.
+        if self._size < self.capacity:
+            return [(0, self._size)]
+        if self._head == 0:
+            return [(0, self.capacity)]
+        return [(self._head, self.capacity), (0, self._head)]
+
+    def latest(self) -> dict[str, Any] | None:
+        with self._lock:
+            if self._size == 0:
+                return None
+            i = (self._head - 1) % self.capacity
+            values = tuple(column[i] for column in self._columns)
+            ts_ms = self._ts[i]
+        return self._row(values, ts_ms)
+
+    def covered_since_ms(self) -> int | None:
+        # Oldest sample held; everything the scheduler produced after it is in the ring.
+        with self._lock:
+            if self._size == 0:
+                return None
+            start, _ = self._segments()[0]
+            return self._ts[start]
+
+    def history(self, since_ms: int) -> tuple[list[dict[str, Any]], int | None]:
+        # Samples with ts_ms >= since_ms, oldest first, plus covered_since_ms().
+        with self._lock:
+            if self._size == 0:
+                return [], None
+            segments = self._segments()
+            covered = self._ts[segments[0][0]]
+            ts_parts: list[array] = []
+            column_parts: list[list[array]] = []
+            for start, end in segments:
+                first = bisect_left(self._ts, since_ms, start, end)
+                if first < end:
+                    ts_parts.append(self._ts[first:end])
+                    column_parts.append([column[first:end] for column in self._columns])
+
+        rows: list[dict[str, Any]] = []
+        for ts_part, columns in zip(ts_parts, column_parts):
+            for ts_ms, *values in zip(ts_part, *columns):
+                rows.append(self._row(values, ts_ms))
+        return rows, covered
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            size = self._size
+        return {
+            "capacity": self.capacity,
+            "size": size,
+            "bytes": 8 * self.capacity * (len(self._columns) + 1),
+            "covered_since_ms": self.covered_since_ms(),
+        }
+
+
+_HOT_TIER: HotTier | None = None
+_HOT_TIER_LOCK = Lock()
+
+
+def get_hot_tier() -> HotTier:
+    global _HOT_TIER
+    if _HOT_TIER is None:
+        with _HOT_TIER_LOCK:
+            if _HOT_TIER is None:
+                _HOT_TIER = HotTier(hot_tier_capacity())
+    return _HOT_TIER
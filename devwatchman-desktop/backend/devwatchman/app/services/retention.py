@@ -4,9 +4,22 @@ import asyncio
 import logging
 from contextlib import suppress
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-
-from app.storage.db import get_connection
+from typing import Callable
+from datetime import datetime, timezone
+
+from app.core.config import SNAPSHOT_STORAGE_ENGINE
+from app.storage.blocks import seal_blocks
+from app.storage.facade import AsyncStorage
+from app.storage.rollups import (
+    APP_STATE_1M_TO_15M_NEXT_START,
+    APP_STATE_DISK_IO_1M_TO_15M_NEXT_START,
+    APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START,
+    APP_STATE_RAW_TO_1M_NEXT_START,
+    FIFTEEN_MINUTES_MS,
+    MINUTE_MS,
+    get_rollup_cursor,
+    set_rollup_cursor,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -14,194 +27,465 @@ RAW_RETENTION_HOURS: int = 24
 ROLLUP_1M_DAYS: int = 7
 ROLLUP_15M_DAYS: int = 30
 
+# The storage writer rolls buckets up as they close (storage/rollups.py); the SQL
+# rollups below only fill what it never flushed, so they stay well behind its open
+# buckets.
 RAW_TO_1M_LAG_MINUTES: int = 2
 ONE_M_TO_15M_LAG_MINUTES: int = 20
 
 RAW_TO_1M_MAX_SPAN_MINUTES: int = 6 * 60
 ONE_M_TO_15M_MAX_SPAN_MINUTES: int = 2 * 24 * 60
-
-APP_STATE_RAW_TO_1M_NEXT_START: str = "rollup_raw_to_1m_next_start_utc"
-APP_STATE_1M_TO_15M_NEXT_START: str = "rollup_1m_to_15m_next_start_utc"
-
-
-def _floor_minute(dt: datetime) -> datetime:
-    return dt.replace(second=0, microsecond=0)
-
-
-def _floor_15m(dt: datetime) -> datetime:
-    minute = dt.minute - (dt.minute % 15)
-    return dt.replace(minute=minute, second=0, microsecond=0)
-
-
-def _get_app_state(conn, key: str) -> str | None:
-    row = conn.execute("SELECT value FROM app_state WHERE key = ?", (key,)).fetchone()
-    if row is None:
+RETENTION_DELETE_MAX_SPAN_MINUTES: int = 6 * 60
+
+HOUR_MS: int = 60 * MINUTE_MS
+DAY_MS: int = 24 * HOUR_MS
+
+
+def _epoch_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _rollup_window(
+    conn,
+    state_key: str,
+    *,
+    source: str,
+    source_time: str,
+    source_cursor_key: str | None = None,
+    now_ms: int,
+    bucket_ms: int,
+    lag_minutes: int,
+    max_span_minutes: int,
+) -> tuple[int, int] | None:
+    # Next [start, end) range for a rollup that resumes from its app_state cursor,
+    # both aligned to bucket_ms. Stretches without source rows are skipped, so a
+    # stale cursor catches up in one step instead of max_span_minutes at a time.
+    cutoff = (now_ms - lag_minutes * MINUTE_MS) // bucket_ms * bucket_ms
+    if source_cursor_key is not None:
+        # Never past what the rollup feeding this one has finished.
+        source_cursor = get_rollup_cursor(conn, source_cursor_key)
+        if source_cursor is None:
+            return None
+        cutoff = min(cutoff, source_cursor // bucket_ms * bucket_ms)
+    start = get_rollup_cursor(conn, state_key)
+    if start is None:
+        start = now_ms - ROLLUP_15M_DAYS * DAY_MS
+    start = start // bucket_ms * bucket_ms
+
+    if start >= cutoff:
         return None
-    value = str(row["value"] or "").strip()
-    return value or None
 
+    first = conn.execute(
+        f"SELECT min({source_time}) FROM {source} WHERE {source_time} >= ? AND {source_time} < ?",
+        (start, cutoff),
+    ).fetchone()[0]
+    if first is None:
+        return cutoff, cutoff
+    start = first // bucket_ms * bucket_ms
 
-def _set_app_state(conn, key: str, value: str) -> None:
-    conn.execute(
-        "INSERT OR REPLACE INTO app_state(key, value) VALUES(?, ?)",
-        (key, value),
-    )
-
-
-def _parse_ts(value: str) -> datetime | None:
-    try:
-        dt = datetime.fromisoformat(value)
-    except Exception:
+    end = min(cutoff, start + max_span_minutes * MINUTE_MS) // bucket_ms * bucket_ms
+    if end <= start:
         return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
-
-def _rollup_raw_to_1m(conn, *, now_utc: datetime) -> int:
-    cutoff_dt = _floor_minute(now_utc - timedelta(minutes=RAW_TO_1M_LAG_MINUTES))
-    next_start_raw = _get_app_state(conn, APP_STATE_RAW_TO_1M_NEXT_START)
-    if next_start_raw is None:
-        start_dt = _floor_minute(now_utc - timedelta(days=ROLLUP_15M_DAYS))
-    else:
-        start_dt = _parse_ts(next_start_raw) or _floor_minute(now_utc - timedelta(days=ROLLUP_15M_DAYS))
-        start_dt = _floor_minute(start_dt)
-
-    if start_dt >= cutoff_dt:
-        return 0
-
-    end_dt = min(cutoff_dt, start_dt + timedelta(minutes=RAW_TO_1M_MAX_SPAN_MINUTES))
-    end_dt = _floor_minute(end_dt)
-    if end_dt <= start_dt:
+    return start, end
+
+
+def _rollup_raw_to_1m(conn, *, now_ms: int) -> int:
+    window = _rollup_window(
+        conn,
+        APP_STATE_RAW_TO_1M_NEXT_START,
+        source="snapshots",
+        source_time="ts_ms",
+        now_ms=now_ms,
+        bucket_ms=MINUTE_MS,
+        lag_minutes=RAW_TO_1M_LAG_MINUTES,
+        max_span_minutes=RAW_TO_1M_MAX_SPAN_MINUTES,
+    )
+    if window is None:
         return 0
-
-    start_ts = start_dt.isoformat()
-    end_ts = end_dt.isoformat()
+    start_ms, end_ms = window
 
     conn.execute(
         """
         INSERT INTO snapshots_1m (
-            bucket_start_utc,
+            bucket_ms,
             avg_cpu_percent,
             avg_mem_percent,
             avg_disk_percent,
             avg_net_sent_bps,
-            avg_net_recv_bps
+            avg_net_recv_bps,
+            avg_psi_cpu_some_pct,
+            avg_psi_mem_some_pct,
+            avg_psi_mem_full_pct,
+            avg_psi_io_some_pct,
+            avg_psi_io_full_pct,
+            avg_tcp_inuse,
+            max_tcp_tw,
+            max_tcp_orphan
         )
         SELECT
-            substr(ts_utc, 1, 16) || ':00+00:00' AS bucket_start_utc,
-            avg(cpu_percent) AS avg_cpu_percent,
-            avg(mem_percent) AS avg_mem_percent,
-            avg(disk_percent) AS avg_disk_percent,
-            avg(net_sent_bps) AS avg_net_sent_bps,
-            avg(net_recv_bps) AS avg_net_recv_bps
+            ts_ms / 60000 * 60000 AS bucket_ms,
+            -- Points are weighted by the interval they cover so adaptive sampling
+            -- does not skew bucket averages towards the busy stretches.
+            sum(cpu_percent * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN cpu_percent IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_cpu_percent,
+            sum(mem_percent * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN mem_percent IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_mem_percent,
+            sum(disk_percent * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN disk_percent IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_disk_percent,
+            sum(net_sent_bps * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN net_sent_bps IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_net_sent_bps,
+            sum(net_recv_bps * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN net_recv_bps IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_net_recv_bps,
+            sum(psi_cpu_some_pct * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN psi_cpu_some_pct IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_psi_cpu_some_pct,
+            sum(psi_mem_some_pct * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN psi_mem_some_pct IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_psi_mem_some_pct,
+            sum(psi_mem_full_pct * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN psi_mem_full_pct IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_psi_mem_full_pct,
+            sum(psi_io_some_pct * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN psi_io_some_pct IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_psi_io_some_pct,
+            sum(psi_io_full_pct * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN psi_io_full_pct IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_psi_io_full_pct,
+            sum(tcp_inuse * coalesce(interval_s, 1.0))
+                / sum(CASE WHEN tcp_inuse IS NULL THEN NULL ELSE coalesce(interval_s, 1.0) END)
+                AS avg_tcp_inuse,
+            max(tcp_tw) AS max_tcp_tw,
+            max(tcp_orphan) AS max_tcp_orphan
         FROM snapshots
-        WHERE ts_utc >= ? AND ts_utc < ?
-        GROUP BY bucket_start_utc
-        ON CONFLICT(bucket_start_utc) DO UPDATE SET
+        WHERE ts_ms >= ? AND ts_ms < ?
+        GROUP BY 1
+        ON CONFLICT(bucket_ms) DO UPDATE SET
             avg_cpu_percent = excluded.avg_cpu_percent,
             avg_mem_percent = excluded.avg_mem_percent,
             avg_disk_percent = excluded.avg_disk_percent,
             avg_net_sent_bps = excluded.avg_net_sent_bps,
-            avg_net_recv_bps = excluded.avg_net_recv_bps
+            avg_net_recv_bps = excluded.avg_net_recv_bps,
+            avg_psi_cpu_some_pct = excluded.avg_psi_cpu_some_pct,
+            avg_psi_mem_some_pct = excluded.avg_psi_mem_some_pct,
+            avg_psi_mem_full_pct = excluded.avg_psi_mem_full_pct,
+            avg_psi_io_some_pct = excluded.avg_psi_io_some_pct,
+            avg_psi_io_full_pct = excluded.avg_psi_io_full_pct,
+            avg_tcp_inuse = excluded.avg_tcp_inuse,
+            max_tcp_tw = excluded.max_tcp_tw,
+            max_tcp_orphan = excluded.max_tcp_orphan
         """,
-        (start_ts, end_ts),
+        (start_ms, end_ms),
     )
 
-    _set_app_state(conn, APP_STATE_RAW_TO_1M_NEXT_START, end_ts)
+    set_rollup_cursor(conn, APP_STATE_RAW_TO_1M_NEXT_START, end_ms)
     return 1
 
 
-def _rollup_1m_to_15m(conn, *, now_utc: datetime) -> int:
-    cutoff_dt = _floor_15m(now_utc - timedelta(minutes=ONE_M_TO_15M_LAG_MINUTES))
-    next_start_raw = _get_app_state(conn, APP_STATE_1M_TO_15M_NEXT_START)
-    if next_start_raw is None:
-        start_dt = _floor_15m(now_utc - timedelta(days=ROLLUP_15M_DAYS))
-    else:
-        start_dt = _parse_ts(next_start_raw) or _floor_15m(now_utc - timedelta(days=ROLLUP_15M_DAYS))
-        start_dt = _floor_15m(start_dt)
-
-    if start_dt >= cutoff_dt:
-        return 0
-
-    end_dt = min(cutoff_dt, start_dt + timedelta(minutes=ONE_M_TO_15M_MAX_SPAN_MINUTES))
-    end_dt = _floor_15m(end_dt)
-    if end_dt <= start_dt:
+def _rollup_1m_to_15m(conn, *, now_ms: int) -> int:
+    window = _rollup_window(
+        conn,
+        APP_STATE_1M_TO_15M_NEXT_START,
+        source="snapshots_1m",
+        source_time="bucket_ms",
+        source_cursor_key=APP_STATE_RAW_TO_1M_NEXT_START,
+        now_ms=now_ms,
+        bucket_ms=FIFTEEN_MINUTES_MS,
+        lag_minutes=ONE_M_TO_15M_LAG_MINUTES,
+        max_span_minutes=ONE_M_TO_15M_MAX_SPAN_MINUTES,
+    )
+    if window is None:
         return 0
-
-    start_ts = start_dt.isoformat()
-    end_ts = end_dt.isoformat()
+    start_ms, end_ms = window
 
     conn.execute(
         """
         INSERT INTO snapshots_15m (
-            bucket_start_utc,
+            bucket_ms,
             avg_cpu_percent,
             avg_mem_percent,
             avg_disk_percent,
             avg_net_sent_bps,
-            avg_net_recv_bps
+            avg_net_recv_bps,
+            avg_psi_cpu_some_pct,
+            avg_psi_mem_some_pct,
+            avg_psi_mem_full_pct,
+            avg_psi_io_some_pct,
+            avg_psi_io_full_pct,
+            avg_tcp_inuse,
+            max_tcp_tw,
+            max_tcp_orphan
         )
         SELECT
-            substr(bucket_start_utc, 1, 14)
-                || printf(
-                    '%02d',
-                    CAST(CAST(substr(bucket_start_utc, 15, 2) AS INTEGER) / 15 AS INTEGER) * 15
-                )
-                || ':00+00:00' AS bucket_start_utc,
+            bucket_ms / 900000 * 900000 AS bucket_ms,
             avg(avg_cpu_percent) AS avg_cpu_percent,
             avg(avg_mem_percent) AS avg_mem_percent,
             avg(avg_disk_percent) AS avg_disk_percent,
             avg(avg_net_sent_bps) AS avg_net_sent_bps,
-            avg(avg_net_recv_bps) AS avg_net_recv_bps
+            avg(avg_net_recv_bps) AS avg_net_recv_bps,
+            avg(avg_psi_cpu_some_pct) AS avg_psi_cpu_some_pct,
+            avg(avg_psi_mem_some_pct) AS avg_psi_mem_some_pct,
+            avg(avg_psi_mem_full_pct) AS avg_psi_mem_full_pct,
+            avg(avg_psi_io_some_pct) AS avg_psi_io_some_pct,
+            avg(avg_psi_io_full_pct) AS avg_psi_io_full_pct,
+            avg(avg_tcp_inuse) AS avg_tcp_inuse,
+            max(max_tcp_tw) AS max_tcp_tw,
+            max(max_tcp_orphan) AS max_tcp_orphan
         FROM snapshots_1m
-        WHERE bucket_start_utc >= ? AND bucket_start_utc < ?
-        GROUP BY bucket_start_utc
-        ON CONFLICT(bucket_start_utc) DO UPDATE SET
+        WHERE bucket_ms >= ? AND bucket_ms < ?
+        GROUP BY 1
+        ON CONFLICT(bucket_ms) DO UPDATE SET
             avg_cpu_percent = excluded.avg_cpu_percent,
             avg_mem_percent = excluded.avg_mem_percent,
             avg_disk_percent = excluded.avg_disk_percent,
             avg_net_sent_bps = excluded.avg_net_sent_bps,
-            avg_net_recv_bps = excluded.avg_net_recv_bps
+            avg_net_recv_bps = excluded.avg_net_recv_bps,
+            avg_psi_cpu_some_pct = excluded.avg_psi_cpu_some_pct,
+            avg_psi_mem_some_pct = excluded.avg_psi_mem_some_pct,
+            avg_psi_mem_full_pct = excluded.avg_psi_mem_full_pct,
+            avg_psi_io_some_pct = excluded.avg_psi_io_some_pct,
+            avg_psi_io_full_pct = excluded.avg_psi_io_full_pct,
+            avg_tcp_inuse = excluded.avg_tcp_inuse,
+            max_tcp_tw = excluded.max_tcp_tw,
+            max_tcp_orphan = excluded.max_tcp_orphan
         """,
-        (start_ts, end_ts),
+        (start_ms, end_ms),
     )
 
-    _set_app_state(conn, APP_STATE_1M_TO_15M_NEXT_START, end_ts)
+    set_rollup_cursor(conn, APP_STATE_1M_TO_15M_NEXT_START, end_ms)
     return 1
 
 
-def _apply_retention(conn, *, now_utc: datetime) -> None:
-    raw_cutoff = (now_utc - timedelta(hours=RAW_RETENTION_HOURS)).isoformat()
-    one_m_cutoff = (now_utc - timedelta(days=ROLLUP_1M_DAYS)).isoformat()
-    fifteen_m_cutoff = (now_utc - timedelta(days=ROLLUP_15M_DAYS)).isoformat()
+def _rollup_disk_io_raw_to_1m(conn, *, now_ms: int) -> int:
+    window = _rollup_window(
+        conn,
+        APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START,
+        source="disk_io",
+        source_time="ts_ms",
+        now_ms=now_ms,
+        bucket_ms=MINUTE_MS,
+        lag_minutes=RAW_TO_1M_LAG_MINUTES,
+        max_span_minutes=RAW_TO_1M_MAX_SPAN_MINUTES,
+    )
+    if window is None:
+        return 0
+    start_ms, end_ms = window
+
+    conn.execute(
+        """
+        INSERT INTO disk_io_1m (
+            bucket_ms,
+            device,
+            avg_read_bps,
+            avg_write_bps,
+            avg_read_iops,
+            avg_write_iops,
+            avg_await_ms,
+            avg_util_percent
+        )
+        SELECT
+            ts_ms / 60000 * 60000 AS bucket_ms,
+            device,
+            sum(read_bps * coalesce(interval_s, 1.0)) / sum(coalesce(interval_s, 1.0)),
+            sum(write_bps * coalesce(interval_s, 1.0)) / sum(coalesce(interval_s, 1.0)),
+            sum(read_iops * coalesce(interval_s, 1.0)) / sum(coalesce(interval_s, 1.0)),
+            sum(write_iops * coalesce(interval_s, 1.0)) / sum(coalesce(interval_s, 1.0)),
+            -- await is per request, so it is weighted by the requests each point covers.
+            coalesce(
+                sum(await_ms * (read_iops + write_iops) * coalesce(interval_s, 1.0))
+                    / nullif(sum((read_iops + write_iops) * coalesce(interval_s, 1.0)), 0),
+                0.0
+            ),
+            sum(util_percent * coalesce(interval_s, 1.0)) / sum(coalesce(interval_s, 1.0))
+        FROM disk_io
+        WHERE ts_ms >= ? AND ts_ms < ?
+        GROUP BY 1, device
+        ON CONFLICT(bucket_ms, device) DO UPDATE SET
+            avg_read_bps = excluded.avg_read_bps,
+            avg_write_bps = excluded.avg_write_bps,
+            avg_read_iops = excluded.avg_read_iops,
+            avg_write_iops = excluded.avg_write_iops,
+            avg_await_ms = excluded.avg_await_ms,
+            avg_util_percent = excluded.avg_util_percent
+        """,
+        (start_ms, end_ms),
+    )
 
-    raw_cursor = _parse_ts(_get_app_state(conn, APP_STATE_RAW_TO_1M_NEXT_START) or "")
-    safe_raw_cutoff = raw_cutoff
-    if raw_cursor is not None:
-        safe_raw_cutoff = min(raw_cutoff, raw_cursor.isoformat())
+    set_rollup_cursor(conn, APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START, end_ms)
+    return 1
 
-    one_m_cursor = _parse_ts(_get_app_state(conn, APP_STATE_1M_TO_15M_NEXT_START) or "")
-    safe_one_m_cutoff = one_m_cutoff
-    if one_m_cursor is not None:
-        safe_one_m_cutoff = min(one_m_cutoff, one_m_cursor.isoformat())
 
-    conn.execute("DELETE FROM snapshots WHERE ts_utc < ?", (safe_raw_cutoff,))
+def _rollup_disk_io_1m_to_15m(conn, *, now_ms: int) -> int:
+    window = _rollup_window(
+        conn,
+        APP_STATE_DISK_IO_1M_TO_15M_NEXT_START,
+        source="disk_io_1m",
+        source_time="bucket_ms",
+        source_cursor_key=APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START,
+        now_ms=now_ms,
+        bucket_ms=FIFTEEN_MINUTES_MS,
+        lag_minutes=ONE_M_TO_15M_LAG_MINUTES,
+        max_span_minutes=ONE_M_TO_15M_MAX_SPAN_MINUTES,
+    )
+    if window is None:
+        return 0
+    start_ms, end_ms = window
+
+    conn.execute(
+        """
+        INSERT INTO disk_io_15m (
+            bucket_ms,
+            device,
+            avg_read_bps,
+            avg_write_bps,
+            avg_read_iops,
+            avg_write_iops,
+            avg_await_ms,
+            avg_util_percent
+        )
+        SELECT
+            bucket_ms / 900000 * 900000 AS bucket_ms,
+            device,
+            avg(avg_read_bps),
+            avg(avg_write_bps),
+            avg(avg_read_iops),
+            avg(avg_write_iops),
+            coalesce(
+                sum(avg_await_ms * (avg_read_iops + avg_write_iops))
+                    / nullif(sum(avg_read_iops + avg_write_iops), 0),
+                0.0
+            ),
+            avg(avg_util_percent)
+        FROM disk_io_1m
+        WHERE bucket_ms >= ? AND bucket_ms < ?
+        GROUP BY 1, device
+        ON CONFLICT(bucket_ms, device) DO UPDATE SET
+            avg_read_bps = excluded.avg_read_bps,
+            avg_write_bps = excluded.avg_write_bps,
+            avg_read_iops = excluded.avg_read_iops,
+            avg_write_iops = excluded.avg_write_iops,
+            avg_await_ms = excluded.avg_await_ms,
+            avg_util_percent = excluded.avg_util_percent
+        """,
+        (start_ms, end_ms),
+    )
+
+    set_rollup_cursor(conn, APP_STATE_DISK_IO_1M_TO_15M_NEXT_START, end_ms)
+    return 1
+
+
+def _safe_cutoff(conn, cutoff_ms: int, cursor_key: str) -> int:
+    # Never delete rows a rollup has not consumed yet.
+    cursor = get_rollup_cursor(conn, cursor_key)
+    return cutoff_ms if cursor is None else min(cutoff_ms, cursor)
+
+
+def _delete_before(conn, table: str, column: str, cutoff_ms: int) -> int:
+    # Deletes at most RETENTION_DELETE_MAX_SPAN_MINUTES of the oldest rows per call,
+    # so a long backlog is trimmed over several cycles. Returns 1 if rows went.
+    first = conn.execute(f"SELECT min({column}) FROM {table}").fetchone()[0]
+    if first is None or first >= cutoff_ms:
+        return 0
+    bound = min(cutoff_ms, first + RETENTION_DELETE_MAX_SPAN_MINUTES * MINUTE_MS)
+    conn.execute(f"DELETE FROM {table} WHERE {column} < ?", (bound,))
+    return 1
+
+
+def _apply_snapshot_retention(conn, *, now_ms: int) -> int:
+    raw_cutoff = now_ms - RAW_RETENTION_HOURS * HOUR_MS
+    progressed = _delete_before(
+        conn, "snapshots", "ts_ms", _safe_cutoff(conn, raw_cutoff, APP_STATE_RAW_TO_1M_NEXT_START)
+    )
+    progressed += _delete_before(
+        conn,
+        "snapshots_1m",
+        "bucket_ms",
+        _safe_cutoff(conn, now_ms - ROLLUP_1M_DAYS * DAY_MS, APP_STATE_1M_TO_15M_NEXT_START),
+    )
+    progressed += _delete_before(conn, "snapshots_15m", "bucket_ms", now_ms - ROLLUP_15M_DAYS * DAY_MS)
+    # Whole blocks only; one straddling the cutoff goes on the next cycle.
     conn.execute(
-        "DELETE FROM snapshots_1m WHERE bucket_start_utc < ?",
-        (safe_one_m_cutoff,),
+        "DELETE FROM snapshot_blocks WHERE start_ms < ? AND end_ms < ?",
+        (raw_cutoff, raw_cutoff),
+    )
+    return progressed
+
+
+def _apply_disk_io_retention(conn, *, now_ms: int) -> int:
+    progressed = _delete_before(
+        conn,
+        "disk_io",
+        "ts_ms",
+        _safe_cutoff(conn, now_ms - RAW_RETENTION_HOURS * HOUR_MS, APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START),
     )
-    conn.execute("DELETE FROM snapshots_15m WHERE bucket_start_utc < ?", (fifteen_m_cutoff,))
+    progressed += _delete_before(
+        conn,
+        "disk_io_1m",
+        "bucket_ms",
+        _safe_cutoff(conn, now_ms - ROLLUP_1M_DAYS * DAY_MS, APP_STATE_DISK_IO_1M_TO_15M_NEXT_START),
+    )
+    progressed += _delete_before(conn, "disk_io_15m", "bucket_ms", now_ms - ROLLUP_15M_DAYS * DAY_MS)
+    return progressed
+
+
+def _seal_snapshot_blocks(conn, *, now_ms: int) -> int:
+    if SNAPSHOT_STORAGE_ENGINE != "blocks":
+        return 0
+    # Only minutes the raw->1m rollup has already consumed are sealed.
+    cursor = get_rollup_cursor(conn, APP_STATE_RAW_TO_1M_NEXT_START)
+    if cursor is None:
+        return 0
+    return seal_blocks(conn, before_ms=min(cursor, now_ms))
+
+
+_RETENTION_STEPS: tuple[Callable[..., int], ...] = (
+    _rollup_raw_to_1m,
+    _rollup_1m_to_15m,
+    _rollup_disk_io_raw_to_1m,
+    _rollup_disk_io_1m_to_15m,
+    _seal_snapshot_blocks,
+    _apply_snapshot_retention,
+    _apply_disk_io_retention,
+)
+
+
+def _retention_step(conn, step: Callable[..., int], *, now_ms: int) -> int:
+    # Each step is its own transaction and its own trip to the writer connection, so
+    # tick batches get the writer lock between steps instead of after a whole cycle.
+    try:
+        conn.execute("BEGIN")
+        progressed = step(conn, now_ms=now_ms)
+        conn.commit()
+        return progressed
+    except Exception:
+        with suppress(Exception):
+            conn.rollback()
+        raise
+
+
+def _retention_cycle(conn, *, now_utc: datetime) -> int:
+    # Every step back to back on one connection the caller already holds.
+    now_ms = _epoch_ms(now_utc)
+    return sum(_retention_step(conn, step, now_ms=now_ms) for step in _RETENTION_STEPS)
 
 
 @dataclass
 class RetentionService:
     interval_seconds: int = 60
+    storage: AsyncStorage | None = None
     _task: asyncio.Task[None] | None = None
+    _owns_storage: bool = False
 
     def start(self) -> None:
         if self._task is not None and not self._task.done():
             return
+        if self.storage is None:
+            self.storage = AsyncStorage(max_workers=1)
+            self._owns_storage = True
         self._task = asyncio.create_task(self._run(), name="retention-service")
 
     async def stop(self) -> None:
@@ -211,25 +495,21 @@ class RetentionService:
         with suppress(asyncio.CancelledError):
             await self._task
         self._task = None
+        if self._owns_storage and self.storage is not None:
+            await asyncio.to_thread(self.storage.shutdown)
+            self.storage = None
+            self._owns_storage = False
 
     async def _run(self) -> None:
+        storage = self.storage
         while True:
-            now_utc = datetime.now(timezone.utc)
+            now_ms = _epoch_ms(datetime.now(timezone.utc))
             try:
-                with get_connection() as conn:
-                    try:
-                        conn.execute("BEGIN")
-                        progressed = 0
-                        progressed += _rollup_raw_to_1m(conn, now_utc=now_utc)
-                        progressed += _rollup_1m_to_15m(conn, now_utc=now_utc)
-                        _apply_retention(conn, now_utc=now_utc)
-                        conn.commit()
-                        if progressed:
-                            logger.debug("Retention progressed steps=%s", progressed)
-                    except Exception:
-                        with suppress(Exception):
-                            conn.rollback()
-                        raise
+                progressed = 0
+                for step in _RETENTION_STEPS:
+                    progressed += await storage.run(_retention_step, step, now_ms=now_ms)
+                if progressed:
+                    logger.debug("Retention progressed steps=%s", progressed)
             except Exception:
                 logger.exception("Retention cycle failed")
 
@@ -6,34 +6,75 @@ import time
 from collections import deque
 from contextlib import suppress
 from datetime import datetime, timezone
-from typing import Any, Callable
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
 
 from app.collectors.cpu import collect_cpu
 from app.collectors.disk import collect_disk
 from app.collectors.memory import collect_memory
 from app.collectors.network import collect_network
-from app.collectors.network_quality import classify_network, ping_latency_ms
+from app.collectors.pressure import collect_pressure
+from app.collectors.sockstat import collect_sockstat
+from app.collectors.latency_prober import get_default_prober
+from app.collectors.listening_ports import get_listening_ports
 from app.collectors.ports import get_port_status
+from app.collectors.cgroup_tree import get_top_cgroups
+from app.collectors.processes import get_top_processes
 from app.core.profiles import resolve_profile
 from app.core.config import ALERT_COOLDOWN_SECONDS
+from app.core.config import COLLECTOR_BUDGET_SECONDS, COLLECTOR_INTERVAL_SECONDS
 from app.core.config import ALERT_CPU_DURATION_SECONDS
 from app.core.config import ALERT_RAM_DURATION_SECONDS
 from app.core.config import ALERT_NET_OFFLINE_SECONDS
+from app.core.config import (
+    ALERT_PRESSURE_DURATION_SECONDS,
+    ALERT_PSI_CPU_SOME_PERCENT,
+    ALERT_PSI_IO_SOME_PERCENT,
+    ALERT_PSI_MEM_FULL_PERCENT,
+    ALERT_PSI_MEM_SOME_PERCENT,
+)
+from app.core.config import ALERT_SOCKETS_DURATION_SECONDS, ALERT_TCP_ORPHANS, ALERT_TCP_TIME_WAIT
 from app.core.config import FLAP_THRESHOLD, FLAP_WINDOW_SECONDS
 from app.core.config import NETWORK_PING_HOST
-from app.core.config import NETWORK_PING_TIMEOUT_MS
+from app.core.config import NETWORK_PROBE_TARGETS
 from app.core.config import SNAPSHOT_INTERVAL_SECONDS
-from app.storage.db import get_connection
-from app.storage.alerts import insert_alert
-from app.storage.events import insert_event
-from app.storage.snapshots import insert_snapshot
+from app.core.config import SNAPSHOT_MISSED_TICK_POLICY, SNAPSHOT_TICK_MODE
+from app.storage.db import get_db
+from app.storage.writer import BatchResult, PendingAlert, StorageWriter, TickBatch
+from app.services.adaptive_rate import AdaptiveRate
 from app.services.alert_state import AlertState
+from app.services.collection import CollectionStage
+from app.services.collector_registry import CollectorRegistry, CollectorSpec, EXECUTOR_DEDICATED, EXECUTOR_LOOP
+from app.services.docker_events import (
+    KIND_DIE,
+    KIND_HEALTH,
+    KIND_RESTART,
+    KIND_RESYNC,
+    KIND_START,
+    ContainerEvent,
+    DockerEventsSubscriber,
+)
 from app.services.docker_monitor import list_containers_with_stats
+from app.services.docker_stats import get_docker_stats_service
+from app.services.hot_tier import get_hot_tier
 from app.services.profile_state import ProfileState
+from app.services.tick_clock import TickClock
 from app.services.ws_manager import WebSocketManager
 
 logger = logging.getLogger(__name__)
 
+# Container flap detection: state changes (or restart bumps) inside the window.
+_DOCKER_FLAP_WINDOW_SECONDS: float = 60.0
+_DOCKER_FLAP_THRESHOLD: int = 3
+_DOCKER_BUMP_THRESHOLD: int = 2
+
+
+@dataclass(frozen=True, slots=True)
+class _TickContext:
+    ts_utc: str
+    now_utc: datetime
+    now_mono: float
+
 
 class SnapshotScheduler:
     def __init__(
@@ -43,16 +84,14 @@ class SnapshotScheduler:
         ws_manager: WebSocketManager | None = None,
         alert_state: AlertState | None = None,
         profile_state: ProfileState | None = None,
+        writer: StorageWriter | None = None,
     ) -> None:
-        self._interval_seconds = interval_seconds
         self._task: asyncio.Task[None] | None = None
+        self._publish_task: asyncio.Task[None] | None = None
         self._last_alert_sent: dict[tuple[str, str], float] = {}
         self._ws_manager = ws_manager
         self._alert_state = alert_state
         self._profile_state = profile_state
-        self._last_processes_broadcast_mono: float = 0.0
-        self._last_listening_ports_broadcast_mono: float = 0.0
-        self._last_docker_broadcast_mono: float = 0.0
         self._cpu_high_since_mono: float | None = None
         self._cpu_high_fired: bool = False
         self._ram_high_since_mono: float | None = None
@@ -60,6 +99,9 @@ class SnapshotScheduler:
         self._net_offline_since_mono: float | None = None
         self._net_offline_fired: bool = False
         self._net_poor_fired: bool = False
+        # Threshold rules that must hold for a duration, keyed by alert type.
+        self._sustained_since_mono: dict[str, float] = {}
+        self._sustained_fired: set[str] = set()
         self._port_last_state: dict[int, bool] = {}
         self._port_down_active: set[int] = set()
         self._port_flap_times: dict[int, deque[float]] = {}
@@ -67,17 +109,46 @@ class SnapshotScheduler:
         self._watch_port_last_state: dict[int, bool] = {}
         self._watch_port_last_info: dict[int, dict[str, Any]] = {}
         self._last_net_quality: str | None = None
-        self._last_ping_mono: float = 0.0
         self._last_latency_ms: float | None = None
+        self._last_probe: dict[str, Any] | None = None
         self._docker_last_running: dict[str, bool] = {}
         self._docker_last_restart: dict[str, int] = {}
         self._docker_state_change_times: dict[str, deque[float]] = {}
         self._docker_restart_bump_times: dict[str, deque[float]] = {}
         self._docker_flapping_active: set[str] = set()
+        self._docker_last_health: dict[str, str] = {}
+        self._docker_events = DockerEventsSubscriber()
+        self._collection = CollectionStage()
+        self._writer = writer if writer is not None else StorageWriter()
+        self._owns_writer = writer is None
+        self._batch = TickBatch()
+        # Batches handed to the writer, oldest first, with their pending commit.
+        self._committing: asyncio.Queue[tuple[TickBatch, asyncio.Future[BatchResult]]] = asyncio.Queue()
+        self._latest: dict[str, Any] = {}
+        self._watch_ports: list[int] = []
+        self.registry = CollectorRegistry(tick_seconds=float(interval_seconds))
+        self._consumers: dict[str, Callable[[_TickContext, Any], Awaitable[None]]] = {
+            "network_quality": self._consume_latency,
+            "ws_processes": self._consume_processes,
+            "ws_listening_ports": self._consume_listening_ports,
+            "ws_cgroups": self._consume_cgroups,
+            "docker": self._consume_docker,
+        }
+        self._register_collectors()
+        self._rate = AdaptiveRate(base_seconds=float(interval_seconds))
+        self._clock = TickClock(
+            float(interval_seconds),
+            mode=SNAPSHOT_TICK_MODE,
+            missed_policy=SNAPSHOT_MISSED_TICK_POLICY,
+        )
 
     def start(self) -> None:
         if self._task is not None and not self._task.done():
             return
+        if self._owns_writer:
+            self._writer.start()
+        self._docker_events.start()
+        self._publish_task = asyncio.create_task(self._publish_committed(), name="snapshot-publisher")
         self._task = asyncio.create_task(self._run(), name="snapshot-scheduler")
 
     async def stop(self) -> None:
@@ -87,13 +158,83 @@ class SnapshotScheduler:
         with suppress(asyncio.CancelledError):
             await self._task
         self._task = None
+        if self._publish_task is not None:
+            self._publish_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._publish_task
+            self._publish_task = None
+        self._docker_events.stop()
+        self._collection.shutdown()
+        if self._owns_writer:
+            await asyncio.to_thread(self._writer.stop)
 
-    def _safe_collect(self, name: str, func: Callable[[], Any]) -> Any:
-        try:
-            return func()
-        except Exception:
-            logger.exception("Collector failed: %s", name)
-            return None
+    def _register_collectors(self) -> None:
+        def spec(name: str, func: Callable[[], Any], **kwargs: Any) -> CollectorSpec:
+            return CollectorSpec(
+                name=name,
+                func=func,
+                interval_seconds=COLLECTOR_INTERVAL_SECONDS.get(name, float(SNAPSHOT_INTERVAL_SECONDS)),
+                budget_seconds=COLLECTOR_BUDGET_SECONDS.get(name, 0.5),
+                **kwargs,
+            )
+
+        # cpu/memory/disk/network/pressure/sockstat/ports_watch feed the per-tick snapshot directly;
+        # consumers are the handlers that run whenever a collector has a fresh value.
+        self.registry.register(spec("cpu", collect_cpu))
+        self.registry.register(spec("memory", collect_memory))
+        self.registry.register(spec("disk", collect_disk))
+        self.registry.register(spec("network", collect_network))
+        self.registry.register(spec("pressure", collect_pressure))
+        self.registry.register(spec("sockstat", collect_sockstat))
+        self.registry.register(spec("ports_watch", lambda: get_port_status(self._watch_ports)))
+        self.registry.register(
+            spec(
+                "ping",
+                get_default_prober().probe_once,
+                executor=EXECUTOR_LOOP,
+                consumers=("network_quality",),
+            )
+        )
+        self.registry.register(
+            spec(
+                "processes",
+                lambda: get_top_processes(10),
+                executor=EXECUTOR_DEDICATED,
+                consumers=("ws_processes",),
+                heavy=True,
+                requires_clients=True,
+            )
+        )
+        self.registry.register(
+            spec(
+                "listening_ports",
+                lambda: get_listening_ports(2000),
+                executor=EXECUTOR_DEDICATED,
+                consumers=("ws_listening_ports",),
+                heavy=True,
+                requires_clients=True,
+            )
+        )
+        self.registry.register(
+            spec(
+                "cgroups",
+                lambda: get_top_cgroups(10),
+                executor=EXECUTOR_DEDICATED,
+                consumers=("ws_cgroups",),
+                heavy=True,
+                requires_clients=True,
+            )
+        )
+        self.registry.register(
+            spec(
+                "docker",
+                lambda: list_containers_with_stats(include_stopped=True, limit=50),
+                executor=EXECUTOR_DEDICATED,
+                consumers=("docker",),
+                heavy=True,
+                requires_clients=True,
+            )
+        )
 
     def _can_send_alert(self, alert_type: str, key: str, now_monotonic: float) -> bool:
         last = self._last_alert_sent.get((alert_type, key))
@@ -132,668 +273,884 @@ class SnapshotScheduler:
             return None
         if not self._can_send_alert(type, key, now_monotonic):
             return None
-        try:
-            with get_connection() as conn:
-                alert_id = insert_alert(
-                    conn,
-                    {"ts_utc": ts_utc, "type": type, "message": message, "severity": severity},
-                )
-                event_id: int | None = None
-                try:
-                    event_id = insert_event(
-                        conn,
-                        {
-                            "ts_utc": ts_utc,
-                            "kind": "alert_created",
-                            "message": message,
-                            "severity": severity,
-                            "meta": {"alert_id": alert_id, "type": type, "key": key},
-                        },
-                    )
-                except Exception:
-                    logger.exception("Failed to insert timeline event for alert type=%s", type)
-            self._last_alert_sent[(type, key)] = now_monotonic
-            if event_id is not None:
-                await self._broadcast(
-                    {
-                        "type": "timeline_event",
-                        "v": 1,
-                        "ts_utc": ts_utc,
-                        "data": {
-                            "id": event_id,
-                            "kind": "alert_created",
-                            "severity": severity,
-                            "message": message,
-                        },
-                    }
+        alert: dict[str, Any] = {
+            "id": None,
+            "ts_utc": ts_utc,
+            "type": type,
+            "severity": severity,
+            "message": message,
+            "key": key,
+        }
+        # The row, its timeline event and the broadcasts go out with the tick batch;
+        # "id" is filled in once the writer has committed it.
+        self._batch.alerts.append(
+            PendingAlert(
+                alert=alert,
+                event={
+                    "ts_utc": ts_utc,
+                    "kind": "alert_created",
+                    "message": message,
+                    "severity": severity,
+                    "meta": {"type": type, "key": key},
+                },
+            )
+        )
+        self._last_alert_sent[(type, key)] = now_monotonic
+        return alert
+
+    async def _sustained_alert(
+        self,
+        ctx: _TickContext,
+        *,
+        type: str,
+        active: bool,
+        duration_seconds: float,
+        message: str,
+        severity: str,
+    ) -> bool:
+        # Fires once the condition has held for the duration and re-arms when it clears,
+        # like the cpu_high/ram_high rules. Returns True when an alert was queued.
+        if not active:
+            self._sustained_since_mono.pop(type, None)
+            self._sustained_fired.discard(type)
+            return False
+        since = self._sustained_since_mono.setdefault(type, ctx.now_mono)
+        if type in self._sustained_fired or (ctx.now_mono - since) < duration_seconds:
+            return False
+        alert = await self._emit_alert(
+            ctx.ts_utc,
+            ctx.now_utc,
+            ctx.now_mono,
+            type=type,
+            key="global",
+            message=message,
+            severity=severity,
+        )
+        if alert:
+            self._sustained_fired.add(type)
+            return True
+        if not self._is_muted(ctx.now_utc) and not self._can_send_alert(type, "global", ctx.now_mono):
+            self._sustained_fired.add(type)
+        return False
+
+    def _sustained_pending(self) -> bool:
+        return any(t not in self._sustained_fired for t in self._sustained_since_mono)
+
+    def _flush_batch(self) -> bool:
+        # Hands the batch to the writer without waiting for the commit, so the tick
+        # cadence never depends on commit latency or on who holds the writer lock;
+        # _publish_committed broadcasts the new IDs once they exist.
+        batch = self._batch
+        self._batch = TickBatch()
+        if batch.is_empty():
+            return False
+        self._committing.put_nowait((batch, asyncio.wrap_future(self._writer.submit(batch))))
+        return True
+
+    async def _publish_committed(self) -> None:
+        while True:
+            batch, commit = await self._committing.get()
+            try:
+                result = await commit
+            except Exception:
+                logger.exception(
+                    "Failed to persist tick batch (events=%d alerts=%d)",
+                    len(batch.events),
+                    len(batch.alerts),
                 )
-            return {
-                "id": alert_id,
+                continue
+            try:
+                await self._publish_batch(batch, result)
+            except Exception:
+                logger.exception("Failed to publish tick batch")
+
+    async def _publish_batch(self, batch: TickBatch, result: BatchResult) -> None:
+        # Only committed snapshots reach the hot tier, so memory never shows a point
+        # SQLite does not have.
+        if batch.snapshot is not None and result.snapshot_inserted:
+            get_hot_tier().append(batch.snapshot)
+        for event, event_id in zip(batch.events, result.event_ids):
+            await self._broadcast_timeline_event(event, event_id)
+        for pending, alert_id, event_id in zip(batch.alerts, result.alert_ids, result.alert_event_ids):
+            pending.alert["id"] = alert_id
+            if pending.event is not None and event_id is not None:
+                await self._broadcast_timeline_event(pending.event, event_id)
+            await self._broadcast(
+                {"type": "alert", "v": 1, "ts_utc": pending.alert["ts_utc"], "data": pending.alert}
+            )
+
+    async def _broadcast_timeline_event(self, event: dict[str, Any], event_id: int) -> None:
+        await self._broadcast(
+            {
+                "type": "timeline_event",
+                "v": 1,
+                "ts_utc": event["ts_utc"],
+                "data": {
+                    "id": event_id,
+                    "kind": event["kind"],
+                    "severity": event["severity"],
+                    "message": event["message"],
+                },
+            }
+        )
+
+    async def _consume_latency(self, ctx: _TickContext, probe: Any) -> None:
+        self._last_probe = probe if isinstance(probe, dict) else None
+        self._last_latency_ms = self._last_probe.get("latency_ms") if self._last_probe else None
+
+    async def _consume_processes(self, ctx: _TickContext, items: Any) -> None:
+        await self._broadcast(
+            {
+                "type": "processes",
+                "v": 1,
+                "ts_utc": ctx.ts_utc,
+                "data": {"items": items},
+            }
+        )
+
+    async def _consume_listening_ports(self, ctx: _TickContext, items: Any) -> None:
+        await self._broadcast(
+            {
+                "type": "listening_ports",
+                "v": 1,
+                "ts_utc": ctx.ts_utc,
+                "data": {"items": items},
+            }
+        )
+
+    async def _consume_cgroups(self, ctx: _TickContext, payload: Any) -> None:
+        await self._broadcast(
+            {
+                "type": "cgroups",
+                "v": 1,
+                "ts_utc": ctx.ts_utc,
+                "data": payload,
+            }
+        )
+
+    async def _consume_docker(self, ctx: _TickContext, payload: Any) -> None:
+        # The listing only feeds the dashboard; container state alerts come from
+        # the events stream (see _consume_docker_events).
+        available = bool(payload.get("available")) if isinstance(payload, dict) else False
+        reason = str(payload.get("reason")) if isinstance(payload, dict) else "unknown"
+        items = payload.get("items") if isinstance(payload, dict) else []
+        if not isinstance(items, list):
+            items = []
+
+        await self._broadcast(
+            {
+                "type": "docker",
+                "v": 1,
+                "ts_utc": ctx.ts_utc,
+                "data": {"available": available, "reason": reason, "items": items},
+            }
+        )
+
+    async def _docker_state_change(
+        self, ctx: _TickContext, event: ContainerEvent, ts_utc: str, at_mono: float
+    ) -> None:
+        cid, name, running = event.container_id, event.name, bool(event.running)
+        times = self._docker_state_change_times.setdefault(cid, deque())
+        times.append(at_mono)
+        cutoff = at_mono - _DOCKER_FLAP_WINDOW_SECONDS
+        while times and times[0] < cutoff:
+            times.popleft()
+
+        self._docker_last_running[cid] = running
+        if not running:
+            get_docker_stats_service().cancel(cid)
+
+        kind = "container_up" if running else "container_down"
+        severity = "info" if running else "critical"
+        message = f"Docker container {name} {'UP' if running else 'DOWN'}"
+        if event.exit_code is not None:
+            message += f" (exit {event.exit_code})"
+        self._batch.events.append(
+            {
                 "ts_utc": ts_utc,
-                "type": type,
+                "kind": kind,
+                "message": message,
                 "severity": severity,
+                "meta": {
+                    "id": cid,
+                    "name": name,
+                    "state": "running" if running else "exited",
+                    "exit_code": event.exit_code,
+                },
+            }
+        )
+
+        if not running:
+            await self._emit_alert(
+                ts_utc,
+                ctx.now_utc,
+                ctx.now_mono,
+                type="container_down",
+                key=cid,
+                message=message,
+                severity="critical",
+            )
+
+        if len(times) >= _DOCKER_FLAP_THRESHOLD and cid not in self._docker_flapping_active:
+            alert = await self._emit_alert(
+                ts_utc,
+                ctx.now_utc,
+                ctx.now_mono,
+                type="container_flapping",
+                key=cid,
+                message=f"Docker container flapping: {name} ({len(times)} state changes in {int(_DOCKER_FLAP_WINDOW_SECONDS)}s)",
+                severity="warning",
+            )
+            if alert:
+                self._docker_flapping_active.add(cid)
+
+    async def _docker_restart_bumps(
+        self, ctx: _TickContext, event: ContainerEvent, ts_utc: str, at_mono: float, count: int
+    ) -> None:
+        cid, name = event.container_id, event.name
+        bumps = self._docker_restart_bump_times.setdefault(cid, deque())
+        for _ in range(count):
+            bumps.append(at_mono)
+        cutoff = at_mono - _DOCKER_FLAP_WINDOW_SECONDS
+        while bumps and bumps[0] < cutoff:
+            bumps.popleft()
+
+        if len(bumps) >= _DOCKER_BUMP_THRESHOLD and cid not in self._docker_flapping_active:
+            alert = await self._emit_alert(
+                ts_utc,
+                ctx.now_utc,
+                ctx.now_mono,
+                type="container_flapping",
+                key=cid,
+                message=f"Docker container restarting frequently: {name} (+{len(bumps)} in {int(_DOCKER_FLAP_WINDOW_SECONDS)}s)",
+                severity="warning",
+            )
+            if alert:
+                self._docker_flapping_active.add(cid)
+
+    async def _docker_health(self, ctx: _TickContext, event: ContainerEvent, ts_utc: str) -> None:
+        cid, name, health = event.container_id, event.name, event.health or "unknown"
+        prev = self._docker_last_health.get(cid)
+        self._docker_last_health[cid] = health
+        if prev == health or (prev is None and health == "healthy"):
+            return
+        unhealthy = health == "unhealthy"
+        message = f"Docker container {name} {health}"
+        self._batch.events.append(
+            {
+                "ts_utc": ts_utc,
+                "kind": "container_health",
                 "message": message,
-                "key": key,
+                "severity": "warning" if unhealthy else "info",
+                "meta": {"id": cid, "name": name, "health": health, "prev": prev},
             }
-        except Exception:
-            logger.exception("Failed to insert alert type=%s", type)
-            return None
+        )
+        if unhealthy:
+            await self._emit_alert(
+                ts_utc,
+                ctx.now_utc,
+                ctx.now_mono,
+                type="container_unhealthy",
+                key=cid,
+                message=message,
+                severity="warning",
+            )
+
+    async def _consume_docker_events(self, ctx: _TickContext, events: list[ContainerEvent]) -> None:
+        now_wall = time.time()
+        resynced: set[str] | None = None
+        for event in events:
+            cid = event.container_id
+            # Place the event at its own time on both clocks, not at this tick.
+            at_mono = ctx.now_mono - max(0.0, now_wall - event.ts_epoch)
+            ts_utc = datetime.fromtimestamp(event.ts_epoch, tz=timezone.utc).isoformat()
+
+            if event.kind == KIND_RESYNC:
+                # Full listing after a (re)connect: diff against what we knew, exactly
+                # like the old poller did, then rely on events again.
+                if resynced is None:
+                    resynced = set()
+                resynced.add(cid)
+                prev_running = self._docker_last_running.get(cid)
+                prev_restart = self._docker_last_restart.get(cid)
+                restart_count = int(event.restart_count or 0)
+                self._docker_last_restart[cid] = restart_count
+                if prev_running is None:
+                    self._docker_last_running[cid] = bool(event.running)
+                    continue
+                if prev_running != bool(event.running):
+                    await self._docker_state_change(ctx, event, ctx.ts_utc, ctx.now_mono)
+                if prev_restart is not None and restart_count > prev_restart:
+                    await self._docker_restart_bumps(
+                        ctx, event, ctx.ts_utc, ctx.now_mono, restart_count - prev_restart
+                    )
+            elif event.kind in (KIND_START, KIND_DIE):
+                if self._docker_last_running.get(cid) == bool(event.running):
+                    continue
+                await self._docker_state_change(ctx, event, ts_utc, at_mono)
+            elif event.kind == KIND_RESTART:
+                self._docker_last_restart[cid] = self._docker_last_restart.get(cid, 0) + 1
+                await self._docker_restart_bumps(ctx, event, ts_utc, at_mono, 1)
+            elif event.kind == KIND_HEALTH:
+                await self._docker_health(ctx, event, ts_utc)
+
+        if resynced is not None:
+            # Containers missing from the listing were removed while we were away.
+            for state in (self._docker_last_running, self._docker_last_restart, self._docker_last_health):
+                for cid in [c for c in state if c not in resynced]:
+                    del state[cid]
+
+        for cid, times in list(self._docker_state_change_times.items()):
+            cutoff = ctx.now_mono - (_DOCKER_FLAP_WINDOW_SECONDS * 2)
+            while times and times[0] < cutoff:
+                times.popleft()
+            if not times:
+                del self._docker_state_change_times[cid]
+                self._docker_flapping_active.discard(cid)
 
     async def _run(self) -> None:
         while True:
-            now_utc_dt = datetime.now(timezone.utc)
-            ts_utc = now_utc_dt.isoformat()
-            now_mono = time.monotonic()
+            tick = await self._clock.next_tick()
+            try:
+                await self._tick()
+            except Exception:
+                logger.exception("Snapshot tick failed")
+            self._clock.tick_done(tick)
 
-            active_profile_name = "default"
-            if self._profile_state is not None:
-                try:
-                    async with self._profile_state.lock:
-                        active_profile_name = self._profile_state.active_name
-                except Exception:
-                    active_profile_name = "default"
-            profile = resolve_profile(active_profile_name)
-            watch_ports = list(profile.watch_ports)
-            required_ports = list(profile.required_ports)
-            required_ports_set = set(required_ports)
-            alert_cpu_percent = int(profile.alert_cpu_percent)
-            alert_ram_percent = int(profile.alert_ram_percent)
-
-            cpu = self._safe_collect("cpu", collect_cpu) or {}
-            mem = self._safe_collect("memory", collect_memory) or {}
-            disk = self._safe_collect("disk", collect_disk) or {}
-            net = self._safe_collect("network", collect_network) or {}
-
-            ports_watch_statuses = self._safe_collect(
-                "ports_watch", lambda: get_port_status(watch_ports)
-            ) or []
-            # Avoid pinging the network every snapshot tick. The local dashboard should
-            # still update throughput every second, but network quality can be slower.
-            latency_ms = self._last_latency_ms
-            if latency_ms is None or (now_mono - self._last_ping_mono) >= 10.0:
-                latency_ms = await asyncio.to_thread(
-                    ping_latency_ms, NETWORK_PING_HOST, NETWORK_PING_TIMEOUT_MS
-                )
-                self._last_latency_ms = latency_ms
-                self._last_ping_mono = now_mono
-            net_quality = classify_network(latency_ms)
+    def wake(self) -> None:
+        # A dashboard appeared or became visible: drop back to the base rate now
+        # rather than after the current (possibly long) interval.
+        base = float(self._rate.base_seconds)
+        if self._clock.interval_seconds != base:
+            self._clock.set_interval(base)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._clock.stats(),
+            "sampling": self._rate.stats(),
+            "collectors": self._collection.status(),
+            "docker_events": self._docker_events.stats(),
+            "db": get_db().stats(),
+            "hot_tier": get_hot_tier().stats(),
+            "rollups": self._writer.rollups.stats(),
+        }
+
+    def describe_collectors(self) -> list[dict[str, object]]:
+        status = self._collection.status()
+        items = self.registry.describe()
+        for item in items:
+            item["status"] = status.get(str(item["name"]))
+        return items
+
+    async def _tick(self) -> None:
+        now_utc_dt = datetime.now(timezone.utc)
+        ts_utc = now_utc_dt.isoformat()
+        # Stored rows are keyed by epoch milliseconds; ts_utc is for messages and events.
+        ts_ms = int(now_utc_dt.timestamp() * 1000)
+        now_mono = time.monotonic()
+
+        active_profile_name = "default"
+        if self._profile_state is not None:
+            try:
+                async with self._profile_state.lock:
+                    active_profile_name = self._profile_state.active_name
+            except Exception:
+                active_profile_name = "default"
+        profile = resolve_profile(active_profile_name)
+        watch_ports = list(profile.watch_ports)
+        required_ports = list(profile.required_ports)
+        required_ports_set = set(required_ports)
+        alert_cpu_percent = int(profile.alert_cpu_percent)
+        alert_ram_percent = int(profile.alert_ram_percent)
+
+        self._watch_ports = watch_ports
+        self._batch = TickBatch()
+        ctx = _TickContext(ts_utc=ts_utc, now_utc=now_utc_dt, now_mono=now_mono)
 
-            port_info: dict[int, dict[str, Any]] = {}
-            for item in ports_watch_statuses:
-                if not isinstance(item, dict):
+        has_clients = self._ws_manager is not None and await self._ws_manager.has_connections()
+        all_hidden = has_clients and await self._ws_manager.all_hidden()
+        # The interval this tick was scheduled with, i.e. the span the point stands for.
+        sample_interval_s = float(self._clock.interval_seconds)
+        due = self.registry.due(now_mono, has_clients=has_clients)
+        due_names = {spec.name for spec in due}
+        # Runs that outlived an earlier tick are followed so their results still
+        # reach consumers as soon as they land.
+        follow = [
+            spec.name
+            for spec in self.registry.specs()
+            if spec.name not in due_names and self._collection.has_pending(spec.name)
+        ]
+        results = await self._collection.collect(due, follow=follow)
+        stale_collectors = sorted(name for name, r in results.items() if r.stale)
+        for name, result in results.items():
+            self._latest[name] = result.value
+
+        for name, result in results.items():
+            spec = self.registry.get(name)
+            if spec is None or not result.fresh:
+                continue
+            for consumer in spec.consumers:
+                handler = self._consumers.get(consumer)
+                if handler is None:
+                    logger.warning("Collector %s has unknown consumer %s", name, consumer)
                     continue
                 try:
-                    port_val = int(item.get("port"))
+                    await handler(ctx, result.value)
                 except Exception:
-                    continue
-                port_info[port_val] = item
+                    logger.exception("Consumer %s failed for collector %s", consumer, name)
 
-            events_to_insert: list[dict[str, Any]] = []
+        try:
+            await self._consume_docker_events(ctx, self._docker_events.drain())
+        except Exception:
+            logger.exception("Docker events consumer failed")
 
-            for port in watch_ports:
-                item = port_info.get(
-                    port,
-                    {"port": port, "listening": False, "pid": None, "process_name": None},
-                )
-                current = bool(item.get("listening"))
-                previous = self._watch_port_last_state.get(port)
-                if previous is None:
-                    self._watch_port_last_state[port] = current
-                    self._watch_port_last_info[port] = item
-                    continue
-                if previous == current:
-                    continue
+        cpu = self._latest.get("cpu") or {}
+        mem = self._latest.get("memory") or {}
+        disk = self._latest.get("disk") or {}
+        net = self._latest.get("network") or {}
+        pressure = self._latest.get("pressure") or {}
+        sockstat = self._latest.get("sockstat") or {}
+        ports_watch_statuses = self._latest.get("ports_watch") or []
+        latency_ms = self._last_latency_ms
+        probe = self._last_probe or {}
+        net_quality = str(probe.get("status") or "offline")
+
+        port_info: dict[int, dict[str, Any]] = {}
+        for item in ports_watch_statuses:
+            if not isinstance(item, dict):
+                continue
+            try:
+                port_val = int(item.get("port"))
+            except Exception:
+                continue
+            port_info[port_val] = item
+
+        events_to_insert: list[dict[str, Any]] = []
 
+        for port in watch_ports:
+            item = port_info.get(
+                port,
+                {"port": port, "listening": False, "pid": None, "process_name": None},
+            )
+            current = bool(item.get("listening"))
+            previous = self._watch_port_last_state.get(port)
+            if previous is None:
                 self._watch_port_last_state[port] = current
                 self._watch_port_last_info[port] = item
+                continue
+            if previous == current:
+                continue
 
-                if current:
-                    pid = item.get("pid")
-                    process_name = item.get("process_name")
-                    details: list[str] = []
-                    if pid:
-                        details.append(f"PID {pid}")
-                    if process_name:
-                        details.append(str(process_name))
-                    suffix = f" ({' '.join(details)})" if details else ""
-                    events_to_insert.append(
-                        {
-                            "ts_utc": ts_utc,
-                            "kind": "port_up",
-                            "message": f"Port {port} UP{suffix}",
-                            "severity": "info",
-                            "meta": {
-                                "port": port,
-                                "pid": pid,
-                                "process_name": process_name,
-                            },
-                        }
-                    )
-                else:
-                    events_to_insert.append(
-                        {
-                            "ts_utc": ts_utc,
-                            "kind": "port_down",
-                            "message": f"Port {port} DOWN",
-                            "severity": "critical" if port in required_ports_set else "warning",
-                            "meta": {"port": port},
-                        }
-                    )
+            self._watch_port_last_state[port] = current
+            self._watch_port_last_info[port] = item
 
-            if self._last_net_quality is None:
-                self._last_net_quality = net_quality
-            elif self._last_net_quality != net_quality:
-                prev = self._last_net_quality
-                self._last_net_quality = net_quality
-                latency_str = "N/A" if latency_ms is None else f"{latency_ms:.0f}ms"
-                severity = (
-                    "critical"
-                    if net_quality == "offline"
-                    else "warning"
-                    if net_quality == "poor"
-                    else "info"
+            if current:
+                pid = item.get("pid")
+                process_name = item.get("process_name")
+                details: list[str] = []
+                if pid:
+                    details.append(f"PID {pid}")
+                if process_name:
+                    details.append(str(process_name))
+                suffix = f" ({' '.join(details)})" if details else ""
+                events_to_insert.append(
+                    {
+                        "ts_utc": ts_utc,
+                        "kind": "port_up",
+                        "message": f"Port {port} UP{suffix}",
+                        "severity": "info",
+                        "meta": {
+                            "port": port,
+                            "pid": pid,
+                            "process_name": process_name,
+                        },
+                    }
                 )
+            else:
                 events_to_insert.append(
                     {
                         "ts_utc": ts_utc,
-                        "kind": "network_status",
-                        "message": f"Network status changed: {prev} -> {net_quality} (latency {latency_str})",
-                        "severity": severity,
-                        "meta": {"prev": prev, "status": net_quality, "latency_ms": latency_ms},
+                        "kind": "port_down",
+                        "message": f"Port {port} DOWN",
+                        "severity": "critical" if port in required_ports_set else "warning",
+                        "meta": {"port": port},
                     }
                 )
 
-            if events_to_insert:
-                try:
-                    with get_connection() as conn:
-                        for ev in events_to_insert:
-                            event_id = insert_event(conn, ev)
-                            await self._broadcast(
-                                {
-                                    "type": "timeline_event",
-                                    "v": 1,
-                                    "ts_utc": ts_utc,
-                                    "data": {
-                                        "id": event_id,
-                                        "kind": ev["kind"],
-                                        "severity": ev["severity"],
-                                        "message": ev["message"],
-                                    },
-                                }
-                            )
-                except Exception:
-                    logger.exception("Failed to insert timeline events")
-
-            snapshot: dict[str, Any] = {
-                "ts_utc": ts_utc,
-                "cpu_percent": cpu.get("percent"),
-                "mem_percent": mem.get("percent"),
-                "mem_used_bytes": mem.get("used_bytes"),
-                "mem_avail_bytes": mem.get("available_bytes"),
-                "mem_total_bytes": mem.get("total_bytes"),
-                "disk_percent": disk.get("percent"),
-                "disk_used_bytes": disk.get("used_bytes"),
-                "disk_free_bytes": disk.get("free_bytes"),
-                "disk_total_bytes": disk.get("total_bytes"),
-                "net_sent_bps": net.get("bytes_sent_per_sec"),
-                "net_recv_bps": net.get("bytes_recv_per_sec"),
-            }
-
-            inserted = False
-            try:
-                with get_connection() as conn:
-                    insert_snapshot(conn, snapshot)
-                inserted = True
-            except Exception:
-                logger.exception("Failed to insert snapshot")
-
-            await self._broadcast(
-                {
-                    "type": "kpi",
-                    "v": 1,
-                    "ts_utc": ts_utc,
-                    "data": {
-                        "cpu_percent": snapshot.get("cpu_percent"),
-                        "mem_percent": snapshot.get("mem_percent"),
-                        "mem_used_bytes": snapshot.get("mem_used_bytes"),
-                        "mem_avail_bytes": snapshot.get("mem_avail_bytes"),
-                        "mem_total_bytes": snapshot.get("mem_total_bytes"),
-                        "disk_percent": snapshot.get("disk_percent"),
-                        "disk_used_bytes": snapshot.get("disk_used_bytes"),
-                        "disk_free_bytes": snapshot.get("disk_free_bytes"),
-                        "disk_total_bytes": snapshot.get("disk_total_bytes"),
-                        "net_sent_bps": snapshot.get("net_sent_bps"),
-                        "net_recv_bps": snapshot.get("net_recv_bps"),
-                        "network_quality": net_quality,
-                        "ping_latency_ms": latency_ms,
-                    },
-                }
+        if self._last_net_quality is None:
+            self._last_net_quality = net_quality
+        elif self._last_net_quality != net_quality:
+            prev = self._last_net_quality
+            self._last_net_quality = net_quality
+            p95_ms = probe.get("p95_ms")
+            loss_percent = probe.get("loss_percent")
+            latency_str = "N/A" if p95_ms is None else f"p95 {p95_ms:.0f}ms"
+            if loss_percent:
+                latency_str += f", loss {loss_percent:.0f}%"
+            severity = (
+                "critical"
+                if net_quality == "offline"
+                else "warning"
+                if net_quality == "poor"
+                else "info"
             )
-            await self._broadcast(
+            events_to_insert.append(
                 {
-                    "type": "chart_point",
-                    "v": 1,
                     "ts_utc": ts_utc,
-                    "data": {
-                        "cpu_percent": snapshot.get("cpu_percent"),
-                        "mem_percent": snapshot.get("mem_percent"),
-                        "net_sent_bps": snapshot.get("net_sent_bps"),
-                        "net_recv_bps": snapshot.get("net_recv_bps"),
+                    "kind": "network_status",
+                    "message": f"Network status changed: {prev} -> {net_quality} ({latency_str})",
+                    "severity": severity,
+                    "meta": {
+                        "prev": prev,
+                        "status": net_quality,
+                        "latency_ms": latency_ms,
+                        "p50_ms": probe.get("p50_ms"),
+                        "p95_ms": p95_ms,
+                        "max_ms": probe.get("max_ms"),
+                        "jitter_ms": probe.get("jitter_ms"),
+                        "loss_percent": loss_percent,
                     },
                 }
             )
 
-            alerts_inserted = 0
+        self._batch.events.extend(events_to_insert)
+
+        snapshot: dict[str, Any] = {
+            "ts_ms": ts_ms,
+            "cpu_percent": cpu.get("percent"),
+            "mem_percent": mem.get("percent"),
+            "mem_used_bytes": mem.get("used_bytes"),
+            "mem_avail_bytes": mem.get("available_bytes"),
+            "mem_total_bytes": mem.get("total_bytes"),
+            "disk_percent": disk.get("percent"),
+            "disk_used_bytes": disk.get("used_bytes"),
+            "disk_free_bytes": disk.get("free_bytes"),
+            "disk_total_bytes": disk.get("total_bytes"),
+            "net_sent_bps": net.get("bytes_sent_per_sec"),
+            "net_recv_bps": net.get("bytes_recv_per_sec"),
+            "interval_s": sample_interval_s,
+        }
+        # psi_* and sock_used/tcp_* keys map one-to-one onto snapshot columns; on hosts
+        # without /proc/pressure or /proc/net/sockstat they stay NULL.
+        snapshot.update(pressure)
+        snapshot.update(sockstat)
+
+        self._batch.snapshot = snapshot
+        self._batch.disk_io = [
+            {**row, "ts_ms": ts_ms, "interval_s": sample_interval_s}
+            for row in disk.get("devices") or []
+            if isinstance(row, dict)
+        ]
+
+        await self._broadcast(
+            {
+                "type": "kpi",
+                "v": 1,
+                "ts_utc": ts_utc,
+                "data": {
+                    "cpu_percent": snapshot.get("cpu_percent"),
+                    "mem_percent": snapshot.get("mem_percent"),
+                    "mem_used_bytes": snapshot.get("mem_used_bytes"),
+                    "mem_avail_bytes": snapshot.get("mem_avail_bytes"),
+                    "mem_total_bytes": snapshot.get("mem_total_bytes"),
+                    "disk_percent": snapshot.get("disk_percent"),
+                    "disk_used_bytes": snapshot.get("disk_used_bytes"),
+                    "disk_free_bytes": snapshot.get("disk_free_bytes"),
+                    "disk_total_bytes": snapshot.get("disk_total_bytes"),
+                    "net_sent_bps": snapshot.get("net_sent_bps"),
+                    "net_recv_bps": snapshot.get("net_recv_bps"),
+                    "network_quality": net_quality,
+                    "ping_latency_ms": latency_ms,
+                    "ping_p50_ms": probe.get("p50_ms"),
+                    "ping_p95_ms": probe.get("p95_ms"),
+                    "ping_max_ms": probe.get("max_ms"),
+                    "ping_jitter_ms": probe.get("jitter_ms"),
+                    "ping_loss_percent": probe.get("loss_percent"),
+                    "load_1m": cpu.get("load_1m"),
+                    "load_5m": cpu.get("load_5m"),
+                    "load_15m": cpu.get("load_15m"),
+                    "ctx_switches_per_sec": cpu.get("ctx_switches_per_sec"),
+                    "interrupts_per_sec": cpu.get("interrupts_per_sec"),
+                    "psi_cpu_some_avg10": pressure.get("psi_cpu_some_avg10"),
+                    "psi_mem_some_avg10": pressure.get("psi_mem_some_avg10"),
+                    "psi_mem_full_avg10": pressure.get("psi_mem_full_avg10"),
+                    "psi_io_some_avg10": pressure.get("psi_io_some_avg10"),
+                    "psi_io_full_avg10": pressure.get("psi_io_full_avg10"),
+                    "tcp_inuse": sockstat.get("tcp_inuse"),
+                    "tcp_orphan": sockstat.get("tcp_orphan"),
+                    "tcp_tw": sockstat.get("tcp_tw"),
+                    "stale_collectors": stale_collectors,
+                    "interval_s": sample_interval_s,
+                    "rate_reason": self._rate.reason,
+                },
+            }
+        )
+        await self._broadcast(
+            {
+                "type": "chart_point",
+                "v": 1,
+                "ts_utc": ts_utc,
+                "data": {
+                    "cpu_percent": snapshot.get("cpu_percent"),
+                    "mem_percent": snapshot.get("mem_percent"),
+                    "net_sent_bps": snapshot.get("net_sent_bps"),
+                    "net_recv_bps": snapshot.get("net_recv_bps"),
+                    "interval_s": sample_interval_s,
+                },
+            }
+        )
 
-            port_state: dict[int, bool] = {
-                port: bool(port_info.get(port, {}).get("listening"))
-                for port in required_ports
+        await self._broadcast(
+            {
+                "type": "disks",
+                "v": 1,
+                "ts_utc": ts_utc,
+                "data": {"mounts": disk.get("mounts") or [], "devices": disk.get("devices") or []},
             }
+        )
 
-            for port in required_ports:
-                current = port_state.get(port, False)
-                previous = self._port_last_state.get(port)
-                if previous is None:
-                    self._port_last_state[port] = current
-                elif previous != current:
-                    times = self._port_flap_times.setdefault(port, deque())
-                    times.append(now_mono)
-                    self._port_last_state[port] = current
-
-                times = self._port_flap_times.get(port)
-                if times is not None:
-                    cutoff = now_mono - float(FLAP_WINDOW_SECONDS)
-                    while times and times[0] < cutoff:
-                        times.popleft()
-                    if len(times) >= int(FLAP_THRESHOLD):
-                        if port not in self._port_flapping_active:
-                            if self._is_muted(now_utc_dt):
-                                pass
-                            elif not self._can_send_alert("port_flapping", str(port), now_mono):
-                                self._port_flapping_active.add(port)
-                            else:
-                                alert = await self._emit_alert(
-                                    ts_utc,
-                                    now_utc_dt,
-                                    now_mono,
-                                    type="port_flapping",
-                                    key=str(port),
-                                    message=f"Port {port} is flapping ({len(times)} state changes in {FLAP_WINDOW_SECONDS}s)",
-                                    severity="warning",
-                                )
-                                if alert:
-                                    self._port_flapping_active.add(port)
-                                    alerts_inserted += 1
-                                    await self._broadcast(
-                                        {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                                    )
-                    else:
-                        self._port_flapping_active.discard(port)
+        alerts_inserted = 0
 
-                if current:
-                    self._port_down_active.discard(port)
-                else:
-                    if port not in self._port_down_active:
+        port_state: dict[int, bool] = {
+            port: bool(port_info.get(port, {}).get("listening"))
+            for port in required_ports
+        }
+
+        for port in required_ports:
+            current = port_state.get(port, False)
+            previous = self._port_last_state.get(port)
+            if previous is None:
+                self._port_last_state[port] = current
+            elif previous != current:
+                times = self._port_flap_times.setdefault(port, deque())
+                times.append(now_mono)
+                self._port_last_state[port] = current
+
+            times = self._port_flap_times.get(port)
+            if times is not None:
+                cutoff = now_mono - float(FLAP_WINDOW_SECONDS)
+                while times and times[0] < cutoff:
+                    times.popleft()
+                if len(times) >= int(FLAP_THRESHOLD):
+                    if port not in self._port_flapping_active:
                         if self._is_muted(now_utc_dt):
                             pass
-                        elif not self._can_send_alert("port_down", str(port), now_mono):
-                            self._port_down_active.add(port)
+                        elif not self._can_send_alert("port_flapping", str(port), now_mono):
+                            self._port_flapping_active.add(port)
                         else:
                             alert = await self._emit_alert(
                                 ts_utc,
                                 now_utc_dt,
                                 now_mono,
-                                type="port_down",
+                                type="port_flapping",
                                 key=str(port),
-                                message=f"Required port down: {port}",
-                                severity="critical",
+                                message=f"Port {port} is flapping ({len(times)} state changes in {FLAP_WINDOW_SECONDS}s)",
+                                severity="warning",
                             )
                             if alert:
+                                self._port_flapping_active.add(port)
                                 alerts_inserted += 1
-                                self._port_down_active.add(port)
-                                await self._broadcast(
-                                    {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                                )
+                else:
+                    self._port_flapping_active.discard(port)
 
+            if current:
+                self._port_down_active.discard(port)
+            else:
+                if port not in self._port_down_active:
+                    if self._is_muted(now_utc_dt):
+                        pass
+                    elif not self._can_send_alert("port_down", str(port), now_mono):
+                        self._port_down_active.add(port)
+                    else:
+                        alert = await self._emit_alert(
+                            ts_utc,
+                            now_utc_dt,
+                            now_mono,
+                            type="port_down",
+                            key=str(port),
+                            message=f"Required port down: {port}",
+                            severity="critical",
+                        )
+                        if alert:
+                            alerts_inserted += 1
+                            self._port_down_active.add(port)
+
+
+        cpu_percent = float(snapshot.get("cpu_percent") or 0.0)
+        if cpu_percent >= alert_cpu_percent:
+            if self._cpu_high_since_mono is None:
+                self._cpu_high_since_mono = now_mono
             if (
-                self._ws_manager is not None
-                and await self._ws_manager.has_connections()
-                and (now_mono - self._last_processes_broadcast_mono) >= 5.0
+                not self._cpu_high_fired
+                and self._cpu_high_since_mono is not None
+                and (now_mono - self._cpu_high_since_mono) >= float(ALERT_CPU_DURATION_SECONDS)
             ):
-                self._last_processes_broadcast_mono = now_mono
-                try:
-                    from app.collectors.processes import get_top_processes
-
-                    items = await asyncio.to_thread(get_top_processes, 10)
-                    await self._broadcast(
-                        {
-                            "type": "processes",
-                            "v": 1,
-                            "ts_utc": ts_utc,
-                            "data": {"items": items},
-                        }
-                    )
-                except Exception:
-                    logger.exception("Failed to broadcast processes")
+                alert = await self._emit_alert(
+                    ts_utc,
+                    now_utc_dt,
+                    now_mono,
+                    type="cpu_high",
+                    key="global",
+                    message=f"CPU usage high for {ALERT_CPU_DURATION_SECONDS}s: {cpu_percent:.1f}%",
+                    severity="warning",
+                )
+                if alert:
+                    self._cpu_high_fired = True
+                    alerts_inserted += 1
+                elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
+                    "cpu_high", "global", now_mono
+                ):
+                    self._cpu_high_fired = True
+        else:
+            self._cpu_high_since_mono = None
+            self._cpu_high_fired = False
 
+        mem_percent = float(snapshot.get("mem_percent") or 0.0)
+        if mem_percent >= alert_ram_percent:
+            if self._ram_high_since_mono is None:
+                self._ram_high_since_mono = now_mono
             if (
-                self._ws_manager is not None
-                and await self._ws_manager.has_connections()
-                and (now_mono - self._last_listening_ports_broadcast_mono) >= 5.0
+                not self._ram_high_fired
+                and self._ram_high_since_mono is not None
+                and (now_mono - self._ram_high_since_mono) >= float(ALERT_RAM_DURATION_SECONDS)
             ):
-                self._last_listening_ports_broadcast_mono = now_mono
-                try:
-                    from app.collectors.listening_ports import get_listening_ports
-
-                    items = await asyncio.to_thread(get_listening_ports, 2000)
-                    await self._broadcast(
-                        {
-                            "type": "listening_ports",
-                            "v": 1,
-                            "ts_utc": ts_utc,
-                            "data": {"items": items},
-                        }
-                    )
-                except Exception:
-                    logger.exception("Failed to broadcast listening_ports")
+                alert = await self._emit_alert(
+                    ts_utc,
+                    now_utc_dt,
+                    now_mono,
+                    type="ram_high",
+                    key="global",
+                    message=f"RAM usage high for {ALERT_RAM_DURATION_SECONDS}s: {mem_percent:.1f}%",
+                    severity="warning",
+                )
+                if alert:
+                    self._ram_high_fired = True
+                    alerts_inserted += 1
+                elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
+                    "ram_high", "global", now_mono
+                ):
+                    self._ram_high_fired = True
+        else:
+            self._ram_high_since_mono = None
+            self._ram_high_fired = False
+
+        pressure_rules = (
+            ("cpu_pressure", "psi_cpu_some_avg10", ALERT_PSI_CPU_SOME_PERCENT, "CPU pressure", "some tasks", "warning"),
+            ("memory_pressure", "psi_mem_some_avg10", ALERT_PSI_MEM_SOME_PERCENT, "Memory pressure", "some tasks", "warning"),
+            ("memory_pressure_full", "psi_mem_full_avg10", ALERT_PSI_MEM_FULL_PERCENT, "Memory pressure", "all tasks", "critical"),
+            ("io_pressure", "psi_io_some_avg10", ALERT_PSI_IO_SOME_PERCENT, "IO pressure", "some tasks", "warning"),
+        )
+        for alert_type, field, limit, label, who, severity in pressure_rules:
+            value = pressure.get(field)
+            if await self._sustained_alert(
+                ctx,
+                type=alert_type,
+                active=value is not None and float(value) >= limit,
+                duration_seconds=float(ALERT_PRESSURE_DURATION_SECONDS),
+                message=f"{label} high for {ALERT_PRESSURE_DURATION_SECONDS}s: {who} stalled {float(value or 0.0):.1f}% of the time",
+                severity=severity,
+            ):
+                alerts_inserted += 1
+
+        socket_rules = (
+            ("tcp_time_wait_high", "tcp_tw", ALERT_TCP_TIME_WAIT, "TIME_WAIT"),
+            ("tcp_orphans_high", "tcp_orphan", ALERT_TCP_ORPHANS, "orphaned"),
+        )
+        for alert_type, field, limit, label in socket_rules:
+            value = sockstat.get(field)
+            if await self._sustained_alert(
+                ctx,
+                type=alert_type,
+                active=value is not None and int(value) >= limit,
+                duration_seconds=float(ALERT_SOCKETS_DURATION_SECONDS),
+                message=f"Too many {label} TCP sockets for {ALERT_SOCKETS_DURATION_SECONDS}s: {int(value or 0)}",
+                severity="warning",
+            ):
+                alerts_inserted += 1
 
+        if net_quality == "offline":
+            if self._net_offline_since_mono is None:
+                self._net_offline_since_mono = now_mono
             if (
-                self._ws_manager is not None
-                and await self._ws_manager.has_connections()
-                and (now_mono - self._last_docker_broadcast_mono) >= 5.0
+                not self._net_offline_fired
+                and self._net_offline_since_mono is not None
+                and (now_mono - self._net_offline_since_mono)
+                >= float(ALERT_NET_OFFLINE_SECONDS)
             ):
-                self._last_docker_broadcast_mono = now_mono
-                try:
-                    payload = await asyncio.to_thread(
-                        list_containers_with_stats,
-                        include_stopped=True,
-                        limit=50,
-                    )
-                    available = bool(payload.get("available")) if isinstance(payload, dict) else False
-                    reason = str(payload.get("reason")) if isinstance(payload, dict) else "unknown"
-                    items = payload.get("items") if isinstance(payload, dict) else []
-                    if not isinstance(items, list):
-                        items = []
-
-                    if available:
-                        flap_window = 60.0
-                        flap_threshold = 3
-                        bump_threshold = 2
-                        for c in items:
-                            if not isinstance(c, dict):
-                                continue
-                            cid = str(c.get("id") or "")
-                            name = str(c.get("name") or cid)
-                            state = str((c.get("state") or c.get("status") or "")).lower()
-                            running = state == "running"
-                            restart_count = 0
-                            try:
-                                restart_count = int(c.get("restart_count") or 0)
-                            except Exception:
-                                restart_count = 0
-
-                            prev_running = self._docker_last_running.get(cid)
-                            prev_restart = self._docker_last_restart.get(cid)
-
-                            if prev_running is None:
-                                self._docker_last_running[cid] = running
-                                self._docker_last_restart[cid] = restart_count
-                                continue
-
-                            if prev_running != running:
-                                times = self._docker_state_change_times.setdefault(cid, deque())
-                                times.append(now_mono)
-                                cutoff = now_mono - flap_window
-                                while times and times[0] < cutoff:
-                                    times.popleft()
-
-                                self._docker_last_running[cid] = running
-                                self._docker_last_restart[cid] = restart_count
-
-                                kind = "container_up" if running else "container_down"
-                                severity = "info" if running else "critical"
-                                message = f"Docker container {name} {'UP' if running else 'DOWN'}"
-                                try:
-                                    with get_connection() as conn:
-                                        event_id = insert_event(
-                                            conn,
-                                            {
-                                                "ts_utc": ts_utc,
-                                                "kind": kind,
-                                                "message": message,
-                                                "severity": severity,
-                                                "meta": {"id": cid, "name": name, "state": state},
-                                            },
-                                        )
-                                except Exception:
-                                    event_id = None
-
-                                if event_id is not None:
-                                    await self._broadcast(
-                                        {
-                                            "type": "timeline_event",
-                                            "v": 1,
-                                            "ts_utc": ts_utc,
-                                            "data": {
-                                                "id": event_id,
-                                                "kind": kind,
-                                                "severity": severity,
-                                                "message": message,
-                                            },
-                                        }
-                                    )
-
-                                if not running:
-                                    alert = await self._emit_alert(
-                                        ts_utc,
-                                        now_utc_dt,
-                                        now_mono,
-                                        type="container_down",
-                                        key=cid,
-                                        message=message,
-                                        severity="critical",
-                                    )
-                                    if alert:
-                                        await self._broadcast(
-                                            {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                                        )
-
-                                if len(times) >= flap_threshold and cid not in self._docker_flapping_active:
-                                    alert = await self._emit_alert(
-                                        ts_utc,
-                                        now_utc_dt,
-                                        now_mono,
-                                        type="container_flapping",
-                                        key=cid,
-                                        message=f"Docker container flapping: {name} ({len(times)} state changes in {int(flap_window)}s)",
-                                        severity="warning",
-                                    )
-                                    if alert:
-                                        self._docker_flapping_active.add(cid)
-                                        await self._broadcast(
-                                            {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                                        )
-                            else:
-                                self._docker_last_running[cid] = running
-
-                            if prev_restart is None:
-                                self._docker_last_restart[cid] = restart_count
-                            else:
-                                if restart_count > prev_restart:
-                                    bumps = self._docker_restart_bump_times.setdefault(cid, deque())
-                                    for _ in range(restart_count - prev_restart):
-                                        bumps.append(now_mono)
-                                    cutoff = now_mono - flap_window
-                                    while bumps and bumps[0] < cutoff:
-                                        bumps.popleft()
-                                    self._docker_last_restart[cid] = restart_count
-
-                                    if len(bumps) >= bump_threshold and cid not in self._docker_flapping_active:
-                                        alert = await self._emit_alert(
-                                            ts_utc,
-                                            now_utc_dt,
-                                            now_mono,
-                                            type="container_flapping",
-                                            key=cid,
-                                            message=f"Docker container restarting frequently: {name} (+{len(bumps)} in {int(flap_window)}s)",
-                                            severity="warning",
-                                        )
-                                        if alert:
-                                            self._docker_flapping_active.add(cid)
-                                            await self._broadcast(
-                                                {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                                            )
-
-                        for cid, times in list(self._docker_state_change_times.items()):
-                            cutoff = now_mono - (flap_window * 2)
-                            while times and times[0] < cutoff:
-                                times.popleft()
-                            if not times and cid in self._docker_flapping_active:
-                                self._docker_flapping_active.discard(cid)
-
-                    await self._broadcast(
-                        {
-                            "type": "docker",
-                            "v": 1,
-                            "ts_utc": ts_utc,
-                            "data": {"available": available, "reason": reason, "items": items},
-                        }
-                    )
-                except Exception:
-                    logger.exception("Failed to broadcast docker")
-
-            cpu_percent = float(snapshot.get("cpu_percent") or 0.0)
-            if cpu_percent >= alert_cpu_percent:
-                if self._cpu_high_since_mono is None:
-                    self._cpu_high_since_mono = now_mono
-                if (
-                    not self._cpu_high_fired
-                    and self._cpu_high_since_mono is not None
-                    and (now_mono - self._cpu_high_since_mono) >= float(ALERT_CPU_DURATION_SECONDS)
-                ):
-                    alert = await self._emit_alert(
-                        ts_utc,
-                        now_utc_dt,
-                        now_mono,
-                        type="cpu_high",
-                        key="global",
-                        message=f"CPU usage high for {ALERT_CPU_DURATION_SECONDS}s: {cpu_percent:.1f}%",
-                        severity="warning",
-                    )
-                    if alert:
-                        self._cpu_high_fired = True
-                        alerts_inserted += 1
-                        await self._broadcast(
-                            {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                        )
-                    elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
-                        "cpu_high", "global", now_mono
-                    ):
-                        self._cpu_high_fired = True
-            else:
-                self._cpu_high_since_mono = None
-                self._cpu_high_fired = False
-
-            mem_percent = float(snapshot.get("mem_percent") or 0.0)
-            if mem_percent >= alert_ram_percent:
-                if self._ram_high_since_mono is None:
-                    self._ram_high_since_mono = now_mono
-                if (
-                    not self._ram_high_fired
-                    and self._ram_high_since_mono is not None
-                    and (now_mono - self._ram_high_since_mono) >= float(ALERT_RAM_DURATION_SECONDS)
+                alert = await self._emit_alert(
+                    ts_utc,
+                    now_utc_dt,
+                    now_mono,
+                    type="network_offline",
+                    key=NETWORK_PING_HOST,
+                    message=f"Network offline for {ALERT_NET_OFFLINE_SECONDS}s (probing {', '.join(NETWORK_PROBE_TARGETS)})",
+                    severity="critical",
+                )
+                if alert:
+                    self._net_offline_fired = True
+                    alerts_inserted += 1
+                elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
+                    "network_offline", NETWORK_PING_HOST, now_mono
                 ):
-                    alert = await self._emit_alert(
-                        ts_utc,
-                        now_utc_dt,
-                        now_mono,
-                        type="ram_high",
-                        key="global",
-                        message=f"RAM usage high for {ALERT_RAM_DURATION_SECONDS}s: {mem_percent:.1f}%",
-                        severity="warning",
-                    )
-                    if alert:
-                        self._ram_high_fired = True
-                        alerts_inserted += 1
-                        await self._broadcast(
-                            {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                        )
-                    elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
-                        "ram_high", "global", now_mono
-                    ):
-                        self._ram_high_fired = True
-            else:
-                self._ram_high_since_mono = None
-                self._ram_high_fired = False
-
-            if net_quality == "offline":
-                if self._net_offline_since_mono is None:
-                    self._net_offline_since_mono = now_mono
-                if (
-                    not self._net_offline_fired
-                    and self._net_offline_since_mono is not None
-                    and (now_mono - self._net_offline_since_mono)
-                    >= float(ALERT_NET_OFFLINE_SECONDS)
+                    self._net_offline_fired = True
+        else:
+            self._net_offline_since_mono = None
+            self._net_offline_fired = False
+
+        if net_quality == "poor":
+            if not self._net_poor_fired:
+                p95_ms = probe.get("p95_ms")
+                latency_str = "N/A" if p95_ms is None else f"{p95_ms:.0f}ms"
+                alert = await self._emit_alert(
+                    ts_utc,
+                    now_utc_dt,
+                    now_mono,
+                    type="network_poor",
+                    key=NETWORK_PING_HOST,
+                    message=f"Network poor (p95 latency {latency_str}, loss {float(probe.get('loss_percent') or 0.0):.0f}%)",
+                    severity="warning",
+                )
+                if alert:
+                    self._net_poor_fired = True
+                    alerts_inserted += 1
+                elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
+                    "network_poor", NETWORK_PING_HOST, now_mono
                 ):
-                    alert = await self._emit_alert(
-                        ts_utc,
-                        now_utc_dt,
-                        now_mono,
-                        type="network_offline",
-                        key=NETWORK_PING_HOST,
-                        message=f"Network offline for {ALERT_NET_OFFLINE_SECONDS}s (ping {NETWORK_PING_HOST})",
-                        severity="critical",
-                    )
-                    if alert:
-                        self._net_offline_fired = True
-                        alerts_inserted += 1
-                        await self._broadcast(
-                            {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                        )
-                    elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
-                        "network_offline", NETWORK_PING_HOST, now_mono
-                    ):
-                        self._net_offline_fired = True
-            else:
-                self._net_offline_since_mono = None
-                self._net_offline_fired = False
-
-            if net_quality == "poor":
-                if not self._net_poor_fired:
-                    latency_str = "N/A" if latency_ms is None else f"{latency_ms:.0f}ms"
-                    alert = await self._emit_alert(
-                        ts_utc,
-                        now_utc_dt,
-                        now_mono,
-                        type="network_poor",
-                        key=NETWORK_PING_HOST,
-                        message=f"Network poor (ping {NETWORK_PING_HOST} latency {latency_str})",
-                        severity="warning",
-                    )
-                    if alert:
-                        self._net_poor_fired = True
-                        alerts_inserted += 1
-                        await self._broadcast(
-                            {"type": "alert", "v": 1, "ts_utc": ts_utc, "data": alert}
-                        )
-                    elif not self._is_muted(now_utc_dt) and not self._can_send_alert(
-                        "network_poor", NETWORK_PING_HOST, now_mono
-                    ):
-                        self._net_poor_fired = True
-            else:
-                self._net_poor_fired = False
+                    self._net_poor_fired = True
+        else:
+            self._net_poor_fired = False
 
-            logger.info(
-                "snapshot ts=%s inserted=%s alerts=%d cpu=%.1f mem=%.1f disk=%.1f net_tx=%.0f net_rx=%.0f net_q=%s",
-                ts_utc,
-                inserted,
-                alerts_inserted,
-                float(snapshot.get("cpu_percent") or 0.0),
-                float(snapshot.get("mem_percent") or 0.0),
-                float(snapshot.get("disk_percent") or 0.0),
-                float(snapshot.get("net_sent_bps") or 0.0),
-                float(snapshot.get("net_recv_bps") or 0.0),
-                net_quality,
-            )
+        queued = self._flush_batch()
+
+        interval, reason = self._rate.decide(
+            time.monotonic(),
+            has_clients=has_clients,
+            all_hidden=all_hidden,
+            cpu_percent=snapshot.get("cpu_percent"),
+            mem_percent=snapshot.get("mem_percent"),
+            alert_cpu_percent=alert_cpu_percent,
+            alert_ram_percent=alert_ram_percent,
+            alert_pending=(
+                (self._cpu_high_since_mono is not None and not self._cpu_high_fired)
+                or (self._ram_high_since_mono is not None and not self._ram_high_fired)
+                or (self._net_offline_since_mono is not None and not self._net_offline_fired)
+                or self._sustained_pending()
+            ),
+        )
+        if interval != self._clock.interval_seconds:
+            logger.info("Sampling interval %.1fs -> %.1fs (%s)", self._clock.interval_seconds, interval, reason)
+            self._clock.set_interval(interval)
+
+        logger.info(
+            "snapshot ts=%s queued=%s alerts=%d cpu=%.1f mem=%.1f disk=%.1f net_tx=%.0f net_rx=%.0f net_q=%s",
+            ts_utc,
+            queued,
+            alerts_inserted,
+            float(snapshot.get("cpu_percent") or 0.0),
+            float(snapshot.get("mem_percent") or 0.0),
+            float(snapshot.get("disk_percent") or 0.0),
+            float(snapshot.get("net_sent_bps") or 0.0),
+            float(snapshot.get("net_recv_bps") or 0.0),
+            net_quality,
+        )
 
-            await asyncio.sleep(self._interval_seconds)
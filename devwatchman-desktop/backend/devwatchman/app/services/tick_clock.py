@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+TICK_MODE_FIXED_RATE: str = "fixed_rate"
+TICK_MODE_FIXED_DELAY: str = "fixed_delay"
+
+# skip: a tick that is a full interval or more late is dropped and the clock waits
+#       for the next deadline on the grid, so every sample stays on the grid.
+# merge: the late tick runs immediately and stands in for every deadline it missed.
+MISSED_TICK_SKIP: str = "skip"
+MISSED_TICK_MERGE: str = "merge"
+
+
+@dataclass(frozen=True, slots=True)
+class Tick:
+    index: int
+    deadline_mono: float
+    started_mono: float
+    lag_seconds: float
+    missed: int
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round((pct / 100.0) * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+@dataclass
+class TickClock:
+    interval_seconds: float
+    mode: str = TICK_MODE_FIXED_RATE
+    missed_policy: str = MISSED_TICK_SKIP
+    recent_size: int = 300
+    _next_deadline: float | None = None
+    _index: int = 0
+    _started_mono: float | None = None
+    _first_tick_mono: float | None = None
+    # Set by set_interval() until the next tick, which is then never counted as late.
+    _rescheduled: bool = False
+    _last_tick_mono: float | None = None
+    ticks: int = 0
+    overruns: int = 0
+    missed_ticks: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    _lag_total_ms: float = 0.0
+    last_work_ms: float = 0.0
+    max_work_ms: float = 0.0
+    _work_total_ms: float = 0.0
+    _recent_lag_ms: deque[float] = field(default_factory=deque)
+    _recent_work_ms: deque[float] = field(default_factory=deque)
+    _wake: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def __post_init__(self) -> None:
+        if self.mode not in (TICK_MODE_FIXED_RATE, TICK_MODE_FIXED_DELAY):
+            raise ValueError(f"unknown tick mode: {self.mode}")
+        if self.missed_policy not in (MISSED_TICK_SKIP, MISSED_TICK_MERGE):
+            raise ValueError(f"unknown missed tick policy: {self.missed_policy}")
+        self._recent_lag_ms = deque(maxlen=self.recent_size)
+        self._recent_work_ms = deque(maxlen=self.recent_size)
+
+    async def next_tick(self) -> Tick:
+        now = time.monotonic()
+        if self._started_mono is None:
+            self._started_mono = now
+        if self._next_deadline is None:
+            self._next_deadline = now
+
+        # set_interval() may pull the deadline in while we sleep; wake up and re-check.
+        while now < self._next_deadline:
+            self._wake.clear()
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self._next_deadline - now)
+            now = time.monotonic()
+        deadline = self._next_deadline
+        interval = float(self.interval_seconds)
+
+        missed = 0
+        rescheduled = self._rescheduled
+        self._rescheduled = False
+        if interval > 0 and not rescheduled and (now - deadline) >= interval:
+            missed = int((now - deadline) // interval)
+            if self.missed_policy == MISSED_TICK_SKIP:
+                deadline += (missed + 1) * interval
+                await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+                now = time.monotonic()
+            self.missed_ticks += missed
+
+        lag_ms = max(0.0, (now - deadline) * 1000.0)
+        self._index += 1 + missed
+        self.ticks += 1
+        if self._first_tick_mono is None:
+            self._first_tick_mono = now
+        self._last_tick_mono = now
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self._lag_total_ms += lag_ms
+        self._recent_lag_ms.append(lag_ms)
+
+        if self.mode == TICK_MODE_FIXED_RATE:
+            self._next_deadline = deadline + interval * (1 + (missed if self.missed_policy == MISSED_TICK_MERGE else 0))
+        return Tick(
+            index=self._index,
+            deadline_mono=deadline,
+            started_mono=now,
+            lag_seconds=lag_ms / 1000.0,
+            missed=missed,
+        )
+
+    def set_interval(self, interval_seconds: float) -> None:
+        interval = float(interval_seconds)
+        old = float(self.interval_seconds)
+        if interval == old:
+            return
+        self.interval_seconds = interval
+        # Re-anchor the pending deadline on the last one so a faster rate takes effect
+        # right away instead of after the old, longer wait; never in the past, so the
+        # change itself is not counted as missed ticks or an overrun.
+        if self._next_deadline is not None:
+            last_deadline = self._next_deadline - old
+            self._next_deadline = max(time.monotonic(), last_deadline + interval)
+            self._rescheduled = True
+            self._wake.set()
+
+    def tick_done(self, tick: Tick) -> None:
+        now = time.monotonic()
+        work_ms = max(0.0, (now - tick.started_mono) * 1000.0)
+        self.last_work_ms = work_ms
+        self.max_work_ms = max(self.max_work_ms, work_ms)
+        self._work_total_ms += work_ms
+        self._recent_work_ms.append(work_ms)
+
+        if self.mode == TICK_MODE_FIXED_DELAY:
+            self._next_deadline = now + float(self.interval_seconds)
+        elif self._next_deadline is not None and now > self._next_deadline and not self._rescheduled:
+            self.overruns += 1
+
+    def stats(self) -> dict[str, Any]:
+        uptime = 0.0
+        if self._started_mono is not None:
+            uptime = max(0.0, time.monotonic() - self._started_mono)
+        recent_lag = list(self._recent_lag_ms)
+        recent_work = list(self._recent_work_ms)
+        ticks = max(1, self.ticks)
+        effective_hz = 0.0
+        if self._first_tick_mono is not None and self._last_tick_mono is not None and self.ticks > 1:
+            span = self._last_tick_mono - self._first_tick_mono
+            effective_hz = ((self.ticks - 1) / span) if span > 0 else 0.0
+        return {
+            "mode": self.mode,
+            "missed_policy": self.missed_policy,
+            "interval_seconds": float(self.interval_seconds),
+            "uptime_seconds": uptime,
+            "ticks": self.ticks,
+            "effective_hz": effective_hz,
+            "overruns": self.overruns,
+            "missed_ticks": self.missed_ticks,
+            "lag_ms": {
+                "last": self.last_lag_ms,
+                "avg": self._lag_total_ms / ticks,
+                "max": self.max_lag_ms,
+                "p50": _percentile(recent_lag, 50),
+                "p99": _percentile(recent_lag, 99),
+            },
+            "work_ms": {
+                "last": self.last_work_ms,
+                "avg": self._work_total_ms / ticks,
+                "max": self.max_work_ms,
+                "p50": _percentile(recent_work, 50),
+                "p99": _percentile(recent_work, 99),
+            },
+        }
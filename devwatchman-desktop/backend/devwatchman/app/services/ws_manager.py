@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 class WebSocketManager:
     def __init__(self) -> None:
         self._connections: set[WebSocket] = set()
+        self._hidden: set[WebSocket] = set()
         self._lock = asyncio.Lock()
 
     async def connect(self, ws: WebSocket) -> None:
@@ -22,6 +23,18 @@ class WebSocketManager:
     async def disconnect(self, ws: WebSocket) -> None:
         async with self._lock:
             self._connections.discard(ws)
+            self._hidden.discard(ws)
+
+    async def set_hidden(self, ws: WebSocket, hidden: bool) -> None:
+        async with self._lock:
+            if hidden and ws in self._connections:
+                self._hidden.add(ws)
+            else:
+                self._hidden.discard(ws)
+
+    async def all_hidden(self) -> bool:
+        async with self._lock:
+            return bool(self._connections) and self._connections <= self._hidden
 
     async def broadcast_json(self, message: dict[str, Any]) -> None:
         async with self._lock:
@@ -38,6 +51,7 @@ class WebSocketManager:
             async with self._lock:
                 for ws in dead:
                     self._connections.discard(ws)
+                    self._hidden.discard(ws)
             for ws in dead:
                 try:
                     await ws.close(code=1001)
@@ -52,6 +66,7 @@ class WebSocketManager:
         async with self._lock:
             targets = list(self._connections)
             self._connections.clear()
+            self._hidden.clear()
 
         for ws in targets:
             try:
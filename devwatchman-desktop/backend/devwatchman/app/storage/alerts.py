@@ -4,7 +4,9 @@ import sqlite3
 from typing import Any
 
 
-def insert_alert(conn: sqlite3.Connection, alert: dict[str, Any]) -> int:
+def insert_alert(
+    conn: sqlite3.Connection, alert: dict[str, Any], *, commit: bool = True
+) -> int:
     cur = conn.execute(
         """
         INSERT INTO alerts (ts_utc, type, message, severity, acknowledged, acknowledged_ts_utc)
@@ -17,7 +19,8 @@ def insert_alert(conn: sqlite3.Connection, alert: dict[str, Any]) -> int:
             alert["severity"],
         ),
     )
-    conn.commit()
+    if commit:
+        conn.commit()
     return int(cur.lastrowid)
 
 
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import sqlite3
+import struct
+from typing import Any, Iterator
+
+# Compressed storage for raw snapshots. Each closed minute of rows becomes one
+# snapshot_blocks row: timestamps are delta-of-delta encoded and every metric column
+# is XOR-encoded against its previous value, as in Facebook's Gorilla TSDB. The
+# minute still being written (and anything not sealed yet) stays as plain rows in
+# snapshots, which acts as the open block.
+
+BLOCK_MS: int = 60_000
+
+# Column layout per block format version. A block is decoded with the layout it was
+# written with, so adding a snapshot column means adding a new version here.
+_LAYOUTS: dict[int, tuple[str, ...]] = {
+    1: (
+        "cpu_percent",
+        "mem_percent",
+        "mem_used_bytes",
+        "mem_avail_bytes",
+        "mem_total_bytes",
+        "disk_percent",
+        "disk_used_bytes",
+        "disk_free_bytes",
+        "disk_total_bytes",
+        "net_sent_bps",
+        "net_recv_bps",
+        "interval_s",
+        "psi_cpu_some_avg10",
+        "psi_mem_some_avg10",
+        "psi_mem_full_avg10",
+        "psi_io_some_avg10",
+        "psi_io_full_avg10",
+        "psi_cpu_some_pct",
+        "psi_mem_some_pct",
+        "psi_mem_full_pct",
+        "psi_io_some_pct",
+        "psi_io_full_pct",
+        "sock_used",
+        "tcp_inuse",
+        "tcp_orphan",
+        "tcp_tw",
+        "tcp_alloc",
+    ),
+}
+_FORMAT_VERSION: int = max(_LAYOUTS)
+
+# SQLite stores NaN as NULL, so NaN can stand for NULL without losing anything.
+_NULL_BITS: int = 0x7FF8000000000000
+_TYPE_FLOAT: int = 0
+_TYPE_INT: int = 1
+
+# Delta-of-delta buckets: (control bits, control length, value bits); anything
+# larger is written as 0b1111 plus 32 bits.
+_DOD_BUCKETS: tuple[tuple[int, int, int], ...] = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+)
+_DOD_VALUE_BITS: tuple[int, ...] = tuple(b for _, _, b in _DOD_BUCKETS)
+
+
+class _BitWriter:
+    def __init__(self) -> None:
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, nbits: int) -> None:
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._bits += nbits
+
+    def getvalue(self) -> bytes:
+        pad = -self._bits % 8
+        return (self._acc << pad).to_bytes((self._bits + pad) // 8, "big")
+
+
+class _BitReader:
+    def __init__(self, data: bytes) -> None:
+        self._value = int.from_bytes(data, "big")
+        self._remaining = len(data) * 8
+
+    def read(self, nbits: int) -> int:
+        self._remaining -= nbits
+        return (self._value >> self._remaining) & ((1 << nbits) - 1)
+
+    def bit(self) -> int:
+        self._remaining -= 1
+        return (self._value >> self._remaining) & 1
+
+
+def _encode_timestamps(values: list[int]) -> bytes:
+    w = _BitWriter()
+    w.write(values[0], 64)
+    prev = values[0]
+    prev_delta = 0
+    for i, ts in enumerate(values[1:]):
+        delta = ts - prev
+        if i == 0:
+            w.write(delta, 32)
+        else:
+            dod = delta - prev_delta
+            if dod == 0:
+                w.write(0, 1)
+            else:
+                for control, control_bits, value_bits in _DOD_BUCKETS:
+                    bias = (1 << (value_bits - 1)) - 1
+                    if -bias <= dod <= bias + 1:
+                        w.write(control, control_bits)
+                        w.write(dod + bias, value_bits)
+                        break
+                else:
+                    w.write(0b1111, 4)
+                    w.write(dod, 32)
+        prev = ts
+        prev_delta = delta
+    return w.getvalue()
+
+
+def _signed32(value: int) -> int:
+    return value - (1 << 32) if value & (1 << 31) else value
+
+
+def _decode_timestamps(data: bytes, count: int) -> list[int]:
+    r = _BitReader(data)
+    values = [r.read(64)]
+    if count > 1:
+        delta = _signed32(r.read(32))
+        values.append(values[0] + delta)
+    for _ in range(count - 2):
+        if r.bit():
+            for value_bits in _DOD_VALUE_BITS:
+                if not r.bit():
+                    dod = r.read(value_bits) - ((1 << (value_bits - 1)) - 1)
+                    break
+            else:
+                dod = _signed32(r.read(32))
+            delta += dod
+        values.append(values[-1] + delta)
+    return values
+
+
+def _float_bits(value: Any) -> int:
+    if value is None:
+        return _NULL_BITS
+    return struct.unpack(">Q", struct.pack(">d", float(value)))[0]
+
+
+def _encode_floats(values: list[Any]) -> bytes:
+    w = _BitWriter()
+    prev = _float_bits(values[0])
+    w.write(prev, 64)
+    prev_lead = prev_trail = -1
+    for value in values[1:]:
+        bits = _float_bits(value)
+        xor = bits ^ prev
+        prev = bits
+        if xor == 0:
+            w.write(0, 1)
+            continue
+        lead = min(64 - xor.bit_length(), 31)
+        trail = (xor & -xor).bit_length() - 1
+        if prev_lead >= 0 and lead >= prev_lead and trail >= prev_trail:
+            # Meaningful bits fit inside the previous window: reuse it.
+            w.write(0b10, 2)
+            w.write(xor >> prev_trail, 64 - prev_lead - prev_trail)
+        else:
+            length = 64 - lead - trail
+            w.write(0b11, 2)
+            w.write(lead, 5)
+            # 64 significant bits does not fit in 6 bits; it is written as 0.
+            w.write(length & 0x3F, 6)
+            w.write(xor >> trail, length)
+            prev_lead, prev_trail = lead, trail
+    return w.getvalue()
+
+
+def _decode_floats(data: bytes, count: int, as_int: bool) -> list[Any]:
+    # The bit reader is inlined: this loop runs once per stored value on every read.
+    stream = int.from_bytes(data, "big")
+    pos = len(data) * 8 - 64
+    bits = stream >> pos
+    raw = [bits]
+    append = raw.append
+    lead = trail = 0
+    mask = 0
+    for i in range(count - 1):
+        if not stream & ((1 << pos) - 1):
+            # Only zero bits (unchanged values) and padding are left.
+            raw.extend([bits] * (count - 1 - i))
+            break
+        pos -= 1
+        if (stream >> pos) & 1:
+            pos -= 1
+            if (stream >> pos) & 1:
+                pos -= 11
+                header = (stream >> pos) & 0x7FF
+                lead = header >> 6
+                trail = 64 - lead - ((header & 0x3F) or 64)
+                mask = (1 << (64 - lead - trail)) - 1
+            pos -= 64 - lead - trail
+            bits ^= ((stream >> pos) & mask) << trail
+        append(bits)
+
+    values: list[Any] = list(struct.unpack(f">{count}d", struct.pack(f">{count}Q", *raw)))
+    for i, value in enumerate(values):
+        if value != value:
+            values[i] = None
+        elif as_int:
+            values[i] = int(value)
+    return values
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_block(rows: list[dict[str, Any]]) -> bytes:
+    # rows must be sorted by ts_ms. Layout: version, count, then the timestamp stream
+    # and one (type, stream) per column, each stream prefixed with its byte length.
+    out = bytearray([_FORMAT_VERSION])
+    out += _varint(len(rows))
+    ts = _encode_timestamps([int(r["ts_ms"]) for r in rows])
+    out += _varint(len(ts)) + ts
+    for column in _LAYOUTS[_FORMAT_VERSION]:
+        values = [r.get(column) for r in rows]
+        is_int = all(v is None or isinstance(v, int) for v in values)
+        stream = _encode_floats(values)
+        out.append(_TYPE_INT if is_int else _TYPE_FLOAT)
+        out += _varint(len(stream)) + stream
+    return bytes(out)
+
+
+def decode_block(data: bytes) -> list[dict[str, Any]]:
+    layout = _LAYOUTS.get(data[0])
+    if layout is None:
+        raise ValueError(f"unknown snapshot block format {data[0]}")
+    count, pos = _read_varint(data, 1)
+    length, pos = _read_varint(data, pos)
+    timestamps = _decode_timestamps(data[pos : pos + length], count)
+    pos += length
+    columns: list[list[Any]] = []
+    for _ in layout:
+        kind = data[pos]
+        length, pos = _read_varint(data, pos + 1)
+        columns.append(_decode_floats(data[pos : pos + length], count, kind == _TYPE_INT))
+        pos += length
+    return [
+        {"ts_ms": ts, **dict(zip(layout, values))}
+        for ts, values in zip(timestamps, zip(*columns))
+    ]
+
+
+def _iter_blocks(
+    conn: sqlite3.Connection, since_ms: int, until_ms: int
+) -> Iterator[list[dict[str, Any]]]:
+    for row in conn.execute(
+        # A block never spans more than BLOCK_MS, so the start_ms bound keeps this a
+        # primary-key range scan.
+        """
+        SELECT data FROM snapshot_blocks
+        WHERE start_ms > ? AND start_ms < ? AND end_ms >= ?
+        ORDER BY start_ms ASC
+        """,
+        (since_ms - BLOCK_MS, until_ms, since_ms),
+    ):
+        yield decode_block(row["data"])
+
+
+def get_block_history(
+    conn: sqlite3.Connection, since_ms: int, until_ms: int
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for rows in _iter_blocks(conn, since_ms, until_ms):
+        if rows[0]["ts_ms"] >= since_ms and rows[-1]["ts_ms"] < until_ms:
+            results.extend(rows)
+        else:
+            results.extend(r for r in rows if since_ms <= r["ts_ms"] < until_ms)
+    return results
+
+
+def get_latest_block_row(conn: sqlite3.Connection) -> dict[str, Any] | None:
+    row = conn.execute(
+        "SELECT data FROM snapshot_blocks ORDER BY start_ms DESC LIMIT 1"
+    ).fetchone()
+    return decode_block(row["data"])[-1] if row else None
+
+
+def seal_blocks(conn: sqlite3.Connection, before_ms: int, *, max_blocks: int = 60) -> int:
+    # Packs plain snapshot rows older than before_ms (rounded down to a minute) into
+    # one block per minute and deletes the rows. Rows landing in an already sealed
+    # minute (a late write) are merged into its block. At most max_blocks minutes are
+    # sealed per call so a backlog does not hold the writer for long. Returns the
+    # blocks written.
+    first = conn.execute("SELECT min(ts_ms) FROM snapshots").fetchone()[0]
+    if first is None:
+        return 0
+    first_minute = first // BLOCK_MS * BLOCK_MS
+    before_ms = min(before_ms // BLOCK_MS * BLOCK_MS, first_minute + max_blocks * BLOCK_MS)
+    rows = [
+        dict(r)
+        for r in conn.execute(
+            "SELECT * FROM snapshots WHERE ts_ms < ? ORDER BY ts_ms ASC", (before_ms,)
+        ).fetchall()
+    ]
+    if not rows:
+        return 0
+
+    minutes: dict[int, list[dict[str, Any]]] = {}
+    for r in rows:
+        minutes.setdefault(r["ts_ms"] // BLOCK_MS * BLOCK_MS, []).append(r)
+
+    for start_ms, minute_rows in minutes.items():
+        existing = conn.execute(
+            "SELECT data FROM snapshot_blocks WHERE start_ms = ?", (start_ms,)
+        ).fetchone()
+        if existing is not None:
+            merged = {r["ts_ms"]: r for r in decode_block(existing["data"])}
+            merged.update((r["ts_ms"], r) for r in minute_rows)
+            minute_rows = [merged[k] for k in sorted(merged)]
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshot_blocks (start_ms, end_ms, count, data) VALUES (?, ?, ?, ?)",
+            (start_ms, minute_rows[-1]["ts_ms"], len(minute_rows), encode_block(minute_rows)),
+        )
+    conn.execute("DELETE FROM snapshots WHERE ts_ms < ?", (before_ms,))
+    return len(minutes)
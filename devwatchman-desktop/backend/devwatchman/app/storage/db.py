@@ -1,42 +1,342 @@
 from __future__ import annotations
 
 import logging
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
 
-from app.core.config import DB_PATH
+from app.core.config import (
+    DB_BUSY_TIMEOUT_SECONDS,
+    DB_CACHE_SIZE_KIB,
+    DB_CHECKPOINT_INTERVAL_SECONDS,
+    DB_MMAP_SIZE_BYTES,
+    DB_PATH,
+    DB_READ_POOL_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_WAL_TRUNCATE_BYTES,
+)
+from app.storage.snapshots import SNAPSHOT_COLUMN_TYPES
 
 logger = logging.getLogger(__name__)
 
 
-def get_connection() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+class ConnectionManager:
+    # One long-lived writer connection, handed out under a lock, plus a pool of
+    # read-only (mode=ro) connections. The database runs in WAL mode, so readers see
+    # the last committed state without waiting for the writer and the writer never
+    # waits for readers. With the checkpointer running, automatic checkpoints are
+    # off and a background thread copies the WAL back into the database instead,
+    # truncating it once it grows past DB_WAL_TRUNCATE_BYTES.
+    def __init__(self, path: Path, *, read_pool_size: int = DB_READ_POOL_SIZE) -> None:
+        self.path = path
+        self.read_pool_size = max(1, int(read_pool_size))
+        self._writer: sqlite3.Connection | None = None
+        self._write_lock = threading.RLock()
+        self._readers: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._readers_open = 0
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._checkpointer: threading.Thread | None = None
+        self.checkpoints = 0
+        self.truncates = 0
+        self.checkpoint_busy = 0
+        self.wal_bytes = 0
 
-    conn = sqlite3.connect(str(DB_PATH), timeout=10)
-    conn.row_factory = sqlite3.Row
-    return conn
+    def _connect(self, *, readonly: bool) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(
+                f"{self.path.as_uri()}?mode=ro",
+                uri=True,
+                timeout=DB_BUSY_TIMEOUT_SECONDS,
+                check_same_thread=False,
+                cached_statements=DB_STATEMENT_CACHE_SIZE,
+                # Autocommit, so an idle reader never pins an old WAL snapshot.
+                isolation_level=None,
+            )
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=DB_BUSY_TIMEOUT_SECONDS,
+                check_same_thread=False,
+                cached_statements=DB_STATEMENT_CACHE_SIZE,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA journal_size_limit={int(DB_WAL_TRUNCATE_BYTES)}")
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size={-int(DB_CACHE_SIZE_KIB)}")
+        conn.execute(f"PRAGMA mmap_size={int(DB_MMAP_SIZE_BYTES)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock:
+            if self._closed:
+                raise RuntimeError("database is closed")
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+                if self._checkpointer is not None:
+                    self._writer.execute("PRAGMA wal_autocheckpoint=0")
+            conn = self._writer
+            try:
+                yield conn
+            finally:
+                # Never hand the next user a half-finished transaction.
+                if conn.in_transaction:
+                    conn.rollback()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if self._closed:
+                raise RuntimeError("database is closed")
+            if self._readers_open < self.read_pool_size:
+                # mode=ro cannot create the file or switch it to WAL; the writer does both.
+                if not self.path.exists():
+                    with self.writer():
+                        pass
+                conn = self._connect(readonly=True)
+                self._readers_open += 1
+                return conn
+        return self._readers.get(timeout=DB_BUSY_TIMEOUT_SECONDS)
+
+    def _wal_size(self) -> int:
+        try:
+            return os.path.getsize(f"{self.path}-wal")
+        except OSError:
+            return 0
+
+    def checkpoint(self, conn: sqlite3.Connection) -> None:
+        busy, _, _ = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        self.checkpoints += 1
+        self.checkpoint_busy += int(busy)
+        self.wal_bytes = self._wal_size()
+        if self.wal_bytes > DB_WAL_TRUNCATE_BYTES:
+            # TRUNCATE waits (up to the busy timeout) for readers on old snapshots,
+            # then resets the WAL file to zero bytes.
+            busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            if not busy:
+                self.truncates += 1
+            self.wal_bytes = self._wal_size()
+
+    def _run_checkpointer(self) -> None:
+        conn = sqlite3.connect(str(self.path), timeout=DB_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        try:
+            while not self._stop.wait(DB_CHECKPOINT_INTERVAL_SECONDS):
+                try:
+                    self.checkpoint(conn)
+                except sqlite3.Error as e:
+                    logger.warning("WAL checkpoint failed: %s", e)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+        finally:
+            conn.close()
+
+    def start_checkpointer(self) -> None:
+        if self._checkpointer is not None and self._checkpointer.is_alive():
+            return
+        with self.writer() as conn:
+            conn.execute("PRAGMA wal_autocheckpoint=0")
+            self._stop.clear()
+            self._checkpointer = threading.Thread(
+                target=self._run_checkpointer, name="sqlite-checkpoint", daemon=True
+            )
+            self._checkpointer.start()
+
+    def stop_checkpointer(self, timeout: float = 5.0) -> None:
+        thread = self._checkpointer
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout=timeout)
+        self._checkpointer = None
+        with self._write_lock:
+            if self._writer is not None:
+                # Back to SQLite's default so a writer without the thread stays bounded.
+                self._writer.execute("PRAGMA wal_autocheckpoint=1000")
+
+    def close(self) -> None:
+        self.stop_checkpointer()
+        with self._readers_lock:
+            self._closed = True
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._readers_open = 0
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "readers_open": self._readers_open,
+            "readers_idle": self._readers.qsize(),
+            "checkpointer": self._checkpointer is not None,
+            "checkpoints": self.checkpoints,
+            "checkpoint_busy": self.checkpoint_busy,
+            "truncates": self.truncates,
+            "wal_bytes": self._wal_size(),
+        }
+
+
+_MANAGER: ConnectionManager | None = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_db() -> ConnectionManager:
+    global _MANAGER
+    if _MANAGER is None:
+        with _MANAGER_LOCK:
+            if _MANAGER is None:
+                _MANAGER = ConnectionManager(DB_PATH)
+    return _MANAGER
+
+
+@contextmanager
+def read_connection() -> Iterator[sqlite3.Connection]:
+    with get_db().reader() as conn:
+        yield conn
+
+
+@contextmanager
+def write_connection() -> Iterator[sqlite3.Connection]:
+    # Commits when the block succeeds and rolls back when it raises.
+    with get_db().writer() as conn:
+        with conn:
+            yield conn
+
+
+# Columns added to the rollup tables after they first shipped.
+ROLLUP_EXTRA_COLUMNS: dict[str, str] = {
+    "avg_psi_cpu_some_pct": "REAL",
+    "avg_psi_mem_some_pct": "REAL",
+    "avg_psi_mem_full_pct": "REAL",
+    "avg_psi_io_some_pct": "REAL",
+    "avg_psi_io_full_pct": "REAL",
+    "avg_tcp_inuse": "REAL",
+    "max_tcp_tw": "INTEGER",
+    "max_tcp_orphan": "INTEGER",
+}
+
+
+def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+    existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, col_type in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+
+# Time-series tables that were keyed by ISO-8601 text before moving to epoch
+# milliseconds: table -> (legacy key column, current key column).
+_LEGACY_TIME_KEYS: dict[str, tuple[str, str]] = {
+    "snapshots": ("ts_utc", "ts_ms"),
+    "snapshots_1m": ("bucket_start_utc", "bucket_ms"),
+    "snapshots_15m": ("bucket_start_utc", "bucket_ms"),
+    "disk_io": ("ts_utc", "ts_ms"),
+    "disk_io_1m": ("bucket_start_utc", "bucket_ms"),
+    "disk_io_15m": ("bucket_start_utc", "bucket_ms"),
+}
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _iso_to_ms(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    # Integer arithmetic, so a point at :59.9999 never rounds into the next bucket.
+    return (dt - _EPOCH) // timedelta(milliseconds=1)
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _rename_legacy_time_tables(conn: sqlite3.Connection) -> list[str]:
+    renamed: list[str] = []
+    for table, (legacy_key, _) in _LEGACY_TIME_KEYS.items():
+        if legacy_key in _table_columns(conn, table):
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+            renamed.append(table)
+    return renamed
+
+
+def _copy_legacy_time_tables(conn: sqlite3.Connection, tables: list[str]) -> None:
+    # Tables only ever hold their retention window (a day of raw points, at most a
+    # month of buckets), so the copy runs in one pass inside init_db's transaction.
+    conn.create_function("iso_to_ms", 1, _iso_to_ms, deterministic=True)
+    for table in tables:
+        legacy_key, key = _LEGACY_TIME_KEYS[table]
+        legacy_columns = set(_table_columns(conn, f"{table}_legacy"))
+        columns = [c for c in _table_columns(conn, table) if c != key and c in legacy_columns]
+        column_sql = ", ".join(columns)
+        cur = conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {table} ({key}, {column_sql})
+            SELECT iso_to_ms({legacy_key}), {column_sql}
+            FROM {table}_legacy
+            WHERE iso_to_ms({legacy_key}) IS NOT NULL
+            """
+        )
+        conn.execute(f"DROP TABLE {table}_legacy")
+        logger.info("Migrated %s to epoch-ms keys (%d rows)", table, cur.rowcount)
+
+    # Rollup cursors move from "..._next_start_utc" ISO values to "..._next_start_ms".
+    rows = conn.execute("SELECT key, value FROM app_state WHERE key LIKE 'rollup_%'").fetchall()
+    for row in rows:
+        if not row["key"].endswith("_next_start_utc"):
+            continue
+        ms = _iso_to_ms(row["value"])
+        if ms is not None:
+            conn.execute(
+                "INSERT OR REPLACE INTO app_state(key, value) VALUES(?, ?)",
+                (row["key"][: -len("_utc")] + "_ms", str(ms)),
+            )
+        conn.execute("DELETE FROM app_state WHERE key = ?", (row["key"],))
 
 
 def init_db() -> None:
-    expected_columns: dict[str, str] = {
-        "cpu_percent": "REAL",
-        "mem_percent": "REAL",
-        "mem_used_bytes": "INTEGER",
-        "mem_avail_bytes": "INTEGER",
-        "mem_total_bytes": "INTEGER",
-        "disk_percent": "REAL",
-        "disk_used_bytes": "INTEGER",
-        "disk_free_bytes": "INTEGER",
-        "disk_total_bytes": "INTEGER",
-        "net_sent_bps": "REAL",
-        "net_recv_bps": "REAL",
-    }
-
-    with get_connection() as conn:
+    with write_connection() as conn:
+        # Schema changes and the legacy-table copy below commit (or roll back) together.
+        conn.execute("BEGIN")
+        legacy_tables = _rename_legacy_time_tables(conn)
+
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS snapshots (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ts_utc TEXT NOT NULL,
+                -- Epoch milliseconds, UTC. As the INTEGER PRIMARY KEY this is the rowid,
+                -- so rows are stored in time order and range scans need no index.
+                ts_ms INTEGER PRIMARY KEY,
                 cpu_percent REAL,
                 mem_percent REAL,
                 mem_used_bytes INTEGER,
@@ -47,48 +347,41 @@ def init_db() -> None:
                 disk_free_bytes INTEGER,
                 disk_total_bytes INTEGER,
                 net_sent_bps REAL,
-                net_recv_bps REAL
+                net_recv_bps REAL,
+                interval_s REAL
             )
             """
         )
 
-        existing_cols = {
-            row["name"]
-            for row in conn.execute("PRAGMA table_info(snapshots)").fetchall()
-        }
-        for name, col_type in expected_columns.items():
-            if name not in existing_cols:
-                conn.execute(f"ALTER TABLE snapshots ADD COLUMN {name} {col_type}")
-
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_snapshots_ts_utc ON snapshots(ts_utc)"
-        )
+        _ensure_columns(conn, "snapshots", SNAPSHOT_COLUMN_TYPES)
 
+        # Closed minutes of snapshots packed by the "blocks" storage engine
+        # (storage/blocks.py); the newest rows stay in snapshots until sealed.
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS snapshots_1m (
-                bucket_start_utc TEXT PRIMARY KEY,
-                avg_cpu_percent REAL,
-                avg_mem_percent REAL,
-                avg_disk_percent REAL,
-                avg_net_sent_bps REAL,
-                avg_net_recv_bps REAL
+            CREATE TABLE IF NOT EXISTS snapshot_blocks (
+                start_ms INTEGER PRIMARY KEY,
+                end_ms INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                data BLOB NOT NULL
             )
             """
         )
 
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS snapshots_15m (
-                bucket_start_utc TEXT PRIMARY KEY,
-                avg_cpu_percent REAL,
-                avg_mem_percent REAL,
-                avg_disk_percent REAL,
-                avg_net_sent_bps REAL,
-                avg_net_recv_bps REAL
+        for table in ("snapshots_1m", "snapshots_15m"):
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket_ms INTEGER PRIMARY KEY,
+                    avg_cpu_percent REAL,
+                    avg_mem_percent REAL,
+                    avg_disk_percent REAL,
+                    avg_net_sent_bps REAL,
+                    avg_net_recv_bps REAL
+                )
+                """
             )
-            """
-        )
+            _ensure_columns(conn, table, ROLLUP_EXTRA_COLUMNS)
 
         conn.execute(
             """
@@ -146,6 +439,46 @@ def init_db() -> None:
             """
         )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts_utc ON events(ts_utc)")
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS disk_io (
+                ts_ms INTEGER NOT NULL,
+                device TEXT NOT NULL,
+                read_bps REAL,
+                write_bps REAL,
+                read_iops REAL,
+                write_iops REAL,
+                await_ms REAL,
+                util_percent REAL,
+                interval_s REAL,
+                PRIMARY KEY (ts_ms, device)
+            ) WITHOUT ROWID
+            """
+        )
+        # Per-device history and the device list read through this index.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_disk_io_device_ts_ms ON disk_io(device, ts_ms)"
+        )
+        for table in ("disk_io_1m", "disk_io_15m"):
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket_ms INTEGER NOT NULL,
+                    device TEXT NOT NULL,
+                    avg_read_bps REAL,
+                    avg_write_bps REAL,
+                    avg_read_iops REAL,
+                    avg_write_iops REAL,
+                    avg_await_ms REAL,
+                    avg_util_percent REAL,
+                    PRIMARY KEY (bucket_ms, device)
+                ) WITHOUT ROWID
+                """
+            )
+
+        if legacy_tables:
+            _copy_legacy_time_tables(conn, legacy_tables)
         conn.commit()
 
-    logger.info("SQLite initialized at %s", DB_PATH)
+    logger.info("SQLite initialized at %s", get_db().path)
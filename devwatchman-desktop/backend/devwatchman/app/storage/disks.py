@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any
+
+_DISK_IO_FIELDS: tuple[str, ...] = (
+    "read_bps",
+    "write_bps",
+    "read_iops",
+    "write_iops",
+    "await_ms",
+    "util_percent",
+)
+_FIELDS_SQL: str = ", ".join(_DISK_IO_FIELDS)
+_AVG_FIELDS_SQL: str = ", ".join(f"avg_{f}" for f in _DISK_IO_FIELDS)
+
+
+def insert_disk_io(
+    conn: sqlite3.Connection, rows: list[dict[str, Any]], *, commit: bool = True
+) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO disk_io (
+            ts_ms,
+            device,
+            read_bps,
+            write_bps,
+            read_iops,
+            write_iops,
+            await_ms,
+            util_percent,
+            interval_s
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                r["ts_ms"],
+                r["device"],
+                *(r.get(f) for f in _DISK_IO_FIELDS),
+                r.get("interval_s"),
+            )
+            for r in rows
+        ],
+    )
+    if commit:
+        conn.commit()
+
+
+def get_disk_io_devices(conn: sqlite3.Connection, since_ms: int) -> list[str]:
+    rows = conn.execute(
+        "SELECT DISTINCT device FROM disk_io WHERE ts_ms >= ? ORDER BY device",
+        (since_ms,),
+    ).fetchall()
+    return [str(r["device"]) for r in rows]
+
+
+def get_disk_io_history(
+    conn: sqlite3.Connection, device: str, since_ms: int
+) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        f"""
+        SELECT ts_ms, {_FIELDS_SQL}, interval_s
+        FROM disk_io
+        WHERE ts_ms >= ? AND device = ?
+        ORDER BY ts_ms ASC
+        """,
+        (since_ms, device),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _get_rollup_history(
+    conn: sqlite3.Connection, table: str, interval_s: float, device: str, since_ms: int
+) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        f"""
+        SELECT bucket_ms, {_AVG_FIELDS_SQL}
+        FROM {table}
+        WHERE bucket_ms >= ? AND device = ?
+        ORDER BY bucket_ms ASC
+        """,
+        (since_ms, device),
+    ).fetchall()
+    return [
+        {
+            "ts_ms": r["bucket_ms"],
+            **{f: r["avg_" + f] for f in _DISK_IO_FIELDS},
+            "interval_s": interval_s,
+        }
+        for r in rows
+    ]
+
+
+def get_disk_io_history_1m(
+    conn: sqlite3.Connection, device: str, since_ms: int
+) -> list[dict[str, Any]]:
+    return _get_rollup_history(conn, "disk_io_1m", 60.0, device, since_ms)
+
+
+def get_disk_io_history_15m(
+    conn: sqlite3.Connection, device: str, since_ms: int
+) -> list[dict[str, Any]]:
+    return _get_rollup_history(conn, "disk_io_15m", 900.0, device, since_ms)
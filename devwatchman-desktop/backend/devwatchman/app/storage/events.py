@@ -5,7 +5,9 @@ import sqlite3
 from typing import Any
 
 
-def insert_event(conn: sqlite3.Connection, event: dict[str, Any]) -> int:
+def insert_event(
+    conn: sqlite3.Connection, event: dict[str, Any], *, commit: bool = True
+) -> int:
     meta_json = event.get("meta_json")
     if meta_json is None and event.get("meta") is not None:
         meta_json = json.dumps(event["meta"], ensure_ascii=False, separators=(",", ":"))
@@ -23,7 +25,8 @@ def insert_event(conn: sqlite3.Connection, event: dict[str, Any]) -> int:
             meta_json,
         ),
     )
-    conn.commit()
+    if commit:
+        conn.commit()
     return int(cur.lastrowid)
 
 
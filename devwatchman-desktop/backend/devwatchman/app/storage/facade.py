@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from app.core.config import STORAGE_WORKERS
+from app.core.profiles import get_active_profile_name, set_active_profile_name
+from app.storage.alerts import acknowledge_alert, get_alert_setting, set_alert_setting
+from app.storage.db import init_db, read_connection, write_connection
+from app.storage.events import insert_event
+from app.storage.snapshots import get_snapshot_history
+
+T = TypeVar("T")
+
+
+def _with_connection(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with write_connection() as conn:
+        return fn(conn, *args, **kwargs)
+
+
+def _with_read_connection(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with read_connection() as conn:
+        return fn(conn, *args, **kwargs)
+
+
+def _ack_alert(conn: sqlite3.Connection, alert_id: int, ts_utc: str) -> tuple[bool, int | None]:
+    ok = acknowledge_alert(conn, alert_id=alert_id, ts_utc=ts_utc)
+    if not ok:
+        return False, None
+    try:
+        event_id = insert_event(
+            conn,
+            {
+                "ts_utc": ts_utc,
+                "kind": "alert_ack",
+                "message": f"Alert {alert_id} acknowledged",
+                "severity": "info",
+                "meta": {"alert_id": alert_id},
+            },
+        )
+    except Exception:
+        event_id = None
+    return True, event_id
+
+
+def _set_mute(
+    conn: sqlite3.Connection, mute_until: datetime | None, event: dict[str, Any]
+) -> int | None:
+    set_alert_setting(conn, "mute_until_utc", mute_until.isoformat() if mute_until else None)
+    try:
+        return insert_event(conn, event)
+    except Exception:
+        return None
+
+
+class AsyncStorage:
+    # Every call runs on a small bounded pool so SQLite never blocks the event loop.
+    # run() holds the shared writer connection for the call; read() borrows a pooled
+    # read-only connection, so reads never queue behind the writer or retention.
+    def __init__(self, *, max_workers: int = STORAGE_WORKERS) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)), thread_name_prefix="storage"
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.call(_with_connection, fn, *args, **kwargs)
+
+    async def read(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.call(_with_read_connection, fn, *args, **kwargs)
+
+    async def init_db(self) -> None:
+        await self.call(init_db)
+
+    async def insert_event(self, event: dict[str, Any]) -> int:
+        return await self.run(insert_event, event)
+
+    async def get_snapshot_history(self, since_ms: int) -> list[dict[str, Any]]:
+        return await self.read(get_snapshot_history, since_ms)
+
+    async def get_alert_setting(self, key: str) -> str | None:
+        return await self.read(get_alert_setting, key)
+
+    async def ack_alert(self, alert_id: int, ts_utc: str) -> tuple[bool, int | None]:
+        return await self.run(_ack_alert, alert_id, ts_utc)
+
+    async def set_mute(self, mute_until: datetime | None, event: dict[str, Any]) -> int | None:
+        return await self.run(_set_mute, mute_until, event)
+
+    async def get_active_profile_name(self) -> str:
+        return await self.call(get_active_profile_name)
+
+    async def set_active_profile_name(self, name: str) -> None:
+        await self.call(set_active_profile_name, name)
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Callable
+
+from app.storage.snapshots import get_snapshot_history
+
+# Streaming rollups: the storage writer folds every snapshot and disk I/O row into the
+# open 1m bucket as it is written and upserts the bucket once a row of a later minute
+# arrives; each flushed 1m row is folded the same way into the open 15m bucket. The
+# aggregates match the SQL rollups in services/retention.py, which now only fill
+# buckets the stream never flushed (a crash, a rolled-back commit, a clock step).
+
+MINUTE_MS: int = 60_000
+FIFTEEN_MINUTES_MS: int = 15 * MINUTE_MS
+
+# Cursors hold the next bucket start in epoch milliseconds; every bucket before it
+# has been rolled up.
+APP_STATE_RAW_TO_1M_NEXT_START: str = "rollup_raw_to_1m_next_start_ms"
+APP_STATE_1M_TO_15M_NEXT_START: str = "rollup_1m_to_15m_next_start_ms"
+APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START: str = "rollup_disk_io_raw_to_1m_next_start_ms"
+APP_STATE_DISK_IO_1M_TO_15M_NEXT_START: str = "rollup_disk_io_1m_to_15m_next_start_ms"
+
+_SNAPSHOT_MEANS: tuple[str, ...] = (
+    "cpu_percent",
+    "mem_percent",
+    "disk_percent",
+    "net_sent_bps",
+    "net_recv_bps",
+    "psi_cpu_some_pct",
+    "psi_mem_some_pct",
+    "psi_mem_full_pct",
+    "psi_io_some_pct",
+    "psi_io_full_pct",
+    "tcp_inuse",
+)
+_SNAPSHOT_MAXES: tuple[str, ...] = ("tcp_tw", "tcp_orphan")
+_DISK_IO_MEANS: tuple[str, ...] = ("read_bps", "write_bps", "read_iops", "write_iops", "util_percent")
+
+
+def get_rollup_cursor(conn: sqlite3.Connection, key: str) -> int | None:
+    row = conn.execute("SELECT value FROM app_state WHERE key = ?", (key,)).fetchone()
+    value = str(row["value"] or "").strip() if row is not None else ""
+    return int(value) if value.isdigit() else None
+
+
+def set_rollup_cursor(conn: sqlite3.Connection, key: str, value: int) -> None:
+    conn.execute("INSERT OR REPLACE INTO app_state(key, value) VALUES(?, ?)", (key, str(value)))
+
+
+class _Accumulator:
+    # Running sums of one bucket (of one device, for disk I/O). NULLs are skipped
+    # like SQL's sum() and max() skip them.
+    __slots__ = ("sums", "weights", "maxes")
+
+    def __init__(self) -> None:
+        self.sums: dict[str, float] = {}
+        self.weights: dict[str, float] = {}
+        self.maxes: dict[str, Any] = {}
+
+    def mean(self, name: str, value: Any, weight: float) -> None:
+        if value is None:
+            return
+        self.sums[name] = self.sums.get(name, 0.0) + value * weight
+        self.weights[name] = self.weights.get(name, 0.0) + weight
+
+    def max(self, name: str, value: Any) -> None:
+        if value is not None and (name not in self.maxes or value > self.maxes[name]):
+            self.maxes[name] = value
+
+    def mean_of(self, name: str) -> float | None:
+        weight = self.weights.get(name)
+        return self.sums[name] / weight if weight else None
+
+
+def _interval(row: dict[str, Any]) -> float:
+    value = row.get("interval_s")
+    return 1.0 if value is None else float(value)
+
+
+def _fold_snapshot(acc: _Accumulator, row: dict[str, Any]) -> None:
+    # Weighted by the interval each point covers, as in the SQL rollup.
+    weight = _interval(row)
+    for name in _SNAPSHOT_MEANS:
+        acc.mean(name, row.get(name), weight)
+    for name in _SNAPSHOT_MAXES:
+        acc.max(name, row.get(name))
+
+
+def _fold_snapshot_1m(acc: _Accumulator, row: dict[str, Any]) -> None:
+    for name in _SNAPSHOT_MEANS:
+        acc.mean(name, row.get("avg_" + name), 1.0)
+    for name in _SNAPSHOT_MAXES:
+        acc.max(name, row.get("max_" + name))
+
+
+def _snapshot_rollup_row(acc: _Accumulator) -> dict[str, Any]:
+    return {
+        **{"avg_" + name: acc.mean_of(name) for name in _SNAPSHOT_MEANS},
+        **{"max_" + name: acc.maxes.get(name) for name in _SNAPSHOT_MAXES},
+    }
+
+
+def _fold_disk_io(acc: _Accumulator, row: dict[str, Any]) -> None:
+    weight = _interval(row)
+    for name in _DISK_IO_MEANS:
+        acc.mean(name, row.get(name), weight)
+    # await is per request, so it is weighted by the requests each point covers.
+    requests = (row.get("read_iops") or 0.0) + (row.get("write_iops") or 0.0)
+    acc.mean("await_ms", row.get("await_ms"), requests * weight)
+
+
+def _fold_disk_io_1m(acc: _Accumulator, row: dict[str, Any]) -> None:
+    for name in _DISK_IO_MEANS:
+        acc.mean(name, row.get("avg_" + name), 1.0)
+    requests = (row.get("avg_read_iops") or 0.0) + (row.get("avg_write_iops") or 0.0)
+    acc.mean("await_ms", row.get("avg_await_ms"), requests)
+
+
+def _disk_io_rollup_row(acc: _Accumulator) -> dict[str, Any]:
+    return {
+        **{"avg_" + name: acc.mean_of(name) for name in _DISK_IO_MEANS},
+        "avg_await_ms": acc.mean_of("await_ms") or 0.0,
+    }
+
+
+def _seed_snapshots(conn: sqlite3.Connection, since_ms: int, until_ms: int) -> list[dict[str, Any]]:
+    # Through get_snapshot_history so minutes already sealed into blocks count too.
+    return get_snapshot_history(conn, since_ms, until_ms)
+
+
+def _seed_query(table: str, time_column: str) -> Callable[..., list[dict[str, Any]]]:
+    def seed(conn: sqlite3.Connection, since_ms: int, until_ms: int) -> list[dict[str, Any]]:
+        rows = conn.execute(
+            f"SELECT * FROM {table} WHERE {time_column} >= ? AND {time_column} < ?",
+            (since_ms, until_ms),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    return seed
+
+
+class _Level:
+    # One rollup step (e.g. disk_io -> disk_io_1m) and its open bucket. A flushed
+    # bucket only moves the cursor when every bucket from the cursor up to it was
+    # flushed by this level too; otherwise the SQL rollup has a gap to fill first
+    # and the cursor is left for it.
+    def __init__(
+        self,
+        *,
+        table: str,
+        bucket_ms: int,
+        cursor_key: str,
+        source_table: str,
+        source_time: str,
+        source_cursor_key: str | None,
+        seed: Callable[[sqlite3.Connection, int, int], list[dict[str, Any]]],
+        fold: Callable[[_Accumulator, dict[str, Any]], None],
+        output: Callable[[_Accumulator], dict[str, Any]],
+        by_device: bool,
+        parent: _Level | None = None,
+    ) -> None:
+        self.table = table
+        self.bucket_ms = bucket_ms
+        self.cursor_key = cursor_key
+        self._source_table = source_table
+        self._source_time = source_time
+        self._source_cursor_key = source_cursor_key
+        self._seed = seed
+        self._fold = fold
+        self._output = output
+        self._by_device = by_device
+        self.parent = parent
+        self._open: int | None = None
+        self._complete = False
+        # First bucket of the current unbroken run of flushes.
+        self._run_start: int | None = None
+        self._groups: dict[str | None, _Accumulator] = {}
+        self.flushed = 0
+        self.skipped = 0
+
+    def reset(self) -> None:
+        # Forget the open bucket; the next row reopens it from what is in SQLite.
+        self._open = None
+        self._run_start = None
+        self._groups = {}
+        if self.parent is not None:
+            self.parent.reset()
+
+    def stats(self) -> dict[str, Any]:
+        return {"open_bucket_ms": self._open, "flushed": self.flushed, "skipped": self.skipped}
+
+    def feed(
+        self, conn: sqlite3.Connection, ts_ms: int, rows: list[dict[str, Any]], *, complete: bool = True
+    ) -> None:
+        bucket = ts_ms // self.bucket_ms * self.bucket_ms
+        if self._open is None:
+            self._start(conn, bucket, ts_ms)
+        elif bucket < self._open:
+            # A row behind the open bucket (the wall clock stepped back): hand that
+            # bucket back to the SQL rollup.
+            self.rewind(conn, bucket)
+            return
+        elif bucket > self._open:
+            self._flush(conn)
+            self._open = bucket
+            self._complete = True
+            self._groups = {}
+        if not complete:
+            self._mark_incomplete()
+        for row in rows:
+            key = row.get("device") if self._by_device else None
+            self._fold(self._groups.setdefault(key, _Accumulator()), row)
+
+    def _start(self, conn: sqlite3.Connection, bucket: int, ts_ms: int) -> None:
+        # The first bucket after startup already has rows from before it; they are
+        # folded in from SQLite, but only if the level below has rolled all of them up.
+        self._open = bucket
+        self._groups = {}
+        source_cursor = (
+            get_rollup_cursor(conn, self._source_cursor_key) if self._source_cursor_key else None
+        )
+        self._complete = self._source_cursor_key is None or (
+            source_cursor is not None and source_cursor >= ts_ms
+        )
+        if self._complete:
+            self._run_start = bucket
+            for row in self._seed(conn, bucket, ts_ms):
+                key = row.get("device") if self._by_device else None
+                self._fold(self._groups.setdefault(key, _Accumulator()), row)
+        else:
+            self._run_start = bucket + self.bucket_ms
+
+    def _mark_incomplete(self) -> None:
+        if self._complete and self._open is not None:
+            self._complete = False
+            self._run_start = self._open + self.bucket_ms
+
+    def rewind(self, conn: sqlite3.Connection, ts_ms: int) -> None:
+        bucket = ts_ms // self.bucket_ms * self.bucket_ms
+        cursor = get_rollup_cursor(conn, self.cursor_key)
+        if cursor is None or cursor > bucket:
+            set_rollup_cursor(conn, self.cursor_key, bucket)
+        if self._open is not None:
+            if bucket >= self._open:
+                self._mark_incomplete()
+            elif self._run_start is not None:
+                self._run_start = max(self._run_start, self._open)
+        if self.parent is not None:
+            self.parent.rewind(conn, bucket)
+
+    def _flush(self, conn: sqlite3.Connection) -> None:
+        bucket = self._open
+        if bucket is None:
+            return
+        if not self._complete:
+            self.skipped += 1
+            if self.parent is not None:
+                self.parent.feed(conn, bucket, [], complete=False)
+            return
+
+        rows = [
+            {"bucket_ms": bucket, **({"device": key} if self._by_device else {}), **self._output(acc)}
+            for key, acc in self._groups.items()
+        ]
+        if rows:
+            columns = list(rows[0])
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [tuple(r[c] for c in columns) for r in rows],
+            )
+        self.flushed += 1
+
+        cursor = get_rollup_cursor(conn, self.cursor_key)
+        if cursor is None and not self._has_source_before(conn, self._run_start):
+            # Nothing older to roll up (a new database).
+            cursor = self._run_start
+        if cursor is not None and self._run_start is not None and cursor >= self._run_start:
+            next_start = bucket + self.bucket_ms
+            if next_start > cursor:
+                set_rollup_cursor(conn, self.cursor_key, next_start)
+
+        if self.parent is not None:
+            self.parent.feed(conn, bucket, rows)
+
+    def _has_source_before(self, conn: sqlite3.Connection, ts_ms: int | None) -> bool:
+        if ts_ms is None:
+            return True
+        row = conn.execute(
+            f"SELECT 1 FROM {self._source_table} WHERE {self._source_time} < ? LIMIT 1", (ts_ms,)
+        ).fetchone()
+        return row is not None
+
+
+class StreamingRollups:
+    # Owned by the storage writer thread and fed inside its transactions, so flushed
+    # buckets and cursor moves commit or roll back with the rows that produced them.
+    def __init__(self) -> None:
+        self.snapshots_1m = _Level(
+            table="snapshots_1m",
+            bucket_ms=MINUTE_MS,
+            cursor_key=APP_STATE_RAW_TO_1M_NEXT_START,
+            source_table="snapshots",
+            source_time="ts_ms",
+            source_cursor_key=None,
+            seed=_seed_snapshots,
+            fold=_fold_snapshot,
+            output=_snapshot_rollup_row,
+            by_device=False,
+            parent=_Level(
+                table="snapshots_15m",
+                bucket_ms=FIFTEEN_MINUTES_MS,
+                cursor_key=APP_STATE_1M_TO_15M_NEXT_START,
+                source_table="snapshots_1m",
+                source_time="bucket_ms",
+                source_cursor_key=APP_STATE_RAW_TO_1M_NEXT_START,
+                seed=_seed_query("snapshots_1m", "bucket_ms"),
+                fold=_fold_snapshot_1m,
+                output=_snapshot_rollup_row,
+                by_device=False,
+            ),
+        )
+        self.disk_io_1m = _Level(
+            table="disk_io_1m",
+            bucket_ms=MINUTE_MS,
+            cursor_key=APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START,
+            source_table="disk_io",
+            source_time="ts_ms",
+            source_cursor_key=None,
+            seed=_seed_query("disk_io", "ts_ms"),
+            fold=_fold_disk_io,
+            output=_disk_io_rollup_row,
+            by_device=True,
+            parent=_Level(
+                table="disk_io_15m",
+                bucket_ms=FIFTEEN_MINUTES_MS,
+                cursor_key=APP_STATE_DISK_IO_1M_TO_15M_NEXT_START,
+                source_table="disk_io_1m",
+                source_time="bucket_ms",
+                source_cursor_key=APP_STATE_DISK_IO_RAW_TO_1M_NEXT_START,
+                seed=_seed_query("disk_io_1m", "bucket_ms"),
+                fold=_fold_disk_io_1m,
+                output=_disk_io_rollup_row,
+                by_device=True,
+            ),
+        )
+
+    def add_snapshot(self, conn: sqlite3.Connection, snapshot: dict[str, Any]) -> None:
+        self.snapshots_1m.feed(conn, int(snapshot["ts_ms"]), [snapshot])
+
+    def add_disk_io(self, conn: sqlite3.Connection, rows: list[dict[str, Any]]) -> None:
+        if rows:
+            self.disk_io_1m.feed(conn, int(rows[0]["ts_ms"]), rows)
+
+    def reset(self) -> None:
+        self.snapshots_1m.reset()
+        self.disk_io_1m.reset()
+
+    def stats(self) -> dict[str, Any]:
+        levels = [self.snapshots_1m, self.snapshots_1m.parent, self.disk_io_1m, self.disk_io_1m.parent]
+        return {level.table: level.stats() for level in levels if level is not None}
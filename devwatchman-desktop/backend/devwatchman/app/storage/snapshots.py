@@ -3,137 +3,154 @@ from __future__ import annotations
 import sqlite3
 from typing import Any
 
+from app.storage.blocks import get_block_history, get_latest_block_row
 
-def insert_snapshot(conn: sqlite3.Connection, snapshot: dict[str, Any]) -> None:
+
+# Metric columns of snapshots and their SQLite types, keyed by ts_ms.
+SNAPSHOT_COLUMN_TYPES: dict[str, str] = {
+    "cpu_percent": "REAL",
+    "mem_percent": "REAL",
+    "mem_used_bytes": "INTEGER",
+    "mem_avail_bytes": "INTEGER",
+    "mem_total_bytes": "INTEGER",
+    "disk_percent": "REAL",
+    "disk_used_bytes": "INTEGER",
+    "disk_free_bytes": "INTEGER",
+    "disk_total_bytes": "INTEGER",
+    "net_sent_bps": "REAL",
+    "net_recv_bps": "REAL",
+    "interval_s": "REAL",
+    "psi_cpu_some_avg10": "REAL",
+    "psi_mem_some_avg10": "REAL",
+    "psi_mem_full_avg10": "REAL",
+    "psi_io_some_avg10": "REAL",
+    "psi_io_full_avg10": "REAL",
+    "psi_cpu_some_pct": "REAL",
+    "psi_mem_some_pct": "REAL",
+    "psi_mem_full_pct": "REAL",
+    "psi_io_some_pct": "REAL",
+    "psi_io_full_pct": "REAL",
+    "sock_used": "INTEGER",
+    "tcp_inuse": "INTEGER",
+    "tcp_orphan": "INTEGER",
+    "tcp_tw": "INTEGER",
+    "tcp_alloc": "INTEGER",
+}
+_SNAPSHOT_COLUMNS: tuple[str, ...] = ("ts_ms", *SNAPSHOT_COLUMN_TYPES)
+_MAX_MS: int = 2**63 - 1
+# A repeated millisecond (the wall clock stepped back) replaces the earlier row rather
+# than failing the whole tick batch.
+_INSERT_SNAPSHOT_SQL: str = (
+    f"INSERT OR REPLACE INTO snapshots ({', '.join(_SNAPSHOT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _SNAPSHOT_COLUMNS)})"
+)
+
+# Rollup columns as they appear in history rows; the avg10 gauges are not rolled up
+# (the stall percentages cover the same signal exactly over each bucket).
+_ROLLUP_EXTRA_FIELDS: tuple[tuple[str, str], ...] = (
+    ("psi_cpu_some_pct", "avg_psi_cpu_some_pct"),
+    ("psi_mem_some_pct", "avg_psi_mem_some_pct"),
+    ("psi_mem_full_pct", "avg_psi_mem_full_pct"),
+    ("psi_io_some_pct", "avg_psi_io_some_pct"),
+    ("psi_io_full_pct", "avg_psi_io_full_pct"),
+    ("tcp_inuse", "avg_tcp_inuse"),
+    ("tcp_tw", "max_tcp_tw"),
+    ("tcp_orphan", "max_tcp_orphan"),
+)
+_ROLLUP_EXTRA_SELECT: str = ", ".join(col for _, col in _ROLLUP_EXTRA_FIELDS)
+
+
+def insert_snapshot(
+    conn: sqlite3.Connection, snapshot: dict[str, Any], *, commit: bool = True
+) -> None:
     conn.execute(
-        """
-        INSERT INTO snapshots (
-            ts_utc,
-            cpu_percent,
-            mem_percent,
-            mem_used_bytes,
-            mem_avail_bytes,
-            mem_total_bytes,
-            disk_percent,
-            disk_used_bytes,
-            disk_free_bytes,
-            disk_total_bytes,
-            net_sent_bps,
-            net_recv_bps
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            snapshot["ts_utc"],
-            snapshot.get("cpu_percent"),
-            snapshot.get("mem_percent"),
-            snapshot.get("mem_used_bytes"),
-            snapshot.get("mem_avail_bytes"),
-            snapshot.get("mem_total_bytes"),
-            snapshot.get("disk_percent"),
-            snapshot.get("disk_used_bytes"),
-            snapshot.get("disk_free_bytes"),
-            snapshot.get("disk_total_bytes"),
-            snapshot.get("net_sent_bps"),
-            snapshot.get("net_recv_bps"),
-        ),
+        _INSERT_SNAPSHOT_SQL,
+        (snapshot["ts_ms"], *(snapshot.get(c) for c in _SNAPSHOT_COLUMNS[1:])),
     )
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def get_latest_snapshot(conn: sqlite3.Connection) -> dict[str, Any] | None:
     row = conn.execute(
-        "SELECT * FROM snapshots ORDER BY ts_utc DESC LIMIT 1"
+        "SELECT * FROM snapshots ORDER BY ts_ms DESC LIMIT 1"
     ).fetchone()
-    return dict(row) if row else None
+    if row is not None:
+        return dict(row)
+    return get_latest_block_row(conn)
 
 
 def get_snapshot_history(
-    conn: sqlite3.Connection, since_ts_utc: str
+    conn: sqlite3.Connection, since_ms: int, until_ms: int | None = None
 ) -> list[dict[str, Any]]:
+    # Rows in [since_ms, until_ms). Sealed minutes come from snapshot_blocks, the rest
+    # from plain rows; both are read whatever SNAPSHOT_STORAGE_ENGINE is, so switching
+    # engines hides nothing.
+    if until_ms is None:
+        until_ms = _MAX_MS
+    results = get_block_history(conn, since_ms, until_ms)
     rows = conn.execute(
-        "SELECT * FROM snapshots WHERE ts_utc >= ? ORDER BY ts_utc ASC",
-        (since_ts_utc,),
+        "SELECT * FROM snapshots WHERE ts_ms >= ? AND ts_ms < ? ORDER BY ts_ms ASC",
+        (since_ms, until_ms),
     ).fetchall()
-    return [dict(r) for r in rows]
+    if not results:
+        return [dict(r) for r in rows]
+    results.extend(dict(r) for r in rows)
+    # A late row can sit in snapshots behind an already sealed minute.
+    results.sort(key=lambda r: r["ts_ms"])
+    return results
 
 
-def get_snapshot_history_1m(
-    conn: sqlite3.Connection, since_ts_utc: str
+def _get_rollup_history(
+    conn: sqlite3.Connection, table: str, interval_s: float, since_ms: int
 ) -> list[dict[str, Any]]:
     rows = conn.execute(
-        """
+        f"""
         SELECT
-            bucket_start_utc,
+            bucket_ms,
             avg_cpu_percent,
             avg_mem_percent,
             avg_disk_percent,
             avg_net_sent_bps,
-            avg_net_recv_bps
-        FROM snapshots_1m
-        WHERE bucket_start_utc >= ?
-        ORDER BY bucket_start_utc ASC
+            avg_net_recv_bps,
+            {_ROLLUP_EXTRA_SELECT}
+        FROM {table}
+        WHERE bucket_ms >= ?
+        ORDER BY bucket_ms ASC
         """,
-        (since_ts_utc,),
+        (since_ms,),
     ).fetchall()
 
     results: list[dict[str, Any]] = []
-    for i, r in enumerate(rows, start=1):
+    for r in rows:
         results.append(
             {
-                "id": i,
-                "ts_utc": r["bucket_start_utc"],
+                "ts_ms": r["bucket_ms"],
                 "cpu_percent": r["avg_cpu_percent"],
                 "mem_percent": r["avg_mem_percent"],
                 "disk_percent": r["avg_disk_percent"],
                 "net_sent_bps": r["avg_net_sent_bps"],
                 "net_recv_bps": r["avg_net_recv_bps"],
+                "interval_s": interval_s,
                 "mem_used_bytes": None,
                 "mem_avail_bytes": None,
                 "mem_total_bytes": None,
                 "disk_used_bytes": None,
                 "disk_free_bytes": None,
                 "disk_total_bytes": None,
+                **{field: r[col] for field, col in _ROLLUP_EXTRA_FIELDS},
             }
         )
     return results
 
 
-def get_snapshot_history_15m(
-    conn: sqlite3.Connection, since_ts_utc: str
+def get_snapshot_history_1m(
+    conn: sqlite3.Connection, since_ms: int
 ) -> list[dict[str, Any]]:
-    rows = conn.execute(
-        """
-        SELECT
-            bucket_start_utc,
-            avg_cpu_percent,
-            avg_mem_percent,
-            avg_disk_percent,
-            avg_net_sent_bps,
-            avg_net_recv_bps
-        FROM snapshots_15m
-        WHERE bucket_start_utc >= ?
-        ORDER BY bucket_start_utc ASC
-        """,
-        (since_ts_utc,),
-    ).fetchall()
+    return _get_rollup_history(conn, "snapshots_1m", 60.0, since_ms)
 
-    results: list[dict[str, Any]] = []
-    for i, r in enumerate(rows, start=1):
-        results.append(
-            {
-                "id": i,
-                "ts_utc": r["bucket_start_utc"],
-                "cpu_percent": r["avg_cpu_percent"],
-                "mem_percent": r["avg_mem_percent"],
-                "disk_percent": r["avg_disk_percent"],
-                "net_sent_bps": r["avg_net_sent_bps"],
-                "net_recv_bps": r["avg_net_recv_bps"],
-                "mem_used_bytes": None,
-                "mem_avail_bytes": None,
-                "mem_total_bytes": None,
-                "disk_used_bytes": None,
-                "disk_free_bytes": None,
-                "disk_total_bytes": None,
-            }
-        )
-    return results
+
+def get_snapshot_history_15m(
+    conn: sqlite3.Connection, since_ms: int
+) -> list[dict[str, Any]]:
+    return _get_rollup_history(conn, "snapshots_15m", 900.0, since_ms)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import WRITER_MAX_GROUP, WRITER_QUEUE_SIZE
+from app.storage.alerts import insert_alert
+from app.storage.db import get_db
+from app.storage.disks import insert_disk_io
+from app.storage.events import insert_event
+from app.storage.rollups import StreamingRollups
+from app.storage.snapshots import insert_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingAlert:
+    alert: dict[str, Any]
+    # Timeline event written with the alert; its meta gets the new alert_id.
+    event: dict[str, Any] | None = None
+
+
+@dataclass
+class TickBatch:
+    snapshot: dict[str, Any] | None = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+    alerts: list[PendingAlert] = field(default_factory=list)
+    # Per-device I/O rows (see storage/disks.py), stamped with the tick's ts_ms.
+    disk_io: list[dict[str, Any]] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return self.snapshot is None and not self.events and not self.alerts and not self.disk_io
+
+
+@dataclass
+class BatchResult:
+    snapshot_inserted: bool = False
+    event_ids: list[int] = field(default_factory=list)
+    alert_ids: list[int] = field(default_factory=list)
+    alert_event_ids: list[int | None] = field(default_factory=list)
+
+
+_STOP = object()
+
+
+class StorageWriter:
+    def __init__(self, *, queue_size: int = WRITER_QUEUE_SIZE, max_group: int = WRITER_MAX_GROUP) -> None:
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._max_group = max(1, int(max_group))
+        self._thread: threading.Thread | None = None
+        # Only touched on the writer thread.
+        self.rollups = StreamingRollups()
+        self.batches_committed: int = 0
+        self.commits: int = 0
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, batch: TickBatch) -> Future[BatchResult]:
+        fut: Future[BatchResult] = Future()
+        if self._thread is None or not self._thread.is_alive():
+            fut.set_exception(RuntimeError("storage writer is not running"))
+            return fut
+        try:
+            self._queue.put_nowait((batch, fut))
+        except queue.Full:
+            fut.set_exception(RuntimeError("storage writer backlog is full"))
+        return fut
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            group = [item]
+            stopping = False
+            while len(group) < self._max_group:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                group.append(nxt)
+            # The shared writer connection is held only for the commit itself.
+            with get_db().writer() as conn:
+                self._commit_group(conn, group)
+            if stopping:
+                return
+
+    def _commit_group(self, conn: sqlite3.Connection, group: list[tuple[TickBatch, Future[BatchResult]]]) -> None:
+        done: list[tuple[Future[BatchResult], BatchResult]] = []
+        # Transactions are managed explicitly so several batches share one commit.
+        # Results are only published after COMMIT so callers never see rolled-back IDs.
+        try:
+            conn.execute("BEGIN")
+            for batch, fut in group:
+                conn.execute("SAVEPOINT tick_batch")
+                try:
+                    result = _apply_batch(conn, batch, self.rollups)
+                    conn.execute("RELEASE tick_batch")
+                    done.append((fut, result))
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO tick_batch")
+                    conn.execute("RELEASE tick_batch")
+                    # Open buckets may hold rows that were just rolled back.
+                    self.rollups.reset()
+                    fut.set_exception(exc)
+            conn.execute("COMMIT")
+        except Exception as exc:
+            logger.exception("Storage writer commit failed (%d batches)", len(group))
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            self.rollups.reset()
+            for _, fut in group:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        self.commits += 1
+        self.batches_committed += len(done)
+        for fut, result in done:
+            fut.set_result(result)
+
+
+def _apply_batch(conn: sqlite3.Connection, batch: TickBatch, rollups: StreamingRollups) -> BatchResult:
+    result = BatchResult()
+    for event in batch.events:
+        result.event_ids.append(insert_event(conn, event, commit=False))
+    for pending in batch.alerts:
+        alert_id = insert_alert(conn, pending.alert, commit=False)
+        result.alert_ids.append(alert_id)
+        event_id: int | None = None
+        if pending.event is not None:
+            meta = {**(pending.event.get("meta") or {}), "alert_id": alert_id}
+            event_id = insert_event(conn, {**pending.event, "meta": meta}, commit=False)
+        result.alert_event_ids.append(event_id)
+    if batch.snapshot is not None:
+        insert_snapshot(conn, batch.snapshot, commit=False)
+        rollups.add_snapshot(conn, batch.snapshot)
+        result.snapshot_inserted = True
+    if batch.disk_io:
+        insert_disk_io(conn, batch.disk_io, commit=False)
+        rollups.add_disk_io(conn, batch.disk_io)
+    return result
@@ -253,9 +253,10 @@ function renderKpis(kpi) {
   );
 }
 
-function renderNetworkQuality({ status, latency_ms }) {
+function renderNetworkQuality({ status, latency_ms, p95_ms }) {
   setText("kpi-net-quality", status ?? NA);
-  setText("kpi-net-latency", latency_ms == null ? "offline" : `${formatNumber(latency_ms, 0)} ms`);
+  const p95 = p95_ms == null ? "" : ` (p95 ${formatNumber(p95_ms, 0)} ms)`;
+  setText("kpi-net-latency", latency_ms == null ? "offline" : `${formatNumber(latency_ms, 0)} ms${p95}`);
 }
 
 function setActiveProfileUi(name) {
@@ -960,6 +961,16 @@ function stopFallback(summaryPoller, alertsPoller, networkPoller, processesPolle
   processesPoller.stop();
 }
 
+function sendVisibility() {
+  const ws = state.ws.socket;
+  if (!ws || ws.readyState !== WebSocket.OPEN) return;
+  try {
+    ws.send(JSON.stringify({ type: "visibility", v: 1, hidden: document.visibilityState === "hidden" }));
+  } catch (_) {
+    // ignore
+  }
+}
+
 function connectWebSocket({ onKpi, onChartPoint, onAlert, onTimelineEvent, onProcesses, onListeningPorts, onDocker }) {
   const scheme = window.location.protocol === "https:" ? "wss" : "ws";
   const url = `${scheme}://${window.location.host}/ws/live`;
@@ -980,6 +991,7 @@ function connectWebSocket({ onKpi, onChartPoint, onAlert, onTimelineEvent, onPro
     state.ws.disconnectedSinceMs = null;
     state.ws.reconnectDelayMs = 1000;
     updateWsBadge();
+    sendVisibility();
   });
 
   ws.addEventListener("message", (evt) => {
@@ -1026,6 +1038,8 @@ function connectWebSocket({ onKpi, onChartPoint, onAlert, onTimelineEvent, onPro
   ws.addEventListener("error", onDisconnect);
 }
 
+document.addEventListener("visibilitychange", sendVisibility);
+
 document.addEventListener("DOMContentLoaded", async () => {
   const processesCard = $("processes-card");
   const processesExpand = $("processes-expand");
@@ -1185,7 +1199,11 @@ document.addEventListener("DOMContentLoaded", async () => {
       const d = msg.data || null;
       renderKpis(d);
       if (d && (d.network_quality || d.ping_latency_ms !== undefined)) {
-        renderNetworkQuality({ status: d.network_quality, latency_ms: d.ping_latency_ms });
+        renderNetworkQuality({
+          status: d.network_quality,
+          latency_ms: d.ping_latency_ms,
+          p95_ms: d.ping_p95_ms,
+        });
       }
       updateLastUpdated();
     },
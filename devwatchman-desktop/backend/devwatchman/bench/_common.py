@@ -0,0 +1,75 @@
+# Shared helpers for the scripts in bench/. Each script is run directly, e.g.
+#   python bench/bench_proc_collectors.py
+# from the backend/devwatchman directory; importing this module puts that directory on
+# sys.path so "app" and "tests" resolve the same way they do under pytest.
+from __future__ import annotations
+
+import importlib.util
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def per_call_seconds(fn: Callable[[], Any], iterations: int, *, repeats: int = 5) -> float:
+    # Median over `repeats` rounds of the mean cost of one call.
+    rounds = []
+    for _ in range(max(1, repeats)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        rounds.append((time.perf_counter() - started) / iterations)
+    return statistics.median(rounds)
+
+
+def median_seconds(fn: Callable[[], Any], *, repeats: int = 5) -> float:
+    samples = []
+    for _ in range(max(1, repeats)):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def git_show(rev: str, path: str) -> str:
+    # `path` is relative to backend/devwatchman.
+    top = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout.strip()
+    rel = (BACKEND_DIR / path).resolve().relative_to(top).as_posix()
+    return subprocess.run(
+        ["git", "show", f"{rev}:{rel}"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def load_module_at(rev: str, path: str, name: str) -> ModuleType:
+    # Loads one module as it was at `rev`, under `name`, next to the current tree, so a
+    # benchmark can run the old and new code in the same process.
+    source = git_show(rev, path)
+    spec = importlib.util.spec_from_loader(name, loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__file__ = f"<{rev}:{path}>"
+    sys.modules[name] = module
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def commit_before(path: str) -> str:
+    # Parent of the commit that first added `path`: the tree just before that change.
+    added = subprocess.run(
+        ["git", "log", "--diff-filter=A", "--format=%H", "--", path],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    if not added:
+        raise SystemExit(f"no commit adds {path}; pass the baseline revision explicitly")
+    return added[-1] + "^"
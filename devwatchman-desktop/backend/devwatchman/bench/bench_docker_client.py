@@ -0,0 +1,75 @@
+# Requests, new connections and wall time per collection cycle (ping, list, one-shot
+# stats of every container) against the fake Docker API in tests/fake_docker.py, for
+# docker_containers.py before the pooled client (docker.from_env() per call, inspect
+# and image lookup per listed container) and for the current tree.
+#
+#   python bench/bench_docker_client.py [--containers 20 50] [--baseline REV]
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from types import ModuleType
+
+import _common  # noqa: F401  (puts the backend on sys.path)
+from _common import commit_before, load_module_at, median_seconds
+
+from tests.fake_docker import FakeDockerDaemon
+
+MODULE = "app/collectors/docker_containers.py"
+
+
+def _cycle(module: ModuleType) -> None:
+    module.docker_available()
+    for item in module.list_containers(include_stopped=True):
+        module.get_container_stats(item["id"])
+
+
+def _list(module: ModuleType) -> None:
+    module.list_containers(include_stopped=True)
+
+
+def _measure(daemon: FakeDockerDaemon, fn, module: ModuleType, rounds: int) -> tuple[float, float, float]:
+    fn(module)  # warm: connect, and fill the current tree's inspect cache
+    daemon.reset_counters()
+    seconds = median_seconds(lambda: fn(module), repeats=rounds)
+    return daemon.total_requests() / rounds, daemon.connections / rounds, seconds
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--containers", type=int, nargs="+", default=[20, 50])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--baseline", help="revision to take the old module from (default: before docker_client.py)")
+    args = parser.parse_args(argv)
+
+    try:
+        import docker  # noqa: F401
+    except ImportError:
+        raise SystemExit("needs the 'docker' package")
+
+    baseline = args.baseline or commit_before("app/collectors/docker_client.py")
+    old = load_module_at(baseline, MODULE, "bench_old_docker_containers")
+    import app.collectors.docker_containers as new
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.containers:
+            daemon = FakeDockerDaemon(os.path.join(tmp, f"docker-{count}.sock"), containers=count).start()
+            os.environ["DOCKER_HOST"] = daemon.base_url
+            try:
+                print(f"{count} containers, per cycle of ping + list + stats for each:")
+                for label, module in (("before", old), ("after", new)):
+                    reqs, conns, seconds = _measure(daemon, _cycle, module, args.rounds)
+                    print(f"  {label:>6}: {reqs:6.1f} requests, {conns:6.1f} new connections, {seconds * 1000:7.1f} ms")
+                print("  listing alone:")
+                for label, module in (("before", old), ("after", new)):
+                    reqs, _, seconds = _measure(daemon, _list, module, args.rounds)
+                    print(f"  {label:>6}: {reqs:6.1f} requests, {seconds * 1000:7.1f} ms")
+            finally:
+                # The pooled client points at this daemon's socket; start clean next time.
+                new.get_docker_handle().reset()
+                daemon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Cost of one listening-socket scan with psutil.net_connections() and with the
+# /proc/net/tcp{,6} reader plus the inode->pid index (Linux only), with --sockets
+# extra listeners opened by this process. Both scans must return the same rows.
+#
+#   python bench/bench_listeners.py [--sockets 5000]
+from __future__ import annotations
+
+import argparse
+import resource
+import socket
+import sys
+
+import _common  # noqa: F401  (puts the backend on sys.path)
+from _common import median_seconds
+
+from app.collectors.procfs_sockets import InodePidIndex, read_listen_rows
+from app.collectors.socket_table import _scan_listeners_psutil
+
+
+def _open_listeners(count: int) -> list[socket.socket]:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    need = count + 256
+    if soft < need:
+        if hard != resource.RLIM_INFINITY and hard < need:
+            raise SystemExit(f"need {need} file descriptors, the hard limit is {hard}")
+        resource.setrlimit(resource.RLIMIT_NOFILE, (need, hard))
+    # Half on ::1 so both tcp and tcp6 tables are read, when IPv6 is available.
+    hosts = [(socket.AF_INET, "127.0.0.1")]
+    if socket.has_ipv6:
+        try:
+            socket.socket(socket.AF_INET6, socket.SOCK_STREAM).close()
+            hosts.append((socket.AF_INET6, "::1"))
+        except OSError:
+            pass
+    socks = []
+    for i in range(count):
+        family, host = hosts[i % len(hosts)]
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.bind((host, 0))
+        sock.listen(1)
+        socks.append(sock)
+    return socks
+
+
+def _procfs_scan(index: InodePidIndex) -> list[tuple[str, int, int]]:
+    rows = read_listen_rows()
+    pids = index.resolve({inode for _, _, inode in rows})
+    return [(ip, port, pids.get(inode, 0)) for ip, port, inode in rows]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if not sys.platform.startswith("linux"):
+        raise SystemExit("the /proc listener backend is Linux-only")
+
+    socks = _open_listeners(args.sockets)
+    try:
+        index = InodePidIndex()
+        cold = median_seconds(lambda: _procfs_scan(index), repeats=1)
+        cold_scans = index.fd_scans
+        psutil_s = median_seconds(_scan_listeners_psutil, repeats=args.repeats)
+        procfs_s = median_seconds(lambda: _procfs_scan(index), repeats=args.repeats)
+
+        psutil_rows = sorted(_scan_listeners_psutil())
+        procfs_rows = sorted(_procfs_scan(index))
+        print(f"listening sockets: {len(procfs_rows)}")
+        print(f"psutil.net_connections: {psutil_s * 1000:7.1f} ms per scan")
+        print(f"procfs, warm index:     {procfs_s * 1000:7.1f} ms per scan")
+        print(f"procfs, cold index:     {cold * 1000:7.1f} ms ({cold_scans} fd dirs walked)")
+        print(f"identical rows: {psutil_rows == procfs_rows}")
+    finally:
+        for sock in socks:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
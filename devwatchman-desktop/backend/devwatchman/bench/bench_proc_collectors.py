@@ -0,0 +1,51 @@
+# Per-tick cost of collect_cpu + collect_memory + collect_network on the psutil path
+# and on the /proc fast path (Linux only). The /proc path also yields load average,
+# context switches and interrupts in the same reads.
+#
+#   python bench/bench_proc_collectors.py [--iterations 20000]
+from __future__ import annotations
+
+import argparse
+import sys
+
+import _common  # noqa: F401  (puts the backend on sys.path)
+from _common import per_call_seconds
+
+import app.collectors.procfs as procfs
+from app.collectors.cpu import collect_cpu
+from app.collectors.memory import collect_memory
+from app.collectors.network import collect_network
+
+
+def _tick() -> None:
+    collect_cpu()
+    collect_memory()
+    collect_network()
+
+
+def _use_backend(name: str) -> None:
+    if procfs._SAMPLER is not None:
+        procfs._SAMPLER.close()
+    procfs._SAMPLER = procfs.ProcfsSampler() if name == "procfs" else None
+    procfs._SAMPLER_FAILED = name == "psutil"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    if not sys.platform.startswith("linux"):
+        raise SystemExit("the /proc backend is Linux-only")
+
+    results = {}
+    for backend in ("psutil", "procfs"):
+        _use_backend(backend)
+        _tick()  # first samples only set the baselines
+        results[backend] = per_call_seconds(_tick, args.iterations)
+        print(f"{backend:>6}: {results[backend] * 1e6:7.1f} us per tick (cpu + memory + network)")
+    print(f"procfs / psutil: {results['procfs'] / results['psutil']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
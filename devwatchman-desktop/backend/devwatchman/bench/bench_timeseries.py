@@ -0,0 +1,172 @@
+# History queries and rollup catch-up on ISO-8601 TEXT time keys versus integer
+# epoch-ms keys. Each revision is checked out into a temporary git worktree and
+# measured in its own interpreter, on a fresh database holding --hours of 1 Hz
+# snapshots plus two disk devices. By default "before" is the tree just before
+# snapshots.ts_ms became the primary key and "after" is the commit that did it; pass
+# --after . to measure the working tree instead.
+#
+#   python bench/bench_timeseries.py [--hours 24] [--before REV] [--after REV]
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import _common  # noqa: F401  (puts the backend on sys.path)
+from _common import BACKEND_DIR, median_seconds
+
+DEVICES = ("vda", "vdb")
+
+
+def _rev_introducing_ms_keys() -> str:
+    found = subprocess.run(
+        ["git", "log", "-S", "ts_ms INTEGER PRIMARY KEY", "--format=%H", "--", "app/storage/db.py"],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    if not found:
+        raise SystemExit("cannot find the integer-key migration; pass --before and --after")
+    return found[-1]
+
+
+def _measure(tree: Path, hours: int, repeats: int) -> dict[str, tuple[float, str]]:
+    # Runs in a child interpreter with `tree` ahead of everything else on sys.path.
+    sys.path.insert(0, str(tree))
+    import app.storage.db as db
+    from app.services import retention
+    from app.storage import disks, snapshots
+
+    tmp = tempfile.mkdtemp(prefix="dwm-bench-")
+    path = Path(tmp) / "devwatchman.db"
+    db._MANAGER = db.ConnectionManager(path)
+    db.init_db()
+
+    legacy = "since_ts_utc" in inspect.signature(snapshots.get_snapshot_history).parameters
+    key = "ts_utc" if legacy else "ts_ms"
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def since(h: float):
+        dt = now - timedelta(hours=h)
+        return dt.isoformat() if legacy else int(dt.timestamp() * 1000)
+
+    values = {c: 1.5 for c in snapshots._SNAPSHOT_COLUMNS if c not in ("ts_utc", "ts_ms")}
+    values["interval_s"] = 1.0
+    seconds = hours * 3600
+    with db.get_db().writer() as conn:
+        conn.execute("BEGIN")
+        for i in range(seconds):
+            dt = now - timedelta(seconds=seconds - i)
+            stamp = {"ts_utc": dt.isoformat(), "ts_ms": int(dt.timestamp() * 1000)}
+            snapshots.insert_snapshot(conn, {**stamp, **values}, commit=False)
+            disks.insert_disk_io(
+                conn,
+                [
+                    {**stamp, "device": d, "read_bps": 1.0, "write_bps": 2.0, "read_iops": 3.0,
+                     "write_iops": 4.0, "await_ms": 0.5, "util_percent": 9.0, "interval_s": 1.0}
+                    for d in DEVICES
+                ],
+                commit=False,
+            )
+        conn.execute("COMMIT")
+
+    results: dict[str, tuple[float, str]] = {}
+    with db.get_db().writer() as conn:
+        started = time.perf_counter()
+        while retention._retention_cycle(conn, now_utc=now):
+            pass
+        results[f"rollup catch-up, {hours}h raw+disk -> 1m/15m"] = ((time.perf_counter() - started) * 1000, "ms")
+
+    with db.get_db().reader() as conn:
+        queries = {
+            "history 1h raw": lambda: snapshots.get_snapshot_history(conn, since(1)),
+            f"history {hours}h raw": lambda: snapshots.get_snapshot_history(conn, since(hours)),
+            f"history {hours}h 1m": lambda: snapshots.get_snapshot_history_1m(conn, since(hours)),
+            f"disk history {hours}h raw, one device": lambda: disks.get_disk_io_history(conn, DEVICES[0], since(hours)),
+            f"disk devices, {hours}h": lambda: disks.get_disk_io_devices(conn, since(hours)),
+            "count/avg range scan 1h": lambda: conn.execute(
+                f"SELECT count(*), avg(cpu_percent) FROM snapshots WHERE {key} >= ?", (since(1),)
+            ).fetchall(),
+            f"count/avg range scan {hours}h": lambda: conn.execute(
+                f"SELECT count(*), avg(cpu_percent) FROM snapshots WHERE {key} >= ?", (since(hours),)
+            ).fetchall(),
+        }
+        for label, query in queries.items():
+            results[label] = (median_seconds(query, repeats=repeats) * 1000, "ms")
+
+    db.get_db().close()
+    results["database size"] = (os.path.getsize(path) / 1e6, "MB")
+    shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def _tree_for(rev: str, workdir: Path, index: int) -> tuple[Path, Path | None]:
+    if rev == ".":
+        return BACKEND_DIR, None
+    top = Path(
+        subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    )
+    checkout = workdir / f"tree{index}"
+    subprocess.run(
+        ["git", "worktree", "add", "--detach", "--quiet", str(checkout), rev], cwd=BACKEND_DIR, check=True
+    )
+    return checkout / BACKEND_DIR.relative_to(top), checkout
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--before")
+    parser.add_argument("--after")
+    parser.add_argument("--measure", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure is not None:
+        print(json.dumps(_measure(args.measure, args.hours, args.repeats)))
+        return
+
+    if args.before is None or args.after is None:
+        migration = _rev_introducing_ms_keys()
+        args.before = args.before or migration + "^"
+        args.after = args.after or migration
+
+    columns: dict[str, dict[str, list]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        checkouts: list[Path] = []
+        try:
+            for index, (label, rev) in enumerate((("before", args.before), ("after", args.after))):
+                tree, checkout = _tree_for(rev, Path(tmp), index)
+                if checkout is not None:
+                    checkouts.append(checkout)
+                out = subprocess.run(
+                    [sys.executable, __file__, "--measure", str(tree),
+                     "--hours", str(args.hours), "--repeats", str(args.repeats)],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                columns[label] = json.loads(out.strip().splitlines()[-1])
+        finally:
+            for checkout in checkouts:
+                subprocess.run(["git", "worktree", "remove", "--force", str(checkout)], cwd=BACKEND_DIR)
+
+    print(f"before: {args.before}\nafter:  {args.after}")
+    for name, (before, unit) in columns["before"].items():
+        after = columns["after"].get(name, [float("nan")])[0]
+        print(f"  {name:<42} {before:9.1f} -> {after:9.1f} {unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Lets the tests import the "app" package from this directory, the same way
+# run_devwatchman.py does.
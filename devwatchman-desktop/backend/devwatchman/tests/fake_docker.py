@@ -0,0 +1,197 @@
+# A minimal Docker Engine API served over a unix socket, enough for docker-py's
+# APIClient: version negotiation, container listing and inspect, one-shot stats and a
+# chunked /events stream fed from a queue. Used by the tests and by bench/.
+from __future__ import annotations
+
+import json
+import os
+import queue
+import re
+import socketserver
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from typing import Any
+
+API_VERSION = "1.43"
+
+_END_STREAM = object()
+
+_STATS = {
+    "read": "2024-01-01T00:00:00Z",
+    "cpu_stats": {"cpu_usage": {"total_usage": 200}, "system_cpu_usage": 2000, "online_cpus": 2},
+    "precpu_stats": {"cpu_usage": {"total_usage": 100}, "system_cpu_usage": 1000},
+    "memory_stats": {"usage": 100, "limit": 1000},
+    "networks": {"eth0": {"rx_bytes": 1, "tx_bytes": 2}},
+}
+
+
+def container_id(index: int) -> str:
+    return f"{index:064x}"
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FakeDockerDaemon:
+    def __init__(self, path: str, containers: int = 0) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        # id -> {"name", "state", "restart_count"}
+        self.containers: dict[str, dict[str, Any]] = {}
+        for i in range(containers):
+            self.add_container(container_id(i), f"svc{i}")
+        self.requests: Counter[str] = Counter()
+        self.connections = 0
+        self.event_streams = 0
+        self._events: queue.Queue[Any] = queue.Queue()
+        self._server: _Server | None = None
+
+    @property
+    def base_url(self) -> str:
+        return "unix://" + self.path
+
+    def add_container(self, cid: str, name: str, state: str = "running", restart_count: int = 0) -> None:
+        with self.lock:
+            self.containers[cid] = {"name": name, "state": state, "restart_count": restart_count}
+
+    def set_state(self, cid: str, state: str) -> None:
+        with self.lock:
+            self.containers[cid]["state"] = state
+
+    def emit(self, frame: dict[str, Any]) -> None:
+        self._events.put(frame)
+
+    def end_event_stream(self) -> None:
+        # Ends the current /events response cleanly, as a restarting daemon would.
+        self._events.put(_END_STREAM)
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.requests.clear()
+            self.connections = 0
+
+    def total_requests(self) -> int:
+        with self.lock:
+            return sum(self.requests.values())
+
+    def start(self) -> FakeDockerDaemon:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = _Server(self.path, self._handler())
+        threading.Thread(target=self._server.serve_forever, name="fake-docker", daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _summary(self, cid: str, c: dict[str, Any]) -> dict[str, Any]:
+        running = c["state"] == "running"
+        return {
+            "Id": cid,
+            "Names": ["/" + c["name"]],
+            "Image": "nginx:latest",
+            "ImageID": "sha256:" + "ab" * 32,
+            "State": c["state"],
+            "Status": "Up 2 hours" if running else "Exited (0) 5 minutes ago",
+            "Created": 1700000000,
+            "Ports": [{"IP": "0.0.0.0", "PrivatePort": 80, "PublicPort": 8000, "Type": "tcp"}],
+        }
+
+    def _inspect(self, cid: str, c: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "Id": cid,
+            "Name": "/" + c["name"],
+            "Created": "2023-11-14T22:13:20Z",
+            "RestartCount": c["restart_count"],
+            "Image": "sha256:" + "ab" * 32,
+            "State": {"Status": c["state"], "Running": c["state"] == "running", "StartedAt": "2024-01-01T00:00:00Z"},
+            "Config": {"Image": "nginx:latest", "Labels": {}},
+            "NetworkSettings": {"Ports": {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "8000"}]}},
+        }
+
+    def _route(self, path: str) -> Any:
+        with self.lock:
+            if path == "/version":
+                return {"ApiVersion": API_VERSION, "Version": "24.0.0", "MinAPIVersion": "1.12"}
+            if path == "/_ping":
+                return "OK"
+            if path == "/containers/json":
+                return [self._summary(cid, c) for cid, c in self.containers.items()]
+            if path.startswith("/images/"):
+                return {"Id": "sha256:" + "ab" * 32, "RepoTags": ["nginx:latest"]}
+            parts = path.split("/")
+            if len(parts) == 4 and parts[1] == "containers" and parts[2] in self.containers:
+                c = self.containers[parts[2]]
+                if parts[3] == "json":
+                    return self._inspect(parts[2], c)
+                if parts[3] == "stats":
+                    return _STATS
+        return None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                with daemon.lock:
+                    daemon.connections += 1
+                super().setup()
+
+            def address_string(self) -> str:
+                return "unix"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                path = re.sub(r"^/v[0-9.]+", "", self.path.split("?")[0])
+                with daemon.lock:
+                    daemon.requests[re.sub(r"(sha256:)?[0-9a-f]{64}", "ID", path)] += 1
+                if path == "/events":
+                    self._stream_events()
+                    return
+                body = daemon._route(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                data = (body if isinstance(body, str) else json.dumps(body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain" if isinstance(body, str) else "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Api-Version", API_VERSION)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_HEAD = do_GET
+
+            def _stream_events(self) -> None:
+                with daemon.lock:
+                    daemon.event_streams += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self.wfile.flush()
+                try:
+                    while True:
+                        frame = daemon._events.get()
+                        if frame is _END_STREAM:
+                            self.wfile.write(b"0\r\n\r\n")
+                            break
+                        data = (json.dumps(frame) + "\n").encode()
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                        self.wfile.flush()
+                except OSError:
+                    pass
+                self.close_connection = True
+
+        return Handler
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import time
+
+from app.collectors.cgroup_tree import _IDLE_FULL_READ_EVERY, CgroupTree
+
+SERVICE = "system.slice/db.service"
+
+
+def _pressure(total: int, avg10: float = 0.0) -> str:
+    return (
+        f"some avg10={avg10:.2f} avg60=0.00 avg300=0.00 total={total}\n"
+        f"full avg10=0.00 avg60=0.00 avg300=0.00 total={total}\n"
+    )
+
+
+def _write_node(root, rel: str, *, usage_usec: int, rbytes: int, io_total: int, io_avg10: float = 0.0) -> None:
+    node = root / rel
+    node.mkdir(parents=True, exist_ok=True)
+    (node / "cpu.stat").write_text(f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n")
+    (node / "memory.current").write_text("4096\n")
+    (node / "io.stat").write_text(f"259:0 rbytes={rbytes} wbytes=0 rios=1 wios=0\n")
+    (node / "cpu.pressure").write_text(_pressure(0))
+    (node / "memory.pressure").write_text(_pressure(0))
+    (node / "io.pressure").write_text(_pressure(io_total, io_avg10))
+
+
+def _make_tree(tmp_path) -> CgroupTree:
+    (tmp_path / "cgroup.stat").write_text("nr_descendants 2\nnr_dying_descendants 0\n")
+    (tmp_path / "system.slice").mkdir()
+    _write_node(tmp_path, SERVICE, usage_usec=1_000, rbytes=0, io_total=0)
+    # Refreshes are driven by the tests; top() only reads.
+    return CgroupTree(str(tmp_path), min_refresh_seconds=3600.0)
+
+
+def _service(tree: CgroupTree) -> dict:
+    (item,) = tree.top(10, kind="service")
+    assert item["path"] == SERVICE
+    return item
+
+
+def test_io_stall_without_cpu_is_still_sampled(tmp_path):
+    tree = _make_tree(tmp_path)
+    tree.refresh()
+
+    # No CPU time moves, but the service reads 1 MiB while stalled on I/O.
+    time.sleep(0.05)
+    _write_node(tmp_path, SERVICE, usage_usec=1_000, rbytes=1 << 20, io_total=50_000, io_avg10=42.5)
+    tree.refresh()
+
+    item = _service(tree)
+    assert item["cpu_percent"] == 0.0
+    assert item["psi_io_some_avg10"] == 42.5
+    assert item["io_read_bps"] > 0.0
+
+
+def test_quiet_node_keeps_last_io_rate_and_fresh_psi(tmp_path):
+    tree = _make_tree(tmp_path)
+    tree.refresh()
+    time.sleep(0.05)
+    _write_node(tmp_path, SERVICE, usage_usec=2_000, rbytes=1 << 20, io_total=0)
+    tree.refresh()
+    rate = _service(tree)["io_read_bps"]
+    assert rate > 0.0
+
+    # Nothing moved: io.stat is skipped and the last rate stands.
+    io_stat = tmp_path / SERVICE / "io.stat"
+    io_stat.write_text("not re-read while quiet\n")
+    tree.refresh()
+    assert _service(tree)["io_read_bps"] == rate
+
+    # The pressure files are read on every refresh, quiet or not.
+    (tmp_path / SERVICE / "memory.pressure").write_text(_pressure(0, avg10=7.0))
+    tree.refresh()
+    assert _service(tree)["psi_memory_some_avg10"] == 7.0
+
+
+def test_quiet_node_is_fully_read_periodically(tmp_path):
+    tree = _make_tree(tmp_path)
+    tree.refresh()
+    (tmp_path / SERVICE / "memory.current").write_text("8192\n")
+    for _ in range(_IDLE_FULL_READ_EVERY):
+        tree.refresh()
+    assert _service(tree)["memory_bytes"] == 4096
+    tree.refresh()
+    assert _service(tree)["memory_bytes"] == 8192
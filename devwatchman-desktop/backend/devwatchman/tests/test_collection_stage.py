@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.services.collection import CollectionStage
+from app.services.collector_registry import EXECUTOR_DEDICATED, EXECUTOR_LOOP, CollectorSpec
+
+
+def _sleeper(value: str, seconds: float):
+    def run() -> str:
+        time.sleep(seconds)
+        return value
+
+    return run
+
+
+def _collect(stage: CollectionStage, specs: list[CollectorSpec], **kwargs):
+    async def scenario():
+        started = time.monotonic()
+        results = await stage.collect(specs, **kwargs)
+        return results, time.monotonic() - started
+
+    return asyncio.run(scenario())
+
+
+def test_run_over_its_budget_is_stale_even_inside_the_deadline():
+    stage = CollectionStage(deadline_seconds=0.6)
+    try:
+        results, elapsed = _collect(
+            stage,
+            [
+                CollectorSpec("quick", _sleeper("q", 0.0), budget_seconds=0.25),
+                CollectorSpec("slow", _sleeper("s", 0.2), budget_seconds=0.05, executor=EXECUTOR_DEDICATED),
+            ],
+        )
+    finally:
+        stage.shutdown()
+
+    assert results["quick"].fresh and not results["quick"].stale
+    assert results["quick"].value == "q"
+    assert results["slow"].stale and not results["slow"].fresh
+    assert results["slow"].value is None
+    # The tick stops waiting once every run is done or out of budget.
+    assert elapsed < 0.15
+    assert stage.status()["slow"]["timeouts"] == 1
+
+
+def test_run_within_budget_but_past_the_deadline_is_stale():
+    stage = CollectionStage(deadline_seconds=0.05)
+    try:
+        results, elapsed = _collect(
+            stage, [CollectorSpec("docker", _sleeper("d", 0.2), budget_seconds=10.0, executor=EXECUTOR_DEDICATED)]
+        )
+        status = stage.status()["docker"]
+    finally:
+        stage.shutdown()
+
+    assert results["docker"].stale and not results["docker"].fresh
+    assert elapsed < 0.15
+    # Cut off by the tick, not by its own budget: not a timeout.
+    assert status["timeouts"] == 0 and status["inflight"]
+
+
+def test_late_run_is_handed_on_by_a_later_tick():
+    stage = CollectionStage(deadline_seconds=0.05)
+
+    async def scenario():
+        spec = CollectorSpec("slow", _sleeper("late", 0.1), budget_seconds=10.0, executor=EXECUTOR_DEDICATED)
+        first = await stage.collect([spec])
+        await asyncio.sleep(0.1)
+        second = await stage.collect([], follow=["slow"])
+        return first["slow"], second["slow"]
+
+    try:
+        first, second = asyncio.run(scenario())
+    finally:
+        stage.shutdown()
+
+    assert first.stale and first.value is None
+    assert second.fresh and not second.stale and second.value == "late"
+
+
+def test_loop_collector_gets_its_own_budget():
+    stage = CollectionStage(deadline_seconds=0.6)
+
+    async def probe() -> str:
+        await asyncio.sleep(0.2)
+        return "pong"
+
+    async def scenario():
+        spec = CollectorSpec("ping", probe, budget_seconds=0.05, executor=EXECUTOR_LOOP)
+        started = time.monotonic()
+        results = await stage.collect([spec])
+        return results["ping"], time.monotonic() - started
+
+    try:
+        result, elapsed = asyncio.run(scenario())
+    finally:
+        stage.shutdown()
+
+    assert result.stale and not result.fresh
+    assert elapsed < 0.15
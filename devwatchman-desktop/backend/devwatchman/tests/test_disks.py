@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+
+import app.collectors.disks as disks
+from app.collectors.disks import DiskSubsystem, Mount
+
+_Usage = namedtuple("_Usage", "total used free percent")
+
+USAGE = {
+    "/": _Usage(100, 40, 60, 40.0),
+    "/data": _Usage(1000, 900, 100, 90.0),
+    "D:\\": _Usage(500, 250, 250, 50.0),
+}
+
+
+class _FixedMounts:
+    def __init__(self, mounts: list[Mount]) -> None:
+        self._list = mounts
+        self.reloads = 1
+
+    def mounts(self) -> list[Mount]:
+        return self._list
+
+
+def _fake_disk_usage(path: str):
+    if path not in USAGE:
+        raise PermissionError(path)
+    return USAGE[path]
+
+
+@pytest.fixture
+def subsystem(monkeypatch):
+    monkeypatch.setattr(disks.psutil, "disk_usage", _fake_disk_usage)
+    monkeypatch.setattr(disks.psutil, "disk_io_counters", lambda perdisk=True: {})
+
+    def make(candidates: list[str], mountpoints: list[str]) -> DiskSubsystem:
+        sub = DiskSubsystem()
+        sub._primary = candidates
+        sub._mounts = _FixedMounts([Mount(f"/dev/{i}", mp, "ext4", None) for i, mp in enumerate(mountpoints)])
+        return sub
+
+    return make
+
+
+def test_primary_is_first_candidate_in_the_mount_table(subsystem):
+    result = subsystem(["/", "/data"], ["/", "/data"]).sample()
+    assert result["percent"] == 40.0
+    assert [m["mountpoint"] for m in result["mounts"]] == ["/", "/data"]
+
+
+def test_unreadable_anchor_falls_through_to_the_next_candidate(subsystem):
+    # The home anchor is neither mounted nor readable; the system drive still is.
+    result = subsystem(["E:\\", "D:\\", "/"], ["/data"]).sample()
+    assert result["percent"] == 50.0
+    assert result["total_bytes"] == 500
+
+
+def test_no_readable_candidate_falls_back_to_the_first_mount(subsystem):
+    result = subsystem(["E:\\", "F:\\"], ["/data"]).sample()
+    assert result["percent"] == 90.0
+    assert result["used_bytes"] == 900
+
+
+def test_nothing_readable_raises(subsystem):
+    with pytest.raises(RuntimeError, match="Unable to determine disk usage"):
+        subsystem(["E:\\"], ["/missing"]).sample()
+
+
+def test_primary_paths_cover_every_legacy_candidate(monkeypatch):
+    monkeypatch.setenv("SystemDrive", "C:")
+    paths = disks._primary_paths()
+    # Home anchor first, then cwd anchor, system drive and "/", without repeats.
+    assert paths[0] == Path.home().anchor
+    assert "C:\\" in paths and "/" in paths
+    assert len(paths) == len(set(paths))
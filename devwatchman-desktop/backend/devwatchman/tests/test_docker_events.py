@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+import pytest
+
+import app.collectors.docker_client as docker_client
+import app.collectors.docker_containers as docker_containers
+from app.services.docker_events import (
+    KIND_DIE,
+    KIND_HEALTH,
+    KIND_RESTART,
+    KIND_RESYNC,
+    KIND_START,
+    ContainerEvent,
+    DockerEventsSubscriber,
+    parse_event,
+)
+from tests.fake_docker import FakeDockerDaemon, container_id
+
+pytest.importorskip("docker")
+
+WEB = container_id(1)
+DB = container_id(2)
+
+
+def _frame(action: str, cid: str, name: str, time_nano: int, **attrs: str) -> dict:
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {"ID": cid, "Attributes": {"name": name, **attrs}},
+        "time": time_nano // 1_000_000_000,
+        "timeNano": time_nano,
+    }
+
+
+def _wait_for(predicate: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the events subscriber")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    fake = FakeDockerDaemon(str(tmp_path / "docker.sock")).start()
+    fake.add_container(WEB, "web")
+    fake.add_container(DB, "db", state="exited", restart_count=3)
+    monkeypatch.setenv("DOCKER_HOST", fake.base_url)
+    for var in ("DOCKER_TLS_VERIFY", "DOCKER_CERT_PATH"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(docker_client, "_HANDLE", docker_client.DockerClientHandle())
+    monkeypatch.setattr(docker_containers, "_DETAILS", {})
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def subscriber():
+    subs: list[DockerEventsSubscriber] = []
+
+    def make(**kwargs) -> DockerEventsSubscriber:
+        sub = DockerEventsSubscriber(reconnect_seconds=0.05, **kwargs)
+        subs.append(sub)
+        return sub
+
+    yield make
+    for sub in subs:
+        sub.stop()
+
+
+def test_parse_event():
+    start = parse_event(_frame("start", WEB, "web", 1_700_000_000_123_456_789))
+    assert start == ContainerEvent(KIND_START, WEB, "web", 1_700_000_000.1234567, running=True)
+
+    die = parse_event(_frame("die", WEB, "web", 1_700_000_001_000_000_000, exitCode="137"))
+    assert (die.kind, die.running, die.exit_code) == (KIND_DIE, False, 137)
+    assert parse_event(_frame("die", WEB, "web", 1, exitCode="n/a")).exit_code is None
+
+    restart = parse_event(_frame("restart", WEB, "web", 2_000_000_000))
+    assert (restart.kind, restart.ts_epoch, restart.running) == (KIND_RESTART, 2.0, None)
+
+    health = parse_event(_frame("health_status: unhealthy", WEB, "web", 3_000_000_000))
+    assert (health.kind, health.health) == (KIND_HEALTH, "unhealthy")
+
+    # Without timeNano the second-resolution time is used; without a name, the short id.
+    legacy = parse_event({"status": "start", "id": DB, "time": 1_700_000_005})
+    assert (legacy.kind, legacy.name, legacy.ts_epoch) == (KIND_START, DB[:12], 1_700_000_005.0)
+
+    assert parse_event(_frame("exec_start: sh", WEB, "web", 1)) is None
+    assert parse_event({**_frame("start", WEB, "web", 1), "Type": "network"}) is None
+    assert parse_event({"Type": "container", "Action": "start", "Actor": {}}) is None
+    assert parse_event("not a frame") is None
+
+
+def test_stream_resyncs_then_queues_events_in_order(daemon, subscriber):
+    sub = subscriber()
+    sub.start()
+    _wait_for(lambda: sub.resyncs == 1)
+
+    resync = sorted(sub.drain(), key=lambda e: e.name)
+    assert [(e.kind, e.name, e.running, e.restart_count) for e in resync] == [
+        (KIND_RESYNC, "db", False, 3),
+        (KIND_RESYNC, "web", True, 0),
+    ]
+
+    base = 1_700_000_000_000_000_000
+    daemon.emit(_frame("start", DB, "db", base))
+    daemon.emit(_frame("health_status: healthy", DB, "db", base + 1_000))
+    daemon.emit({"Type": "network", "Action": "connect", "Actor": {"ID": "n1", "Attributes": {}}})
+    daemon.emit(_frame("die", WEB, "web", base + 2_000, exitCode="1"))
+    daemon.emit(_frame("restart", WEB, "web", base + 3_000))
+    _wait_for(lambda: sub.events_seen == 4)
+
+    events = sub.drain()
+    assert [(e.kind, e.name) for e in events] == [
+        (KIND_START, "db"),
+        (KIND_HEALTH, "db"),
+        (KIND_DIE, "web"),
+        (KIND_RESTART, "web"),
+    ]
+    assert [e.ts_epoch for e in events] == sorted(e.ts_epoch for e in events)
+    assert events[1].health == "healthy"
+    assert events[2].exit_code == 1
+    assert sub.drain() == []
+    assert sub.stats() == {"connected": True, "resyncs": 1, "events_seen": 4, "dropped": 0}
+
+
+def test_reconnect_resyncs_state_changed_while_down(daemon, subscriber):
+    sub = subscriber()
+    sub.start()
+    _wait_for(lambda: sub.resyncs == 1)
+    sub.drain()
+
+    # The daemon ends the stream; web stops before the subscriber is back.
+    daemon.set_state(WEB, "exited")
+    daemon.end_event_stream()
+    _wait_for(lambda: sub.resyncs == 2)
+
+    resync = {e.name: e for e in sub.drain()}
+    assert set(resync) == {"web", "db"}
+    assert resync["web"].kind == KIND_RESYNC and resync["web"].running is False
+    assert daemon.event_streams == 2
+
+    daemon.emit(_frame("start", WEB, "web", 1_700_000_010_000_000_000))
+    _wait_for(lambda: sub.events_seen == 1)
+    assert [(e.kind, e.name) for e in sub.drain()] == [(KIND_START, "web")]
+
+
+def test_full_queue_drops_oldest_and_counts_them(daemon, subscriber):
+    sub = subscriber(max_pending=3)
+    sub.start()
+    _wait_for(lambda: sub.resyncs == 1)
+
+    # Two resync entries and five events go into a queue of three.
+    base = 1_700_000_000_000_000_000
+    for i in range(5):
+        daemon.emit(_frame("restart", WEB, "web", base + i))
+    _wait_for(lambda: sub.events_seen == 5)
+
+    assert sub.dropped == 4
+    events = sub.drain()
+    assert [e.kind for e in events] == [KIND_RESTART] * 3
+    assert [e.ts_epoch for e in events] == [(base + i) / 1e9 for i in (2, 3, 4)]
+    assert sub.stats()["dropped"] == 4
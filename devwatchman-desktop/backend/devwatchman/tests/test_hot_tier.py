@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from app.services.hot_tier import HotTier
+
+
+def _snap(ts_ms: int, cpu: float | None = 1.0) -> dict:
+    return {"ts_ms": ts_ms, "cpu_percent": cpu}
+
+
+def _ts(tier: HotTier, since_ms: int = 0) -> list[int]:
+    rows, _ = tier.history(since_ms)
+    return [r["ts_ms"] for r in rows]
+
+
+def test_duplicate_ts_overwrites_the_newest_sample():
+    tier = HotTier(4)
+    tier.append(_snap(1000, 10.0))
+    tier.append(_snap(2000, 20.0))
+    tier.append(_snap(2000, 25.0))
+
+    assert _ts(tier) == [1000, 2000]
+    assert tier.latest()["cpu_percent"] == 25.0
+    assert tier.stats()["size"] == 2
+
+
+def test_duplicate_ts_replaces_the_whole_row():
+    tier = HotTier(4)
+    tier.append({"ts_ms": 1000, "cpu_percent": 10.0, "mem_percent": 50.0})
+    tier.append({"ts_ms": 1000, "cpu_percent": 12.0})
+
+    latest = tier.latest()
+    assert latest["cpu_percent"] == 12.0
+    assert latest["mem_percent"] is None
+
+
+def test_clock_step_back_restarts_the_ring():
+    tier = HotTier(4)
+    for ts in (1000, 2000, 3000):
+        tier.append(_snap(ts))
+    tier.append(_snap(2500))
+    tier.append(_snap(3500))
+
+    assert _ts(tier) == [2500, 3500]
+    assert tier.covered_since_ms() == 2500
+    assert _ts(tier, since_ms=3000) == [3500]
+
+
+def test_wrapped_ring_stays_sorted():
+    tier = HotTier(3)
+    for ts in range(1000, 6000, 1000):
+        tier.append(_snap(ts))
+    tier.append(_snap(5000, 99.0))
+
+    assert _ts(tier) == [3000, 4000, 5000]
+    assert _ts(tier, since_ms=3500) == [4000, 5000]
+    assert tier.latest()["cpu_percent"] == 99.0
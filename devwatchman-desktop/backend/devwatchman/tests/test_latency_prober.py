@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+
+import pytest
+
+from app.collectors.latency_prober import METHOD_TCP, LatencyProber
+
+ROUNDS = 5
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(64)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+@pytest.fixture
+def refused_port():
+    # Bind without listening: connects to it are answered with a RST.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def _run_rounds(prober: LatencyProber, rounds: int = ROUNDS) -> list[dict]:
+    async def scenario() -> list[dict]:
+        return [await prober.probe_once() for _ in range(rounds)]
+
+    return asyncio.run(scenario())
+
+
+def test_localhost_listener_is_good(listener):
+    prober = LatencyProber(targets=[f"127.0.0.1:{listener}"], use_icmp=False, timeout_ms=500)
+    result = _run_rounds(prober)[-1]
+
+    assert result["status"] == "good"
+    assert result["samples"] == ROUNDS
+    assert result["loss_percent"] == 0.0
+    assert result["latency_ms"] is not None and 0.0 < result["latency_ms"] < 500.0
+    assert result["p95_ms"] >= result["p50_ms"] > 0.0
+    (target,) = result["targets"]
+    assert target["method"] == METHOD_TCP
+    assert target["port"] == listener
+
+
+def test_refused_port_still_measures_round_trip(refused_port):
+    prober = LatencyProber(targets=[f"127.0.0.1:{refused_port}"], use_icmp=False, timeout_ms=500)
+    result = _run_rounds(prober)[-1]
+
+    # The RST is an answer from the host, so the round is not lost.
+    assert result["status"] == "good"
+    assert result["loss_percent"] == 0.0
+    assert result["latency_ms"] is not None and result["latency_ms"] < 500.0
+
+
+def test_unexpected_probe_error_is_a_lost_sample(listener, monkeypatch):
+    prober = LatencyProber(
+        targets=[f"127.0.0.1:{listener}", "127.0.0.1:1"], use_icmp=False, timeout_ms=500
+    )
+
+    async def broken(host: str, port: int) -> float | None:
+        raise AttributeError("boom")
+
+    monkeypatch.setattr(prober, "_probe_tcp", broken)
+    results = _run_rounds(prober, rounds=2)
+
+    assert [r["latency_ms"] for r in results] == [None, None]
+    assert results[-1]["loss_percent"] == 100.0
+    assert results[-1]["status"] == "offline"
+    assert all(t["loss_percent"] == 100.0 for t in results[-1]["targets"])
+
+
+def test_one_lost_target_does_not_lose_the_round(listener, monkeypatch):
+    prober = LatencyProber(
+        targets=[f"127.0.0.1:{listener}", "127.0.0.2:9"], use_icmp=False, timeout_ms=500
+    )
+    real_probe = prober._probe_tcp
+
+    async def flaky(host: str, port: int) -> float | None:
+        if host == "127.0.0.2":
+            raise RuntimeError("unexpected")
+        return await real_probe(host, port)
+
+    monkeypatch.setattr(prober, "_probe_tcp", flaky)
+    result = _run_rounds(prober)[-1]
+
+    assert result["status"] == "good"
+    assert result["loss_percent"] == 0.0
+    listened, lost = result["targets"]
+    assert listened["loss_percent"] == 0.0
+    assert lost["loss_percent"] == 100.0
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import os
+import socket
+import sys
+
+import psutil
+import pytest
+
+import app.collectors.procfs_sockets as procfs_sockets
+from app.collectors.procfs_processes import _CLK_TCK, read_start_ticks
+from app.collectors.procfs_sockets import InodePidIndex, read_listen_rows
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(8)
+    port = sock.getsockname()[1]
+    (inode,) = [i for ip, p, i in read_listen_rows() if p == port]
+    yield port, inode
+    sock.close()
+
+
+def test_start_ticks_match_the_process_start_time():
+    started = read_start_ticks(os.getpid())
+    assert started is not None
+    assert started / _CLK_TCK + psutil.boot_time() == pytest.approx(psutil.Process().create_time(), abs=1.0)
+    assert read_start_ticks(2**22 + 1) is None
+
+
+def test_index_rescans_only_new_or_reused_pids(listener, monkeypatch):
+    _, inode = listener
+    index = InodePidIndex()
+    assert index.resolve({inode}) == {inode: os.getpid()}
+
+    scans = index.fd_scans
+    assert index.resolve({inode}) == {inode: os.getpid()}
+    assert index.fd_scans == scans
+
+    # Same pid, different start ticks: a reused pid, so only it is walked again.
+    real = procfs_sockets.read_start_ticks
+
+    def reused(pid: int, proc_fd: int | None = None) -> int | None:
+        started = real(pid, proc_fd)
+        return started + 1 if pid == os.getpid() and started is not None else started
+
+    monkeypatch.setattr(procfs_sockets, "read_start_ticks", reused)
+    assert index.resolve({inode}) == {inode: os.getpid()}
+    assert index.fd_scans == scans + 1